@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 import pandas as pd
 from datetime import datetime
 from utils.mongodb_utils import get_mongo_collection
+from utils.dashboard_stats import record_analysis
 from ride_analyzerv2 import RideAnalyzer
 
 load_dotenv()
@@ -124,6 +125,7 @@ def run_analysis_cycle():
     print(f"🔁 New analysis cycle started at {datetime.now().isoformat()}")
     print("=" * 50)
 
+    cycle_start = time.monotonic()
     try:
         rides, calendar, matches = fetch_analysis_candidates()
 
@@ -151,6 +153,7 @@ def run_analysis_cycle():
             return
 
         update_analysis_flags(rides, calendar, ride_results, calendar_results)
+        record_analysis(len(ride_results), len(calendar_results), time.monotonic() - cycle_start)
 
     except Exception as e:
         print(f"\n❌ Critical error in analysis cycle: {str(e)}")
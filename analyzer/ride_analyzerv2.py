@@ -108,6 +108,13 @@ class RideAnalyzer:
         else:
             logging.warning("Calendar has no 'ID' column. Skipping Task_ID creation.")
 
+    @staticmethod
+    def _distance_note(match):
+        """Mesafe gerçek rota değilse (tahmin / kuş uçuşu) prompt'ta belirtilir."""
+        if match.get('Distance_Source') in ('estimate', 'geodesic'):
+            return " (tahmini, rota hesaplanmadı)"
+        return ""
+
     @lru_cache(maxsize=100)
     def _get_match_direction_description(self, direction):
         """Cache'lenmiş eşleşme yönü açıklaması"""
@@ -201,7 +208,7 @@ class RideAnalyzer:
             match_info = [
                 f"{i}. {match['Match_Time']} | {match['Matched_Pickup']} → {match['Matched_Dropoff']}",
                 f"   - {direction_desc} | {source_desc}",
-                f"   - Mesafe: {match.get('Real_Distance_km', 'Bilinmiyor')} km | Süre: {match.get('Real_Duration_min', 'Bilinmiyor')} dk",
+                f"   - Mesafe: {match.get('Real_Distance_km', 'Bilinmiyor')} km | Süre: {match.get('Real_Duration_min', 'Bilinmiyor')} dk{self._distance_note(match)}",
                 f"   - Zaman Farkı: {match.get('Time_Difference_min', 'Bilinmiyor')} dk",
                 f"   - Çift Kullanım: {'✅ Evet' if match.get('DoubleUtilized', False) else '❌ Hayır'}",
                 pair_info
@@ -281,7 +288,7 @@ class RideAnalyzer:
                 f"{i}. {match['Ride_Time']} | {match['Pickup']} → {match['Dropoff']}",
                 f"   - {direction_desc} | {source_desc}",
                 f"   - Mesafe: {match.get('Real_Distance_km', 'Bilinmiyor')} km",
-                f"   - Süre: {match.get('Real_Duration_min', 'Bilinmiyor')} dk",
+                f"   - Süre: {match.get('Real_Duration_min', 'Bilinmiyor')} dk{self._distance_note(match)}",
                 f"   - Zaman Farkı: {match.get('Time_Difference_min', 'Bilinmiyor')} dk",
                 f"   - Çift Kullanım: {'✅ Evet' if match.get('DoubleUtilized', False) else '❌ Hayır'}",
                 pair_info
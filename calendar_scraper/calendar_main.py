@@ -4,18 +4,13 @@ import traceback
 from datetime import datetime, timedelta
 from calendar_scraper import CalendarScraper
 from utils.mongodb_utils import get_mongo_collection
-from collections import Counter
+from utils.mongo_stats import status_counts
 
-USE_INCREMENTAL = bool(int(os.getenv("TASKS_INCREMENTAL", "0")))  # 1 ise incremental
-INCREMENTAL_WINDOW_HOURS = int(os.getenv("TASKS_INCREMENTAL_WINDOW_H", "24"))  # varsayılan 24h
+USE_INCREMENTAL = bool(int(os.getenv("TASKS_INCREMENTAL", "1")))  # 0 ise her cycle tam fetch
+FULL_SYNC_MINUTES = int(os.getenv("TASKS_FULL_SYNC_MIN", "60"))  # tam mutabakat aralığı
 
 def get_mongo_status_summary():
-    collection = get_mongo_collection("calendar_tasks")
-    status_counts = Counter()
-    for doc in collection.find({"Source": "calendar"}, {"_id": 0, "Status": 1}):
-        status = doc.get("Status", "UNKNOWN")
-        status_counts[status] += 1
-    return status_counts
+    return status_counts("calendar_tasks", source="calendar")
 
 
 def remove_old_removed_entries():
@@ -38,7 +33,7 @@ def log_status_summary(label):
 
 def run_calendar_loop(interval=60):
     print("\n=== Calendar Scraper Başlatıldı ===")
-    scraper = CalendarScraper(use_incremental=USE_INCREMENTAL, incremental_window_hours=INCREMENTAL_WINDOW_HOURS)
+    scraper = CalendarScraper(use_incremental=USE_INCREMENTAL, full_sync_minutes=FULL_SYNC_MINUTES)
     collection = get_mongo_collection("calendar_tasks")
 
     while True:
@@ -10,7 +10,9 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from pymongo import UpdateOne, ASCENDING
 from pymongo.errors import BulkWriteError
-from utils.mongodb_utils import get_mongo_collection
+from utils.mongodb_utils import (
+    get_mongo_collection, new_sync_generation, ensure_sync_generation_index, sweep_removed,
+)
 
 SCOPES = ['https://www.googleapis.com/auth/tasks.readonly']
 
@@ -39,18 +41,25 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CREDENTIALS_PATH = os.path.join(SCRIPT_DIR, 'credentials.json')
 TOKEN_PATH = os.path.join(SCRIPT_DIR, 'token.pickle')
 
+SYNC_STATE_ID = "calendar_tasks:@default"
+# Fetch sırasında güncellenen task'ları kaçırmamak için watermark biraz geriden tutulur
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
 
 class CalendarScraper:
-    def __init__(self, use_incremental=False, incremental_window_hours=24):
+    def __init__(self, use_incremental=True, full_sync_minutes=60):
         """
-        use_incremental=True: Google Tasks'ı updatedMin ile (son N saat) çek.
-        Incremental modda REMOVED işaretleme atlanır (tam evren görünmez).
+        use_incremental=True: Google Tasks'ı son başarılı sync'ten beri değişenlerle çek
+        (updatedMin=watermark, showDeleted=True). Silinen task'lar tombstone olarak gelir
+        ve REMOVED işaretlenir. Her full_sync_minutes dakikada bir tam fetch + REMOVED
+        mutabakatı yapılır. Watermark Mongo'da (sync_state) saklanır, restart'ta korunur.
         """
         self.collection = get_mongo_collection("calendar_tasks")
+        self.state_collection = get_mongo_collection("sync_state")
         self.service = self.authenticate_google()
         self.ensure_indexes()
         self.use_incremental = use_incremental
-        self.incremental_window_hours = incremental_window_hours
+        self.full_sync_interval = timedelta(minutes=full_sync_minutes)
 
     # --- Infrastructure ---
 
@@ -94,6 +103,8 @@ class CalendarScraper:
             else:
                 print(f"ℹ️ {name} zaten var.")
 
+        ensure_sync_generation_index(self.collection)
+
     def authenticate_google(self):
         creds = None
         if os.path.exists(TOKEN_PATH):
@@ -111,9 +122,44 @@ class CalendarScraper:
 
         return build('tasks', 'v1', credentials=creds)
 
+    # --- Sync state ---
+
+    def load_sync_state(self):
+        try:
+            return self.state_collection.find_one({"_id": SYNC_STATE_ID}) or {}
+        except Exception as e:
+            print(f"⚠️ sync_state okunamadı: {e}")
+            return {}
+
+    def save_sync_state(self, watermark, full_sync=False):
+        update = {"Watermark": watermark, "UpdatedAt": datetime.utcnow()}
+        if full_sync:
+            update["LastFullSync"] = watermark
+        try:
+            self.state_collection.update_one({"_id": SYNC_STATE_ID}, {"$set": update}, upsert=True)
+        except Exception as e:
+            print(f"⚠️ sync_state yazılamadı: {e}")
+
+    def reset_sync_state(self):
+        """Bir sonraki cycle'ı tam fetch'e zorlar."""
+        self.state_collection.delete_one({"_id": SYNC_STATE_ID})
+
+    def _plan_fetch(self, now_utc):
+        """(updated_min_iso, full_sync) döndürür."""
+        if not self.use_incremental:
+            return None, True
+
+        state = self.load_sync_state()
+        watermark = state.get("Watermark")
+        last_full = state.get("LastFullSync")
+        if not watermark or not last_full or now_utc - last_full > self.full_sync_interval:
+            return None, True
+
+        return watermark.replace(tzinfo=timezone.utc).isoformat(), False
+
     # --- Google Tasks ---
 
-    def fetch_all_tasks(self, updated_min_iso: str | None = None):
+    def fetch_all_tasks(self, updated_min_iso: str | None = None, show_deleted: bool = False):
         tasks = []
         next_page_token = None
         total_pages = 0
@@ -122,23 +168,15 @@ class CalendarScraper:
             print(f"🔎 Incremental aktif: updatedMin={updated_min_iso}")
 
         while True:
-            try:
-                req = self.service.tasks().list(
-                    tasklist='@default',
-                    pageToken=next_page_token,
-                    showCompleted=True,
-                    showHidden=True,
-                    maxResults=100,
-                    updatedMin=updated_min_iso  # None ise client bunu atar
-                )
-            except TypeError:
-                req = self.service.tasks().list(
-                    tasklist='@default',
-                    pageToken=next_page_token,
-                    showCompleted=True,
-                    showHidden=True,
-                    maxResults=100
-                )
+            req = self.service.tasks().list(
+                tasklist='@default',
+                pageToken=next_page_token,
+                showCompleted=True,
+                showHidden=True,
+                showDeleted=show_deleted,
+                maxResults=100,
+                updatedMin=updated_min_iso  # None ise client bunu atar
+            )
 
             try:
                 result = req.execute()
@@ -146,6 +184,7 @@ class CalendarScraper:
                 if updated_min_iso and e.resp.status in (400, 404):
                     print(f"⚠️ updatedMin kabul edilmedi ({e}). Tam fetch'e düşüyorum.")
                     updated_min_iso = None
+                    show_deleted = False
                     next_page_token = None
                     tasks.clear()
                     total_pages = 0
@@ -159,7 +198,7 @@ class CalendarScraper:
                 break
 
         print(f"🗂️ Google Tasks: {len(tasks)} kayıt, {total_pages} sayfa alındı.")
-        return tasks
+        return tasks, updated_min_iso is None
 
     # --- Helpers ---
 
@@ -206,17 +245,22 @@ class CalendarScraper:
     def run_scraping_cycle(self):
         print("\n📅 Calendar scraping cycle started.")
         now_utc = datetime.utcnow()  # UTC-naive
+        generation = new_sync_generation()
 
-        updated_min_iso = None
-        if self.use_incremental:
-            updated_min_iso = (now_utc - timedelta(hours=self.incremental_window_hours)).replace(tzinfo=timezone.utc).isoformat()
+        updated_min_iso, full_sync = self._plan_fetch(now_utc)
+        if full_sync and self.use_incremental:
+            print("🔁 Periyodik tam senkronizasyon (REMOVED mutabakatı dahil).")
 
-        tasks = self.fetch_all_tasks(updated_min_iso)
+        tasks, full_sync = self.fetch_all_tasks(updated_min_iso, show_deleted=not full_sync)
 
         rows = []
         scraped_ids = []
+        deleted_ids = []
         for task in tasks:
             task_id = task.get("id")
+            if task.get("deleted"):
+                deleted_ids.append(f"TASK_{task_id}")
+                continue
             title = task.get("title", "")
             notes = task.get("notes", "")
 
@@ -242,7 +286,8 @@ class CalendarScraper:
                 "FirstSeen": now_utc,
                 "LastSeen": now_utc,
                 "Task_ID": task_id,
-                "Source": "calendar"
+                "Source": "calendar",
+                "SyncGeneration": generation
             }
             rows.append(row)
             scraped_ids.append(row["ID"])
@@ -271,7 +316,7 @@ class CalendarScraper:
         unchanged_count = 0
         inserted_like_count = 0
 
-        skip_keys = {"ID", "Source", "FirstSeen", "LastSeen"}
+        skip_keys = {"ID", "Source", "FirstSeen", "LastSeen", "SyncGeneration"}
 
         for row in rows:
             _id = row["ID"]
@@ -312,16 +357,13 @@ class CalendarScraper:
                         set_doc[k] = v
                         has_change = True
 
-                update_body = {"$currentDate": {"LastSeen": True}}
+                set_doc["SyncGeneration"] = generation
+                update_body = {"$currentDate": {"LastSeen": True}, "$set": set_doc}
                 if has_change:
                     set_doc["Status"] = "UPDATED"
-                    update_body["$set"] = set_doc
                     changed_count += 1
                 else:
-                    if set_doc:
-                        update_body["$set"] = set_doc
-                    else:
-                        unchanged_count += 1
+                    unchanged_count += 1
 
                 ops.append(
                     UpdateOne(
@@ -331,6 +373,7 @@ class CalendarScraper:
                     )
                 )
 
+        write_ok = True
         if ops:
             try:
                 bulk_result = self.collection.bulk_write(ops, ordered=False)
@@ -341,8 +384,10 @@ class CalendarScraper:
                     f"upserted: {bulk_result.upserted_count}"
                 )
             except BulkWriteError as bwe:
+                write_ok = False
                 print(f"❌ Bulk write hatası: {bwe.details}")
             except Exception as e:
+                write_ok = False
                 print(f"❌ Bulk write beklenmeyen hata: {e}")
 
         print(
@@ -350,24 +395,33 @@ class CalendarScraper:
             f"changed:{changed_count}, unchanged:{unchanged_count}"
         )
 
-        if not self.use_incremental:
-            removed_res = self.mark_removed(scraped_ids)
-            if removed_res:
-                print(f"🗑️ REMOVED yapılan kayıt: {removed_res.modified_count}")
+        if full_sync:
+            # Yazım hatasında generation eksik kalan satırlar yanlışlıkla REMOVED olmasın
+            removed_res = self.mark_removed(generation) if write_ok else None
         else:
-            print("↷ Incremental mod: 'REMOVED' işaretleme atlandı.")
-
-        print(f"🏁 Cycle tamam: görülen {len(scraped_ids)} kayıt.")
+            removed_res = self.mark_deleted(deleted_ids)
+        if removed_res:
+            print(f"🗑️ REMOVED yapılan kayıt: {removed_res.modified_count}")
+        elif removed_res is None and (full_sync or deleted_ids):
+            write_ok = False
+
+        # Watermark sadece başarılı cycle'dan sonra ilerler; hata olursa aynı aralık tekrar çekilir
+        if self.use_incremental and write_ok:
+            self.save_sync_state(now_utc - WATERMARK_OVERLAP, full_sync=full_sync)
+
+        mode = "full" if full_sync else "incremental"
+        print(f"🏁 Cycle tamam ({mode}): görülen {len(scraped_ids)} kayıt, silinen {len(deleted_ids)}.")
         return set(scraped_ids)
 
-    def mark_removed(self, seen_ids):
-        if not isinstance(seen_ids, list):
-            seen_ids = list(seen_ids)
+    def mark_deleted(self, deleted_ids):
+        """Incremental fetch'te gelen tombstone'ları REMOVED yapar."""
+        if not deleted_ids:
+            return False
         try:
-            res = self.collection.update_many(
+            return self.collection.update_many(
                 {
                     "Source": "calendar",
-                    "ID": {"$nin": seen_ids},
+                    "ID": {"$in": list(deleted_ids)},
                     "Status": {"$ne": "REMOVED"}
                 },
                 {
@@ -375,7 +429,14 @@ class CalendarScraper:
                     "$currentDate": {"LastSeen": True}
                 }
             )
-            return res
+        except Exception as e:
+            print(f"⚠️ Tombstone güncellemesi sırasında hata: {e}")
+            return None
+
+    def mark_removed(self, generation):
+        """Bu tam fetch'in generation'ını taşımayan kayıtları REMOVED yapar."""
+        try:
+            return sweep_removed(self.collection, "calendar", generation)
         except Exception as e:
             print(f"⚠️ REMOVED güncellemesi sırasında hata: {e}")
             return None
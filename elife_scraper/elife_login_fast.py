@@ -9,10 +9,19 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from utils.browser_helper import get_chrome_binary_path, get_chromedriver_path
+from selenium.common.exceptions import WebDriverException
+from utils.process_helper import tracked_service_kwargs
+from utils.browser_helper import (
+    get_chrome_binary_path, get_chromedriver_path,
+    LOW_FOOTPRINT, apply_low_footprint_options, enable_resource_blocking,
+)
 
 
 class ElifeAutoLoginFast:
+    BASE_URL = "https://elifelimo.com/fleet/"
+    AGREEMENT_BUTTON_XPATH = "(//div[contains(@class,'bg-gradient-to-tr') and contains(., 'Read and accepted the agreement')])[last()]"
+    LOGIN_URL_MARKERS = ()  # login formu aynı URL'de açılıyor, kontrol is_logged_in() ile
+
     def __init__(self, headless=True):
         load_dotenv()
 
@@ -35,13 +44,18 @@ class ElifeAutoLoginFast:
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-gpu")
+        if LOW_FOOTPRINT:
+            apply_low_footprint_options(options)
 
         chrome_path = get_chrome_binary_path()
         driver_path = get_chromedriver_path()
         if chrome_path:
             options.binary_location = chrome_path
 
-        self.driver = webdriver.Chrome(service=Service(driver_path), options=options)
+        self.driver = webdriver.Chrome(service=Service(driver_path, **tracked_service_kwargs()), options=options)
+        if LOW_FOOTPRINT:
+            # i.i-close / i.i-reload ikonları icon-font; fontlar engellenirse görünmez olurlar
+            enable_resource_blocking(self.driver, block_fonts=False)
 
     # --- helpers ---
     def _set_input_with_events(self, web_el, value: str):
@@ -230,7 +244,7 @@ class ElifeAutoLoginFast:
         3) sayfanın ortasını aktive et + **END** gönder
         4) **7 sn bekle** (buton enable kuralı)
         5) 'Read and accepted the agreement' butonuna tıkla
-        6) **5 sn bekle** (sonraki sayfa/popup'ların yüklenmesi için)
+        6) Buton kaybolana kadar bekle (en fazla 10 sn)
         """
         wait = WebDriverWait(self.driver, wait_timeout)
 
@@ -254,7 +268,7 @@ class ElifeAutoLoginFast:
         time.sleep(7)
 
         # 5) Butonu tıklanabilir olana kadar bekle ve tıkla
-        button_xpath = "(//div[contains(@class,'bg-gradient-to-tr') and contains(., 'Read and accepted the agreement')])[last()]"
+        button_xpath = self.AGREEMENT_BUTTON_XPATH
         try:
             clickable_btn = wait.until(EC.element_to_be_clickable((By.XPATH, button_xpath)))
         except Exception:
@@ -281,8 +295,18 @@ class ElifeAutoLoginFast:
 
         print("✅ Supplier agreement accepted (clicked).")
 
-        # 6) **SCROLL SONRASI**: 5 saniye bekle (sonraki sayfa/popup'lar gelsin)
-        time.sleep(10)
+        # 6) Buton kaybolana kadar bekle (sonraki sayfa/popup'lar gelsin), en fazla 10 sn
+        try:
+            WebDriverWait(self.driver, 10).until(lambda d: not self._agreement_visible())
+        except Exception:
+            print("ℹ️ Agreement butonu 10 sn içinde kaybolmadı, devam ediliyor.")
+
+    def _agreement_visible(self):
+        """Agreement butonu ekranda mı (beklemeden, tek find_elements)."""
+        try:
+            return any(el.is_displayed() for el in self.driver.find_elements(By.XPATH, self.AGREEMENT_BUTTON_XPATH))
+        except WebDriverException:
+            return False
 
     # --- NEW: Ride Pool ikonuna tıkla ---
     def _open_ride_pool(self, wait_timeout=20):
@@ -327,10 +351,42 @@ class ElifeAutoLoginFast:
         # Yüklenme payı
         time.sleep(1)
 
+    # --- Oturum durumu (BrowserSession için) ---
+    def is_logged_in(self):
+        """Login formu görünmüyorsa oturum açık kabul edilir."""
+        try:
+            for el in self.driver.find_elements(By.CSS_SELECTOR, 'input[ref="emailInput"]'):
+                if el.is_displayed():
+                    return False
+            return True
+        except Exception:
+            return False
+
+    def open_workspace(self, wait_timeout=20):
+        """Mevcut cookie'lerle fleet sayfasını açıp Ride Pool'a geç (login formu olmadan)."""
+        try:
+            self.driver.get(self.BASE_URL)
+            WebDriverWait(self.driver, wait_timeout).until(
+                lambda d: d.find_elements(By.CSS_SELECTOR, 'input[ref="emailInput"]')
+                or d.find_elements(By.CSS_SELECTOR, "i.i-tb-ride-pool")
+            )
+            if not self.is_logged_in():
+                return False
+
+            if self._agreement_visible():
+                self._accept_supplier_agreement(wait_timeout=45)
+            self.close_all_popups()
+            self.final_popup_check()
+            self._open_ride_pool(wait_timeout=wait_timeout)
+            return True
+        except WebDriverException as e:
+            print(f"ℹ️ Workspace açılamadı: {e}")
+            return False
+
     def login(self):
         try:
             print("🌐 Opening Elife login page.")
-            self.driver.get("https://elifelimo.com/fleet/")
+            self.driver.get(self.BASE_URL)
 
             wait = WebDriverWait(self.driver, 25)
 
@@ -2,66 +2,17 @@
 
 import time
 import traceback
-import psutil  # ✅ Yeni: Chrome proseslerini kontrol için
 from datetime import datetime, timedelta
-from collections import Counter
 from login import ElifeAutoLogin
 from elife_scraper import ElifeScraper
 from utils.mongodb_utils import get_mongo_collection
-from utils.process_helperv2 import ChromeCleaner  # ✅ Yeni: Cleaner import
-import atexit
+from utils.mongo_stats import status_counts
+from utils.browser_pool import BrowserPool
 
-class PersistentSession:
-    def __init__(self):
-        self.session = None
-        self.driver = None
-        self.cleaner = None
-        atexit.register(self.cleanup_on_exit)
-
-    def ensure_login(self):
-        if not self.session:
-            self.session = ElifeAutoLogin(headless=True)
-            if not self.session.login():
-                self.session = None
-                raise Exception("🔐 Giriş başarısız")
-            self.driver = self.session.get_driver()
-
-            if not self.cleaner:
-                self.cleaner = ChromeCleaner(active_driver=self.driver)
-            else:
-                self.cleaner.active_driver = self.driver
-
-        return self.driver
-
-    def reset_session(self):
-        if self.session:
-            try:
-                self.session.close()
-            except:
-                pass
-        self.session = None
-        self.driver = None
-
-    def cleanup_on_exit(self):
-        if self.session:
-            print("🛑 [EXIT] Browser kapatılıyor...")
-            try:
-                self.session.close()
-            except Exception as e:
-                print(f"⚠️ [EXIT] Driver kapatılırken hata oluştu: {e}")
-        else:
-            print("ℹ️ [EXIT] Oturum zaten kapalı.")
-
-persistent = PersistentSession()
-scraper_cycle_counter = 0  # ✅ Full clean kontrolü için sayaç
+pool = BrowserPool("elife_legacy", lambda: ElifeAutoLogin(headless=True))
 
 def get_mongo_status_summary():
-    collection = get_mongo_collection("elife_rides")
-    status_counts = Counter()
-    for doc in collection.find({"Source": "elife"}):
-        status = doc.get("Status", "UNKNOWN")
-        status_counts[status] += 1
-    return status_counts
+    return status_counts("elife_rides", source="elife")
 
 def remove_old_removed_entries():
     try:
@@ -83,51 +34,30 @@ def log_mongo_status(label):
         print(f"  - {key}: {summary.get(key, 0)}")
 
 def show_active_chrome_processes(context=""):
-    #print(f"\n🛠️ Active Chrome Processes {context}:")
-    for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
-        try:
-            if proc.info['name'] and ('chrome' in proc.info['name'].lower() or 'chromedriver' in proc.info['name'].lower()):
-                mem_mb = (proc.info['memory_info'].rss / 1024 / 1024) if proc.info['memory_info'] else 0
-                #print(f"  PID {proc.pid} - {proc.info['name']} - {mem_mb:.1f} MB")
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
+    """Sadece havuzdaki driver ağaçlarını raporlar (tüm süreç tablosunu taramaz)."""
+    print(f"\n🛠️ Active Chrome Processes {context}:")
+    for row in pool.stats():
+        cpu = f", CPU {row['cpu_percent']:.0f}%" if row["cpu_percent"] is not None else ""
+        print(f"  Slot {row['slot']} - {row['processes']} process - {row['rss_mb']:.1f} MB{cpu}")
 
 def run_scraper_loop(interval=30):
-    global scraper_cycle_counter
     login_attempts = 0
 
     while True:
         try:
             print(f"\n=== Elife Scraper Başlatılıyor: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
 
-            driver = persistent.ensure_login()
-
-            show_active_chrome_processes("(before scraping)")
+            with pool.lease() as driver:
+                show_active_chrome_processes("(before scraping)")
 
-            scraper = ElifeScraper(driver)
-            scraped_ids = scraper.run_scraping_cycle()
+                scraper = ElifeScraper(driver)
+                scraped_ids = scraper.run_scraping_cycle()
 
             remove_old_removed_entries()
             log_mongo_status("🟢 Sonrası")
 
             show_active_chrome_processes("(after scraping)")
 
-            if persistent.cleaner:
-                persistent.cleaner.manual_clean(force_full_clean=False)
-
-            scraper_cycle_counter += 1
-            if scraper_cycle_counter >= 5:
-                print("\n💥 5 scraping sonrası FULL CLEAN yapılıyor...")
-
-                if persistent.cleaner:
-                    persistent.cleaner.manual_clean(force_full_clean=True)
-
-                print("♻️ FULL CLEAN sonrası yeni oturum açılıyor...")
-                persistent.reset_session()
-                persistent.ensure_login()
-
-                scraper_cycle_counter = 0
-
             login_attempts = 0
             print(f"⏱️ {interval} saniye sonra tekrar çalışacak...")
             time.sleep(interval)
@@ -138,7 +68,6 @@ def run_scraper_loop(interval=30):
         except Exception as e:
             print(f"\n[ERROR] Scraper çalışırken hata oluştu: {e}")
             traceback.print_exc()
-            persistent.reset_session()
             login_attempts += 1
             if login_attempts >= 3:
                 print("❌ 3 kez üst üste hata alındı. Döngü durduruluyor.")
@@ -5,36 +5,8 @@ from datetime import datetime, timedelta
 from elife_login_fast import ElifeAutoLoginFast
 from elife_scraper_fast import ElifeScraperFast
 from send_TG_message import send_telegram_message_with_metadata
-from utils.mongodb_utils import get_mongo_collection
-
-class ElifeSession:
-    def __init__(self):
-        self.driver = None
-        self.session = None
-        self.last_login = None
-
-    def login(self):
-        self.close()
-        self.session = ElifeAutoLoginFast(headless=True)
-        if not self.session.login():
-            raise Exception("❌ Elife login failed")
-        self.driver = self.session.get_driver()
-        self.last_login = datetime.now()
-        print("✅ Elife login successful")
-        return self.driver
-
-    def should_relogin(self):
-        return not self.last_login or (datetime.now() - self.last_login) > timedelta(minutes=15)
-
-    def close(self):
-        try:
-            if self.driver:
-                self.driver.quit()
-        except:
-            pass
-        self.driver = None
-        self.session = None
-
+from utils.mongodb_utils import get_mongo_collection, sweep_removed
+from utils.browser_pool import BrowserPool
 
 def notify_elife_ride(ride):
     msg = (
@@ -47,39 +19,31 @@ def notify_elife_ride(ride):
     send_telegram_message_with_metadata(msg)
 
 
-def update_elife_ride_statuses(seen_ids):
+def update_elife_ride_statuses(generation):
     collection = get_mongo_collection("elife_rides")
-    now = datetime.now()
-
-    for doc in collection.find({"Source": "elife"}):
-        ride_id = doc["ID"]
-        if ride_id not in seen_ids and doc.get("Status") != "REMOVED":
-            collection.update_one(
-                {"ID": ride_id},
-                {"$set": {"Status": "REMOVED", "LastSeen": now}}
-            )
-            print(f"🗑️ REMOVED: {ride_id}")
+    res = sweep_removed(collection, "elife", generation, removed_at=datetime.now())
+    if res.modified_count:
+        print(f"🗑️ REMOVED: {res.modified_count}")
 
 
 def run_loop():
-    session = ElifeSession()
+    pool = BrowserPool("elife", lambda: ElifeAutoLoginFast(headless=True))
+    pool.warm_up()
     last_scrape = datetime.now() - timedelta(seconds=30)
 
     while True:
         try:
-            if session.should_relogin():
-                print("♻️ 15 dakika doldu, tekrar login olunuyor...version fast 1.0")
-                session.login()
-
             if (datetime.now() - last_scrape).total_seconds() >= 20:
-                scraper = ElifeScraperFast(session.driver)
-                all_seen_ids, new_rides = scraper.run_scraping_cycle()
+                with pool.lease() as driver:
+                    scraper = ElifeScraperFast(driver)
+                    all_seen_ids, new_rides = scraper.run_scraping_cycle()
 
                 for ride in new_rides:
                     if ride.get("Status") == "NEW":
                         notify_elife_ride(ride)
 
-                update_elife_ride_statuses(all_seen_ids)
+                if all_seen_ids:
+                    update_elife_ride_statuses(scraper.sync_generation)
                 last_scrape = datetime.now()
 
             time.sleep(1)
@@ -87,7 +51,6 @@ def run_loop():
         except Exception as e:
             print(f"[ERROR] {e}")
             traceback.print_exc()
-            session.close()
             time.sleep(10)
 
 
@@ -4,12 +4,16 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from utils.time_utils import standardize_ride_time
-from utils.mongodb_utils import get_mongo_collection
+from utils.mongodb_utils import (
+    get_mongo_collection, new_sync_generation, ensure_sync_generation_index, sweep_removed,
+)
 
 class ElifeScraper:
     def __init__(self, driver):
         self.driver = driver
         self.collection = get_mongo_collection("elife_rides")
+        ensure_sync_generation_index(self.collection)
+        self.sync_generation = new_sync_generation()
 
     def refresh_rides(self):
         try:
@@ -112,7 +116,8 @@ class ElifeScraper:
                         'Price': price,
                         'IsNewBadge': is_new,
                         'Source': 'elife',
-                        'LastSeen': now
+                        'LastSeen': now,
+                        'SyncGeneration': self.sync_generation
                     }
 
                     existing = self.collection.find_one({"ID": ride_id})
@@ -151,14 +156,13 @@ class ElifeScraper:
 
     def run_scraping_cycle(self):
         print("\n▶ Elife Scraping Cycle Started")
+        self.sync_generation = new_sync_generation()
         self.refresh_rides()
         self.scroll_to_load_all_rides()
         scraped_ids = self.scrape_rides()
 
-        now = datetime.now()
         if scraped_ids:
-            for doc in self.collection.find({"Source": "elife"}):
-                if doc["ID"] not in scraped_ids and doc.get("Status") != "REMOVED":
-                    self.collection.update_one({"ID": doc["ID"]}, {"$set": {"Status": "REMOVED", "LastSeen": now}})
-                    print(f"🗑️ Marked as REMOVED: {doc['ID']}")
+            res = sweep_removed(self.collection, "elife", self.sync_generation, removed_at=datetime.now())
+            if res.modified_count:
+                print(f"🗑️ Marked as REMOVED: {res.modified_count}")
         return scraped_ids
\ No newline at end of file
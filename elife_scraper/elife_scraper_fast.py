@@ -8,13 +8,17 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from utils.time_utils import standardize_ride_time
-from utils.mongodb_utils import get_mongo_collection
+from utils.mongodb_utils import (
+    get_mongo_collection, new_sync_generation, ensure_sync_generation_index, sweep_removed,
+)
 
 
 class ElifeScraperFast:
     def __init__(self, driver):
         self.driver = driver
         self.collection = get_mongo_collection("elife_rides")
+        ensure_sync_generation_index(self.collection)
+        self.sync_generation = new_sync_generation()
 
     # ------------------------------
     # Overlay / modal temizliği
@@ -393,6 +397,7 @@ class ElifeScraperFast:
                         "IsNewBadge": is_new,
                         "Source": "elife",
                         "LastSeen": now,
+                        "SyncGeneration": self.sync_generation,
                     }
 
                     existing = self.collection.find_one({"ID": ride_id})
@@ -439,6 +444,7 @@ class ElifeScraperFast:
         print("\n▶ Elife Scraping Cycle Started")
         all_ids, new_ids = [], []
         bottom_confirmed = False
+        self.sync_generation = new_sync_generation()
         try:
             self.refresh_rides()
             bottom_confirmed = self.scroll_to_load_all_rides(start_delay=2.0)
@@ -449,14 +455,9 @@ class ElifeScraperFast:
         # REMOVED sadece 'No more items' metni doğrulanmışsa
         try:
             if bottom_confirmed and all_ids:
-                now = datetime.now()
-                for doc in self.collection.find({"Source": "elife"}):
-                    if doc["ID"] not in all_ids and doc.get("Status") != "REMOVED":
-                        self.collection.update_one(
-                            {"ID": doc["ID"]},
-                            {"$set": {"Status": "REMOVED", "LastSeen": now}}
-                        )
-                        print(f"🗑️ Marked as REMOVED: {doc['ID']}")
+                res = sweep_removed(self.collection, "elife", self.sync_generation, removed_at=datetime.now())
+                if res.modified_count:
+                    print(f"🗑️ Marked as REMOVED: {res.modified_count}")
             else:
                 print("⏭️ Bottom not confirmed by text — skipping REMOVED marking.")
         except Exception as e:
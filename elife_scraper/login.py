@@ -8,6 +8,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from utils.process_helper import tracked_service_kwargs
 from utils.browser_helper import get_chrome_binary_path, get_chromedriver_path
 
 class ElifeAutoLogin:
@@ -36,7 +37,7 @@ class ElifeAutoLogin:
         if chrome_path:
             options.binary_location = chrome_path
 
-        self.driver = webdriver.Chrome(service=Service(driver_path), options=options)
+        self.driver = webdriver.Chrome(service=Service(driver_path, **tracked_service_kwargs()), options=options)
 
     def login(self):
         try:
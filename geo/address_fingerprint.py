@@ -0,0 +1,84 @@
+# geo/address_fingerprint.py
+import re
+from tomtom_testv2 import COUNTRY_VARIANTS, get_gazetteer
+
+# Adresin yazım farklarından bağımsız anahtarı (geo_addresses cache key'i).
+# "Hotel Alesta, Fethiye", "HOTEL ALESTA FETHIYE" ve "Alesta Hotel / Fethiye, Muğla" aynı parmak izini üretir.
+
+_TR_MAP = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def fold(text):
+    """Küçük harf + Türkçe karakter sadeleştirme ('FETHİYE' -> 'fethiye', 'Muğla' -> 'mugla')."""
+    return str(text).replace("İ", "i").replace("I", "ı").casefold().translate(_TR_MAP)
+
+
+def _clean(text):
+    return " ".join(_NON_WORD.split(fold(text))).strip()
+
+
+# Aynı şeyi ifade eden yazımlar (katlanmış halleriyle); "" olanlar atılır
+TOKEN_ALIASES = {
+    "otel": "hotel", "htl": "hotel",
+    "havalimani": "airport", "havaalani": "airport", "airprt": "airport",
+    "dlm": "dalaman", "ayt": "antalya", "bjv": "bodrum",
+    "mah": "mahallesi", "mh": "mahallesi", "mahalle": "mahallesi",
+    "cad": "caddesi", "cd": "caddesi", "cadde": "caddesi",
+    "sok": "sokak", "sk": "sokak", "sokagi": "sokak",
+    "no": "", "nolu": "",
+}
+PHRASE_ALIASES = {
+    "d maris": "marmaris",
+}
+
+COUNTRY_TOKENS = {_clean(v) for v in COUNTRY_VARIANTS}
+# turkey_locations'ın toplandığı iller (turkey_datacollector.CITIES)
+PROVINCES = {"mugla", "antalya", "aydin", "izmir", "denizli", "burdur"}
+
+_places = (None, frozenset())   # (gazetteer, il dışı yer adları)
+
+
+def _place_names():
+    """Gazetteer'daki il dışı yer adları; gazetteer yeniden yüklenirse yeniden hesaplanır."""
+    global _places
+    gaz = get_gazetteer()
+    if _places[0] is not gaz:
+        _places = (gaz, frozenset({_clean(n) for n in gaz.names} - PROVINCES - {""}))
+    return _places[1]
+
+
+def tokens(text):
+    """Katlanmış, alias'ları uygulanmış, ülke adından arındırılmış token listesi (sıra korunur)."""
+    text = _clean(text)
+    for phrase, replacement in PHRASE_ALIASES.items():
+        text = re.sub(rf"\b{phrase}\b", replacement, text)
+    result = []
+    for token in text.split():
+        token = TOKEN_ALIASES.get(token, token)
+        if token and token not in COUNTRY_TOKENS:
+            result.append(token)
+    return result
+
+
+def _has_place(ordered_tokens, max_words=3):
+    names = _place_names()
+    n = len(ordered_tokens)
+    return any(
+        " ".join(ordered_tokens[i:i + size]) in names
+        for size in range(1, max_words + 1)
+        for i in range(n - size + 1)
+    )
+
+
+def fingerprint(address):
+    """
+    Sıralı, tekil token'lardan oluşan anahtar.
+    İl adı, adreste daha özel bir yer adı (ilçe/köy/havalimanı) varsa gürültü sayılıp atılır:
+    'Fethiye, Muğla' == 'Fethiye', ama 'Antalya Airport' il adını korur.
+    """
+    ordered = tokens(address)
+    specific = [t for t in ordered if t not in PROVINCES]
+    if specific and len(specific) < len(ordered) and _has_place(specific):
+        ordered = specific
+    return " ".join(sorted(set(ordered)))
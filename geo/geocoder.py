@@ -1,35 +1,76 @@
 
+import os
 from datetime import datetime
-from tomtom_testv2 import get_coordinates, format_address_for_search
+from tomtom_testv2 import get_coordinates, get_coordinates_batch, format_address_for_search
 from utils.mongodb_utils import get_mongo_collection
+from utils.negative_cache import negative_fields, due_query, ensure_retry_index
+from address_fingerprint import fingerprint
+from local_geocoder import LocalGeocoder
 
 class MongoGeoCoder:
-    def __init__(self):
+    def __init__(self, use_local=True):
         self.collection = get_mongo_collection("geo_addresses")
+        # Cache anahtarı: yazım farklarından bağımsız adres parmak izi (bkz. rekey_geo_addresses.py)
+        self.collection.create_index("AddressKey", name="idx_address_key")
+        self.collection.create_index("FormattedAddress", name="idx_formatted_address")  # rekey öncesi kayıtlar
+        ensure_retry_index(self.collection, "GeocodeStatus")
+        # Bilinen yerler / daha önce çözülmüş adreslerin yakın kopyaları ağa çıkmadan çözülür
+        self.local = LocalGeocoder() if use_local and os.getenv("LOCAL_GEOCODER", "1") == "1" else None
 
-    def is_address_geocoded(self, formatted_address):
-        result = self.collection.find_one({"FormattedAddress": formatted_address})
-        return result is not None
+    def find_cached(self, address_key, formatted_address):
+        """
+        AddressKey ile arar; bulunamazsa AddressKey'i henüz olmayan eski kayıtlara FormattedAddress ile bakar
+        ve bulunan kayda AddressKey yazar (rekey_geo_addresses.py çalıştırılmadan da cache korunur).
+        """
+        existing = self.collection.find_one({"AddressKey": address_key})
+        if existing:
+            return existing
+        legacy = self.collection.find_one({"FormattedAddress": formatted_address, "AddressKey": {"$exists": False}})
+        if legacy:
+            self.collection.update_one({"_id": legacy["_id"]}, {"$set": {"AddressKey": address_key}})
+        return legacy
+
+    @staticmethod
+    def address_key(address):
+        return fingerprint(address) or format_address_for_search(address)
+
+    def is_address_geocoded(self, address):
+        return self.find_cached(self.address_key(address), format_address_for_search(address)) is not None
 
     def geocode_address(self, address, source='unknown'):
         formatted_address = format_address_for_search(address)
-        existing = self.collection.find_one({"FormattedAddress": formatted_address})
+        address_key = self.address_key(address)
+        existing = self.find_cached(address_key, formatted_address)
 
         if existing:
             if existing.get("GeocodeStatus") == "FAILED":
-                return None, None
+                return None, None  # RetryAt gelince retry worker tekrar dener
             return existing.get("Latitude"), existing.get("Longitude")
 
-        print(f"\n🔍 Geocoding new address from {source}: {address}")
-        result = get_coordinates(address, "TR")
-
         new_entry = {
             'OriginalAddress': address,
             'FormattedAddress': formatted_address,
+            'AddressKey': address_key,
             'LastUpdated': datetime.now(),
             'Source': source
         }
 
+        local = self.local.lookup(address) if self.local else None
+        if local:
+            print(f"🏠 Local geocode ({local['method']}, {local['score']}): {address} → {local['matched']}")
+            new_entry.update({
+                'Latitude': local['lat'],
+                'Longitude': local['lon'],
+                'MatchedAddress': local['matched'],
+                'LocalScore': local['score'],
+                'GeocodeStatus': 'LOCAL'
+            })
+            self.collection.insert_one(new_entry)
+            return new_entry['Latitude'], new_entry['Longitude']
+
+        print(f"\n🔍 Geocoding new address from {source}: {address}")
+        result = get_coordinates(address, "TR")
+
         if result:
             lat, lon = result
             new_entry.update({
@@ -38,16 +79,57 @@ class MongoGeoCoder:
                 'MatchedAddress': address,
                 'GeocodeStatus': 'EXACT'
             })
+            if self.local:
+                self.local.add_address(address, lat, lon)
         else:
             new_entry.update({
                 'Latitude': None,
                 'Longitude': None,
-                'GeocodeStatus': 'FAILED'
+                'GeocodeStatus': 'FAILED',
+                **negative_fields()
             })
 
         self.collection.insert_one(new_entry)
         return new_entry['Latitude'], new_entry['Longitude']
 
+    def retry_failed(self, limit=20, pause=0.5):
+        """Süresi dolan FAILED kayıtları TomTom'da tekrar dener; düzelen adreslerin AddressKey kümesini döner."""
+        due = self.collection.find(
+            due_query({"GeocodeStatus": "FAILED"}),
+            {"OriginalAddress": 1, "AddressKey": 1, "Attempts": 1}
+        ).sort("RetryAt", 1).limit(limit)
+
+        entries = []
+        for entry in due:
+            if entry.get("OriginalAddress"):
+                entries.append(entry)
+            else:
+                self.collection.update_one({"_id": entry["_id"]}, {"$set": {"RetryAt": None}})
+        addresses = [e["OriginalAddress"] for e in entries]
+        results = get_coordinates_batch(addresses, "TR", pause=pause) if entries else []
+
+        recovered = set()
+        for entry, address, result in zip(entries, addresses, results):
+            if result:
+                lat, lon = result
+                self.collection.update_one({"_id": entry["_id"]}, {
+                    "$set": {
+                        'Latitude': lat,
+                        'Longitude': lon,
+                        'MatchedAddress': address,
+                        'GeocodeStatus': 'EXACT',
+                        'LastUpdated': datetime.now()
+                    },
+                    "$unset": {"RetryAt": "", "Attempts": ""}
+                })
+                recovered.add(entry.get("AddressKey") or self.address_key(address))
+                print(f"♻️ Geocode retry succeeded: {address}")
+            else:
+                self.collection.update_one({"_id": entry["_id"]}, {
+                    "$set": {**negative_fields(entry.get("Attempts", 0)), 'LastUpdated': datetime.now()}
+                })
+        return recovered
+
     def process_address_fields(self, record, source='unknown'):
         for field in ['Pickup', 'Dropoff']:
             lat_key = f"{field}_lat"
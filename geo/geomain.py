@@ -1,5 +1,8 @@
 from geocoder import MongoGeoCoder
 from distance_calculator import MongoDistanceCalculator
+from retry_worker import NegativeCacheRetryWorker
+from hotspot_worker import HotspotRefreshWorker
+from route_prefetch import RoutePrefetchWorker
 from utils.mongodb_utils import get_mongo_collection
 from datetime import datetime
 import time
@@ -140,6 +143,11 @@ class MainGeoProcessor:
 
     def run_enrichment_loop(self, interval=30):
         self.log_event("info", "🌍 Enrichment loop started", {"interval_seconds": interval})
+        # Başarısız geocode/rota kayıtları arka planda, rate limit altında tekrar denenir
+        NegativeCacheRetryWorker().start()
+        HotspotRefreshWorker().start()
+        # Matcher'ın soracağı rotalar önceden distance_cache'e alınır (match cycle'ı cache'ten çalışsın)
+        RoutePrefetchWorker().start()
         while True:
             try:
                 for source in ["elife", "wt", "calendar"]:
@@ -0,0 +1,67 @@
+# geo/hotspot_worker.py
+import os
+import threading
+import traceback
+from datetime import datetime
+from tomtom_testv2 import calculate_route
+from utils.hotspot_matrix import cluster_points, load_geocoded_points, build_matrix, save_matrix, matrix_built_at
+from utils.road_estimator import train_and_save as train_road_estimator, estimator_trained_at
+
+REBUILD_HOUR = int(os.getenv("HOTSPOT_REBUILD_HOUR", "3"))  # gece, trafik/iş yükü düşükken
+BUILD_RPS = float(os.getenv("HOTSPOT_BUILD_RPS", "2"))
+CHECK_INTERVAL_SEC = 600
+
+
+def rebuild_hotspot_matrix(pause=None):
+    pause = (1.0 / BUILD_RPS if BUILD_RPS > 0 else 0) if pause is None else pause
+    hotspots = cluster_points(load_geocoded_points())
+    if len(hotspots) < 2:
+        # Boş matris de built_at ile kaydedilir; yoksa her kontrolde yeniden kümelenirdi
+        print("ℹ️ Hotspot matrix: not enough clustered points, saving an empty matrix.")
+    print(f"🗺️ Building hotspot matrix for {len(hotspots)} hotspots ({len(hotspots) * (len(hotspots) - 1)} routes)...")
+    distance, duration = build_matrix(hotspots, calculate_route, pause=pause)
+    save_matrix(hotspots, distance, duration)
+    print("✅ Hotspot matrix saved.")
+
+
+class HotspotRefreshWorker(threading.Thread):
+    """
+    Gece işleri: hotspot matrisi ve yol tahmin modeli (distance_cache'ten).
+    Hiç yoksa hemen, sonra her gece REBUILD_HOUR'da bir kez yeniden hesaplanır.
+    """
+
+    def __init__(self, check_interval=CHECK_INTERVAL_SEC):
+        super().__init__(name="hotspot-refresh-worker", daemon=True)
+        self.check_interval = check_interval
+        self.attempted_at = {}  # iş adı -> son deneme; hata alan iş bir sonraki REBUILD_HOUR'u bekler
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @staticmethod
+    def is_due(built_at, now=None, attempted_at=None):
+        now = now or datetime.now()
+        last = max((t for t in (built_at, attempted_at) if t is not None), default=None)
+        if last is None:
+            return True
+        return now.hour == REBUILD_HOUR and last.date() < now.date()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for name, built_at, job in [
+                ("Road estimator", estimator_trained_at, train_road_estimator),
+                ("Hotspot matrix", matrix_built_at, rebuild_hotspot_matrix),
+            ]:
+                try:
+                    if self.is_due(built_at(), attempted_at=self.attempted_at.get(name)):
+                        self.attempted_at[name] = datetime.now()
+                        job()
+                except Exception as e:
+                    print(f"⚠️ {name} refresh error: {e}\n{traceback.format_exc()}")
+            self._stop_event.wait(self.check_interval)
+
+
+if __name__ == "__main__":
+    train_road_estimator()
+    rebuild_hotspot_matrix()
@@ -0,0 +1,173 @@
+# geo/local_geocoder.py
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from rapidfuzz import fuzz
+from tomtom_testv2 import calculate_straight_line_distance
+from address_fingerprint import fingerprint, tokens
+from utils.mongodb_utils import get_mongo_collection
+
+# TomTom'dan önce denenen yerel katman: turkey_locations + daha önce çözülmüş geo_addresses.
+# Emin olunmayan her durumda None döner ve akış TomTom'a düşer.
+MIN_SCORE = int(os.getenv("LOCAL_GEOCODER_MIN_SCORE", "92"))
+REFRESH_SEC = int(os.getenv("LOCAL_GEOCODER_REFRESH_SEC", "600"))
+AMBIGUITY_MARGIN = 3        # ilk iki aday skoru bu kadar yakınsa...
+AMBIGUITY_KM = 2.0          # ...ve birbirinden bu kadar uzaksa cevap verilmez
+MAX_POSTINGS = 200          # bundan fazla kayıtta geçen token'lar ("hotel", "fethiye") aday seçiminde kullanılmaz
+MAX_CANDIDATES = 50
+
+
+def _place_key(text):
+    return " ".join(sorted(tokens(text)))
+
+
+class LocalGeocoder:
+    def __init__(self, min_score=MIN_SCORE, refresh_sec=REFRESH_SEC):
+        self.min_score = min_score
+        self.refresh_sec = refresh_sec
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._reset()
+
+    def _reset(self):
+        self.keys = []                          # id -> fingerprint / yer adı anahtarı
+        self.coords = []                        # id -> (lat, lon)
+        self.labels = []                        # id -> gösterim adı
+        self.by_key = {}                        # anahtar -> id (adres geçmişi)
+        self.places = defaultdict(list)         # yer adı anahtarı -> [(id, {bağlam token'ları})]
+        self.postings = defaultdict(list)       # token -> [id]
+
+    # --- Yükleme ---
+
+    def _add(self, key, lat, lon, label):
+        entry_id = len(self.keys)
+        self.keys.append(key)
+        self.coords.append((lat, lon))
+        self.labels.append(label)
+        for token in set(key.split()):
+            self.postings[token].append(entry_id)
+        return entry_id
+
+    def add_address(self, address, lat, lon):
+        """TomTom'un çözdüğü adresi indekse ekler (bir sonraki yakın kopya yerelden çözülür)."""
+        if lat is None or lon is None:
+            return
+        key = fingerprint(address)
+        if key and key not in self.by_key:
+            self.by_key[key] = self._add(key, lat, lon, address)
+
+    def _add_place(self, loc):
+        lat, lon = loc.get("latitude"), loc.get("longitude")
+        if lat is None or lon is None:
+            return
+        context = set()
+        for field in ("admin1", "admin2", "admin3", "original_city_search"):
+            context.update(tokens(loc.get(field) or ""))
+        label = loc.get("name") or loc.get("ascii_name")
+        names = {_place_key(loc.get(f) or "") for f in ("name", "ascii_name")} - {""}
+        for name in names:
+            entry_id = self._add(name, float(lat), float(lon), label)
+            self.places[name].append((entry_id, context))
+
+    def load(self):
+        self._reset()
+        history = get_mongo_collection("geo_addresses").find(
+            {"GeocodeStatus": "EXACT"},
+            {"_id": 0, "OriginalAddress": 1, "Latitude": 1, "Longitude": 1}
+        )
+        for doc in history:
+            self.add_address(doc.get("OriginalAddress"), doc.get("Latitude"), doc.get("Longitude"))
+        history_count = len(self.keys)
+
+        projection = {"_id": 0, "name": 1, "ascii_name": 1, "latitude": 1, "longitude": 1,
+                      "admin1": 1, "admin2": 1, "admin3": 1, "original_city_search": 1}
+        for loc in get_mongo_collection("turkey_locations").find({}, projection):
+            self._add_place(loc)
+
+        self._loaded_at = time.monotonic()
+        print(f"🗂️ Local geocoder hazır: {history_count} adres, {len(self.keys) - history_count} yer adı")
+
+    def ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_sec:
+            return
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_sec:
+                try:
+                    self.load()
+                except Exception as e:
+                    print(f"⚠️ Local geocoder yüklenemedi ({e}); sadece TomTom kullanılacak.")
+                    self._loaded_at = time.monotonic()
+
+    # --- Arama ---
+
+    def _match_place(self, address):
+        """
+        'Ölüdeniz, Fethiye, Muğla' gibi sadece yer adından oluşan adresler:
+        ilk parça yer adıyla birebir eşleşmeli, kalan parçalar o yerin il/ilçe bilgisiyle uyumlu olmalı.
+        """
+        parts = [_place_key(p) for p in str(address).split(",")]
+        parts = [p for p in parts if p]
+        if not parts:
+            return None
+        head, rest = parts[0], set(" ".join(parts[1:]).split())
+
+        candidates = [entry_id for entry_id, context in self.places.get(head, []) if rest <= context]
+        if not candidates:
+            return None
+        if not self._is_unambiguous(candidates):
+            return None
+        return candidates[0], 100
+
+    def _is_unambiguous(self, entry_ids):
+        lat0, lon0 = self.coords[entry_ids[0]]
+        return all(
+            calculate_straight_line_distance(lat0, lon0, *self.coords[other]) / 1000 <= AMBIGUITY_KM
+            for other in entry_ids[1:]
+        )
+
+    def _match_fuzzy(self, key):
+        """Nadir token'ları paylaşan adaylar arasından token_sort_ratio ile en iyisi."""
+        shared = Counter()
+        for token in set(key.split()):
+            plist = self.postings.get(token)
+            if plist and len(plist) <= MAX_POSTINGS:
+                shared.update(plist)
+        if not shared:
+            return None
+
+        scored = sorted(
+            ((fuzz.token_sort_ratio(key, self.keys[entry_id]), entry_id)
+             for entry_id, _ in shared.most_common(MAX_CANDIDATES)),
+            reverse=True
+        )
+        best_score, best_id = scored[0]
+        if best_score < self.min_score:
+            return None
+        close = [entry_id for score, entry_id in scored if best_score - score < AMBIGUITY_MARGIN]
+        if not self._is_unambiguous(close):
+            return None
+        return best_id, best_score
+
+    def lookup(self, address):
+        """Eminse {'lat', 'lon', 'score', 'matched', 'method'}, değilse None."""
+        if not address:
+            return None
+        self.ensure_loaded()
+        key = fingerprint(address)
+        if not key:
+            return None
+
+        method, hit = "exact", None
+        if key in self.by_key:
+            hit = self.by_key[key], 100
+        if hit is None:
+            method, hit = "place", self._match_place(address)
+        if hit is None:
+            method, hit = "fuzzy", self._match_fuzzy(key)
+        if hit is None:
+            return None
+
+        entry_id, score = hit
+        lat, lon = self.coords[entry_id]
+        return {"lat": lat, "lon": lon, "score": score, "matched": self.labels[entry_id], "method": method}
@@ -0,0 +1,56 @@
+# geo/rekey_geo_addresses.py
+# Tek seferlik: mevcut geo_addresses kayıtlarına AddressKey (adres parmak izi) yazar.
+# Aynı parmak izine düşen kopyalardan en iyisi tutulur (EXACT > LOCAL > FAILED, sonra en yenisi), diğerleri silinir.
+#
+#   python rekey_geo_addresses.py            # uygula
+#   python rekey_geo_addresses.py --dry-run  # sadece raporla
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pymongo import UpdateOne, DeleteOne
+from address_fingerprint import fingerprint
+from tomtom_testv2 import format_address_for_search
+from utils.mongodb_utils import get_mongo_collection
+
+STATUS_RANK = {"EXACT": 3, "LOCAL": 2, "FAILED": 0}
+BATCH_SIZE = 1000
+
+
+def _rank(doc):
+    return STATUS_RANK.get(doc.get("GeocodeStatus"), 1), doc.get("LastUpdated") or datetime.min
+
+
+def rekey_geo_addresses(dry_run=False):
+    collection = get_mongo_collection("geo_addresses")
+    projection = {"OriginalAddress": 1, "AddressKey": 1, "GeocodeStatus": 1, "LastUpdated": 1}
+
+    groups = defaultdict(list)
+    for doc in collection.find({}, projection):
+        address = doc.get("OriginalAddress") or ""
+        key = fingerprint(address) or format_address_for_search(address)
+        groups[key].append(doc)
+
+    ops, rekeyed, removed = [], 0, 0
+    for key, docs in groups.items():
+        docs.sort(key=_rank, reverse=True)
+        keep, duplicates = docs[0], docs[1:]
+        if keep.get("AddressKey") != key:
+            ops.append(UpdateOne({"_id": keep["_id"]}, {"$set": {"AddressKey": key}}))
+            rekeyed += 1
+        for dup in duplicates:
+            ops.append(DeleteOne({"_id": dup["_id"]}))
+            removed += 1
+
+    total = sum(len(docs) for docs in groups.values())
+    print(f"🔑 {total} kayıt → {len(groups)} parmak izi ({rekeyed} güncellenecek, {removed} kopya silinecek)")
+    if dry_run or not ops:
+        return
+
+    for i in range(0, len(ops), BATCH_SIZE):
+        collection.bulk_write(ops[i:i + BATCH_SIZE], ordered=False)
+    collection.create_index("AddressKey", name="idx_address_key")
+    print("✅ geo_addresses yeniden anahtarlandı.")
+
+
+if __name__ == "__main__":
+    rekey_geo_addresses(dry_run="--dry-run" in sys.argv)
@@ -0,0 +1,76 @@
+# geo/retry_worker.py
+import os
+import threading
+import traceback
+from geocoder import MongoGeoCoder
+from distance_calculator import MongoDistanceCalculator
+from utils.mongodb_utils import get_mongo_collection
+
+RETRY_INTERVAL_SEC = int(os.getenv("GEO_RETRY_INTERVAL_SEC", "60"))
+RETRY_BATCH_SIZE = int(os.getenv("GEO_RETRY_BATCH_SIZE", "20"))
+RETRY_RPS = float(os.getenv("GEO_RETRY_RPS", "2"))  # TomTom limitinin altında kalmak için saniyedeki istek
+
+SOURCE_COLLECTIONS = ["elife_rides", "wt_rides", "calendar_tasks"]
+GEO_FAILED = {"GeoStatus": {"$in": ["Pickup Failed", "Dropoff Failed"]}}
+
+
+class NegativeCacheRetryWorker(threading.Thread):
+    """
+    geo_addresses / distance_cache'teki süresi dolmuş negatif kayıtları arka planda tekrar dener.
+    Enrichment döngüsünü bloklamaz; düzelen adres/rotayı kullanan başarısız kayıtlar yeniden kuyruğa alınır
+    (GeoStatus boşaltılır, bir sonraki turda cache'ten zenginleşirler).
+    """
+
+    def __init__(self, interval=RETRY_INTERVAL_SEC, batch_size=RETRY_BATCH_SIZE, rps=RETRY_RPS):
+        super().__init__(name="geo-retry-worker", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = 1.0 / rps if rps > 0 else 0
+        self.geo = MongoGeoCoder(use_local=False)
+        self.dist = MongoDistanceCalculator()
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def requeue_failed_records(self, address_keys=(), routes=()):
+        """
+        Sadece bu turda düzelen adres/rotaları kullanan başarısız kayıtları yeniden kuyruğa alır.
+        Adresler geocoder ile aynı anahtara (parmak izi) çevrilerek eşleştirilir; rotalar koordinatların
+        birebir eşitliğiyle (enrichment pickup -> dropoff rotasını cache'e bu değerlerle yazar).
+        """
+        address_keys = set(address_keys)
+        route_filters = [
+            {"DistanceStatus": "Failed", "Pickup_lat": s_lat, "Pickup_lon": s_lon, "Dropoff_lat": e_lat, "Dropoff_lon": e_lon}
+            for s_lat, s_lon, e_lat, e_lon in routes
+        ]
+        total = 0
+        for name in SOURCE_COLLECTIONS:
+            collection = get_mongo_collection(name)
+            ids = []
+            if address_keys:
+                for rec in collection.find(GEO_FAILED, {"Pickup": 1, "Dropoff": 1}):
+                    if any(rec.get(f) and self.geo.address_key(rec[f]) in address_keys for f in ("Pickup", "Dropoff")):
+                        ids.append(rec["_id"])
+            if route_filters:
+                ids += [rec["_id"] for rec in collection.find({"$or": route_filters}, {"_id": 1})]
+            if ids:
+                total += collection.update_many({"_id": {"$in": ids}}, {"$set": {"GeoStatus": ""}}).modified_count
+        return total
+
+    def run_once(self):
+        geo_recovered = self.geo.retry_failed(limit=self.batch_size, pause=self.pause)
+        route_recovered = self.dist.retry_failed(limit=self.batch_size, pause=self.pause)
+        if geo_recovered or route_recovered:
+            requeued = self.requeue_failed_records(geo_recovered, route_recovered)
+            print(f"♻️ Retry worker: {len(geo_recovered)} adres, {len(route_recovered)} rota düzeldi; {requeued} kayıt yeniden kuyrukta")
+        return len(geo_recovered), len(route_recovered)
+
+    def run(self):
+        print(f"♻️ Retry worker started (interval={self.interval}s, batch={self.batch_size})")
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️ Retry worker error: {e}\n{traceback.format_exc()}")
+            self._stop_event.wait(self.interval)
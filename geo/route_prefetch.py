@@ -0,0 +1,106 @@
+# geo/route_prefetch.py
+import os
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from distance_calculator import MongoDistanceCalculator
+from utils.mongodb_utils import get_mongo_collection
+from utils.road_estimator import RoadEstimator
+from utils import match_rules
+
+PREFETCH_INTERVAL_SEC = int(os.getenv("ROUTE_PREFETCH_INTERVAL_SEC", "120"))
+PREFETCH_BATCH_SIZE = int(os.getenv("ROUTE_PREFETCH_BATCH_SIZE", "50"))
+PREFETCH_RPS = float(os.getenv("ROUTE_PREFETCH_RPS", "1"))  # düşük öncelik: enrichment'tan daha yavaş
+PREFETCH_LOOKBACK_HOURS = 24
+MATCH_SOURCE = "match_finder"  # matcher distance_cache'e bu Source ile bakar
+
+RIDE_FIELDS = {"_id": 0, "ID": 1, "ride_datetime": 1, "Duration_seconds": 1,
+               "Pickup_lat": 1, "Pickup_lon": 1, "Dropoff_lat": 1, "Dropoff_lon": 1}
+TASK_FIELDS = {"_id": 0, "ID": 1, "Transfer_Datetime": 1, "Duration_seconds": 1,
+               "Pickup_lat": 1, "Pickup_lon": 1}
+
+
+class RoutePrefetchWorker(threading.Thread):
+    """
+    Matcher'ın bir sonraki cycle'da soracağı boş gidiş rotalarını (ride dropoff -> aday pickup)
+    match_rules ile tahmin eder ve distance_cache'i arka planda, düşük hızda doldurur.
+    Sadece matcher'ın gerçekten API'ye gideceği çiftler ısıtılır: hotspot matrisinde olanlar ve
+    tahmin modelinin net karar verdiği çiftler atlanır.
+    """
+
+    def __init__(self, interval=PREFETCH_INTERVAL_SEC, batch_size=PREFETCH_BATCH_SIZE, rps=PREFETCH_RPS):
+        super().__init__(name="route-prefetch-worker", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = 1.0 / rps if rps > 0 else 0
+        self.dist = MongoDistanceCalculator()
+        self.estimator = RoadEstimator()
+        self.known = set()  # cache'te olduğu doğrulanan çiftler (tekrar sorgulanmaz)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def load_active_records(self):
+        since = datetime.now() - timedelta(hours=PREFETCH_LOOKBACK_HOURS)
+        rides = list(get_mongo_collection("enriched_rides").find({
+            "Status": {"$ne": "REMOVED"},
+            "GeoStatus": {"$ne": None},
+            "DistanceStatus": {"$ne": None},
+            "ride_datetime": {"$gte": since}
+        }, RIDE_FIELDS))
+        calendar = list(get_mongo_collection("calendar_tasks").find({
+            "API_Status": "needsAction",
+            "Status": {"$ne": "REMOVED"},
+            "GeoStatus": {"$ne": None},
+            "DistanceStatus": {"$ne": None},
+            "Transfer_Datetime": {"$gte": since}
+        }, TASK_FIELDS))
+        return rides, calendar
+
+    def pending_routes(self, rides, calendar):
+        """Cache'te olmayan, matcher'ın API'ye soracağı çiftler; en yakın ride önce."""
+        pending = {}
+        for ride, candidate, _, wait_min, _ in match_rules.candidate_pairs(rides, calendar):
+            # distance_cache anahtarı koordinatların birebir eşitliği; matcher'ın göreceği değerler kullanılır
+            start = (ride['Dropoff_lat'], ride['Dropoff_lon'])
+            end = (candidate['Pickup_lat'], candidate['Pickup_lon'])
+            pair = (start, end)
+            if pair in self.known or pair in pending:
+                continue
+            if self.dist.lookup_hotspot(*start, *end):
+                continue
+            estimate = self.estimator.estimate(start, end)
+            if match_rules.route_decision(estimate, wait_min) != "route":
+                continue
+            pending[pair] = ride['ride_datetime']
+        return sorted(pending, key=pending.get)
+
+    def run_once(self):
+        if len(self.known) > 100_000:
+            self.known.clear()
+        rides, calendar = self.load_active_records()
+        pairs = self.pending_routes(rides, calendar)
+        fetched = 0
+        for start, end in pairs:
+            if fetched >= self.batch_size or self._stop_event.is_set():
+                break
+            exists, _ = self.dist.is_cached_or_failed(*start, *end, MATCH_SOURCE)
+            if not exists:
+                self.dist.calculate_and_cache(*start, *end, MATCH_SOURCE)
+                fetched += 1
+                time.sleep(self.pause)
+            self.known.add((start, end))
+        if fetched:
+            print(f"🚚 Route prefetch: {fetched} routes cached ({len(pairs) - fetched} pending)")
+        return fetched
+
+    def run(self):
+        print(f"🚚 Route prefetch worker started (interval={self.interval}s, batch={self.batch_size})")
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️ Route prefetch error: {e}\n{traceback.format_exc()}")
+            self._stop_event.wait(self.interval)
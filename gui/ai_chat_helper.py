@@ -3,7 +3,8 @@
 import streamlit as st
 import requests
 import pandas as pd
-from utils.mongodb_utils import get_mongo_collection
+from data_layer import load_ai_records, collection_version
+from ai_retriever import BM25Index, build_stats, select_context
 import json
 from test_deepseek1 import ask_deepseek
 from datetime import datetime
@@ -15,44 +16,36 @@ def load_filtered_data(collection_name, start_dt, end_dt):
     if not collection_name:
         return []  # 🛡️ No collection selected, no data
 
-    collection = get_mongo_collection(collection_name)
-    query = {}
-
-    if collection_name == "match_data":
-        query = {
-            "MatchStatus": "Active",
-            "Ride_Time": {"$gte": start_dt, "$lte": end_dt}
-        }
-    elif collection_name == "calendar_tasks":
-        query = {
-            "Status": "ACTIVE",
-            "Transfer_Datetime": {"$gte": start_dt, "$lte": end_dt}
-        }
-    elif collection_name in ["wt_rides", "elife_rides", "enriched_rides"]:
-        query = {
-            "Status": "ACTIVE",
-            "ride_datetime": {"$gte": start_dt, "$lte": end_dt}
-        }
-    else:
-        query = {"Status": "ACTIVE"}
-
-    docs = list(collection.find(query))
-    return docs
+    # Sohbet mesajı başına rerun olur; sorgu data_layer'da önbelleklenir
+    return load_ai_records(collection_name, start_dt, end_dt)
 
 # ----------------------------
 # 🧠 Data Summarizer for Prompt
 # ----------------------------
-def summarize_documents(docs, collection_name):
-    summaries = []
+def summarize_document(doc, collection_name):
+    if collection_name == "match_data":
+        return f"Pickup: {doc.get('Pickup', '')} ➔ Dropoff: {doc.get('Dropoff', '')}, Ride_Time: {doc.get('Ride_Time', '')}, Match_Time: {doc.get('Match_Time', '')}, Time Diff (min): {doc.get('Time_Difference_min', '')}, Distance (km): {doc.get('Real_Distance_km', '')}, Direction: {doc.get('Match_Direction', '')}"
+    return f"Pickup: {doc.get('Pickup', '')} ➔ Dropoff: {doc.get('Dropoff', '')}, Transfer Time: {doc.get('Transfer_Datetime', doc.get('ride_datetime', ''))}, Distance: {doc.get('Distance', '')}, Duration: {doc.get('Duration', '')}, Notes: {doc.get('Notes', '')}, Price: {doc.get('Price', '')}"
 
-    for doc in docs:
-        if collection_name == "match_data":
-            summary = f"Pickup: {doc.get('Pickup', '')} ➔ Dropoff: {doc.get('Dropoff', '')}, Ride_Time: {doc.get('Ride_Time', '')}, Match_Time: {doc.get('Match_Time', '')}, Time Diff (min): {doc.get('Time_Difference_min', '')}, Distance (km): {doc.get('Real_Distance_km', '')}, Direction: {doc.get('Match_Direction', '')}"
-        else:
-            summary = f"Pickup: {doc.get('Pickup', '')} ➔ Dropoff: {doc.get('Dropoff', '')}, Transfer Time: {doc.get('Transfer_Datetime', doc.get('ride_datetime', ''))}, Distance: {doc.get('Distance', '')}, Duration: {doc.get('Duration', '')}, Notes: {doc.get('Notes', '')}, Price: {doc.get('Price', '')}"
-        summaries.append(summary)
 
-    return "\n".join(summaries)
+# ----------------------------
+# 🔎 Retrieval Index (BM25, koleksiyon versiyonu değişene kadar önbellekte)
+# ----------------------------
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_retrieval_index(collection_name, start_dt, end_dt, version):
+    docs = load_filtered_data(collection_name, start_dt, end_dt)
+    index = BM25Index(summarize_document(doc, collection_name) for doc in docs)
+    return index, build_stats(docs, collection_name)
+
+
+def build_context(collection_name, start_dt, end_dt, question):
+    """Soruya göre sadece ilgili satırlar + genel istatistik (token bütçesi dahilinde)."""
+    index, stats_text = get_retrieval_index(
+        collection_name, start_dt, end_dt, collection_version(collection_name)
+    )
+    if not index.texts:
+        return None
+    return select_context(index, question, stats_text)
 
 # ----------------------------
 # 🧠 Smart Prompt Builder
@@ -113,12 +106,12 @@ def build_ask_ai_tab(start_dt, end_dt):
     collection_selected = st.selectbox("Select a data collection (optional):", ["", "calendar_tasks", "wt_rides", "elife_rides", "enriched_rides", "match_data"])
 
     mongo_docs = []
-    mongo_summary = None
 
     if collection_selected:
-        mongo_docs = load_filtered_data(collection_selected, start_dt, end_dt)
-        if mongo_docs:
-            mongo_summary = summarize_documents(mongo_docs, collection_selected)
+        index, _ = get_retrieval_index(
+            collection_selected, start_dt, end_dt, collection_version(collection_selected)
+        )
+        mongo_docs = index.texts
 
     # Traffic Light Indicator
     show_traffic_light(collection_selected, mongo_docs)
@@ -140,7 +133,8 @@ def build_ask_ai_tab(start_dt, end_dt):
         # Add user message to history
         st.session_state.messages.append({"role": "user", "content": prompt})
 
-        # Build full prompt
+        # Build full prompt — sadece soruyla ilgili kayıtlar
+        mongo_summary = build_context(collection_selected, start_dt, end_dt, prompt) if collection_selected else None
         full_prompt = build_prompt(st.session_state.messages[:-1], prompt, mongo_summary)
 
         # Call AI
@@ -0,0 +1,123 @@
+# 📦 ai_retriever.py — Ask AI için yerel BM25 arama ve token bütçesi (ağ gerektirmez)
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+TOP_K = int(os.getenv("ASK_AI_TOP_K", "40"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("ASK_AI_CONTEXT_TOKENS", "3000"))
+
+_TR_MAP = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Küçük harf + Türkçe karakter sadeleştirme; 'Fethiye'/'FETHİYE'/'fethiye' aynı token olur."""
+    text = str(text).replace("İ", "i").replace("I", "ı").casefold().translate(_TR_MAP)
+    return _TOKEN_RE.findall(text)
+
+
+def estimate_tokens(text):
+    # Kaba tahmin: ~4 karakter = 1 token
+    return len(text) // 4 + 1
+
+
+class BM25Index:
+    def __init__(self, texts, k1=1.5, b=0.75):
+        self.texts = list(texts)
+        self.k1 = k1
+        self.b = b
+        self.doc_len = []
+        self.postings = defaultdict(list)  # term -> [(doc_idx, tf)]
+
+        for idx, text in enumerate(self.texts):
+            tokens = tokenize(text)
+            self.doc_len.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((idx, tf))
+
+        n = len(self.texts)
+        self.avgdl = (sum(self.doc_len) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in self.postings.items()
+        }
+
+    def search(self, query, k=TOP_K):
+        """[(doc_idx, score)] en alakalıdan başlayarak; eşleşme yoksa boş liste."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for idx, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[idx] / (self.avgdl or 1))
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:k]
+
+
+def select_context(index, query, stats_text="", k=TOP_K, token_budget=CONTEXT_TOKEN_BUDGET):
+    """
+    İstatistik özeti + sorguya en alakalı satırlar, token bütçesini aşmadan.
+    Sorgu hiçbir satırla eşleşmezse ilk k satır kullanılır.
+    """
+    hits = index.search(query, k)
+    ranked = [idx for idx, _ in hits] or list(range(min(k, len(index.texts))))
+
+    used = estimate_tokens(stats_text)
+    lines = []
+    for idx in ranked:
+        line = index.texts[idx]
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+
+    parts = []
+    if stats_text:
+        parts.append(f"Aggregate statistics:\n{stats_text}")
+    parts.append(f"Most relevant records ({len(lines)} of {len(index.texts)}):\n" + "\n".join(lines))
+    return "\n\n".join(parts)
+
+
+def build_stats(docs, collection_name):
+    """Tüm kayıtların kısa istatistiği (satırları prompt'a koymadan genel soruları yanıtlamak için)."""
+    if not docs:
+        return ""
+
+    time_field = "Ride_Time" if collection_name == "match_data" else (
+        "Transfer_Datetime" if collection_name == "calendar_tasks" else "ride_datetime"
+    )
+    times = [d.get(time_field) for d in docs if d.get(time_field)]
+    pickups = Counter(str(d.get("Pickup")) for d in docs if d.get("Pickup"))
+    dropoffs = Counter(str(d.get("Dropoff")) for d in docs if d.get("Dropoff"))
+
+    lines = [f"Total records: {len(docs)}"]
+    if times:
+        try:
+            lines.append(f"Time range: {min(times)} → {max(times)}")
+        except TypeError:
+            pass  # karışık tipler (str/datetime)
+    if pickups:
+        lines.append("Top pickups: " + ", ".join(f"{p} ({c})" for p, c in pickups.most_common(5)))
+    if dropoffs:
+        lines.append("Top dropoffs: " + ", ".join(f"{p} ({c})" for p, c in dropoffs.most_common(5)))
+
+    if collection_name == "match_data":
+        directions = Counter(str(d.get("Match_Direction")) for d in docs if d.get("Match_Direction"))
+        if directions:
+            lines.append("Match directions: " + ", ".join(f"{k} ({v})" for k, v in directions.most_common()))
+        for field, label in [("Real_Distance_km", "Avg distance (km)"), ("Time_Difference_min", "Avg time diff (min)")]:
+            values = []
+            for d in docs:
+                try:
+                    value = float(d.get(field))
+                except (TypeError, ValueError):
+                    continue
+                if not math.isnan(value):
+                    values.append(value)
+            if values:
+                lines.append(f"{label}: {sum(values) / len(values):.1f}")
+
+    return "\n".join(lines)
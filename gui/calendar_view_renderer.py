@@ -13,6 +13,7 @@ import pandas as pd
 from datetime import datetime, date, timedelta
 import calendar
 from utils.mongodb_utils import get_mongo_collection
+from data_layer import load_calendar_tasks, invalidate, collection_version
 import uuid
 
 
@@ -128,16 +129,45 @@ def _apply_calendar_styles():
 # ----------------------------
 # 📅 Calendar View - Day Columns
 # ----------------------------
-def render_day_columns(df, current_date):
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_week_html(start_of_week, today, data_key, _df):
+    """Haftanın 7 sütununu tek HTML parçası olarak üretir; (hafta, veri versiyonu) ile önbelleklenir."""
+    end_of_week = start_of_week + timedelta(days=6)
+    events_by_day = {}
+    if not _df.empty:
+        week = _df[(_df["Transfer_Date"] >= start_of_week) & (_df["Transfer_Date"] <= end_of_week)]
+        if not week.empty:
+            event_html = (
+                "<div class='calendar-event'><span class='event-time'>" + week["Event_Time"]
+                + "</span>" + week["Title"].fillna("").astype(str) + "</div>"
+            )
+            events_by_day = event_html.groupby(week["Transfer_Date"], sort=False).agg("".join).to_dict()
+
+    columns = []
+    for i in range(7):
+        day = start_of_week + timedelta(days=i)
+        is_today = day == today
+        columns.append(
+            f"<div class='day-column'>"
+            f"<div class='{'day-header today' if is_today else 'day-header'}'>"
+            f"{calendar.day_abbr[day.weekday()]}<br>"
+            f"<span class='{'day-number today' if is_today else 'day-number'}'>{day.day}</span>"
+            f"</div>"
+            f"{events_by_day.get(day, '')}"
+            f"</div>"
+        )
+    return "<div class='day-columns'>" + "".join(columns) + "</div>"
+
+
+def render_day_columns(df, current_date, data_key=None):
     _apply_calendar_styles()
 
     # Ensure current_date is a datetime.date object
     if isinstance(current_date, datetime):
         current_date = current_date.date()
 
-    # Get the start and end of the week
+    # Get the start of the week
     start_of_week = current_date - timedelta(days=current_date.weekday())
-    week_dates = [start_of_week + timedelta(days=i) for i in range(7)]
     today = date.today()
 
     # Calendar Header
@@ -167,39 +197,10 @@ def render_day_columns(df, current_date):
 
     st.markdown("</div></div>", unsafe_allow_html=True)
 
-    # Day columns
-    st.markdown("<div class='day-columns'>", unsafe_allow_html=True)
-
-    for day in week_dates:
-        # Convert day to date object for comparison
-        day_date = day.date() if isinstance(day, datetime) else day
-        day_events = df[df['Transfer_Date'] == day_date].sort_values('Transfer_Datetime')
-        day_class = "day-header today" if day_date == today else "day-header"
-
-        st.markdown(f"""
-        <div class='day-column'>
-            <div class='{day_class}'>
-                {calendar.day_abbr[day.weekday()]}<br>
-                <span class='{"day-number today" if day_date == today else "day-number"}'>
-                    {day.day}
-                </span>
-            </div>
-        """, unsafe_allow_html=True)
-
-        # Add events for this day
-        if not day_events.empty:
-            for _, event in day_events.iterrows():
-                event_time = pd.to_datetime(event['Transfer_Datetime']).strftime("%H:%M")
-                st.markdown(f"""
-                <div class='calendar-event'>
-                    <span class='event-time'>{event_time}</span>
-                    {event.get('Title', '')}
-                </div>
-                """, unsafe_allow_html=True)
-
-        st.markdown("</div>", unsafe_allow_html=True)
-
-    st.markdown("</div>", unsafe_allow_html=True)
+    # Day columns — tek markdown çağrısı
+    if data_key is None:
+        data_key = int(pd.util.hash_pandas_object(df, index=False).sum()) if not df.empty else 0
+    st.markdown(_build_week_html(start_of_week, today, data_key, df), unsafe_allow_html=True)
 
 
 # ----------------------------
@@ -220,6 +221,7 @@ def render_task_form(task_id=None):
 
         if task_id and st.button("🗑️ Delete Task", key="delete_task", type="secondary"):
             collection.delete_one({"Task_ID": task_id})
+            invalidate()
             st.success("Task deleted successfully!")
             st.rerun()
 
@@ -280,6 +282,7 @@ def render_task_form(task_id=None):
                 collection.insert_one(doc)
                 st.success(f"✅ New task created: {doc['ID']}")
 
+            invalidate()
             st.rerun()
 
         st.markdown("</div>", unsafe_allow_html=True)
@@ -308,17 +311,17 @@ def render_calendar_page(start_dt, end_dt):
     col1, col2 = st.columns([3, 1])
 
     with col1:
-        render_day_columns(df, st.session_state.week_start)
+        data_key = (collection_version("calendar_tasks"), start_dt, end_dt)
+        render_day_columns(df, st.session_state.week_start, data_key=data_key)
 
     with col2:
         # Display upcoming events
         st.subheader("📅 Upcoming Events")
-        upcoming = df[df['Transfer_Date'] >= date.today()].sort_values('Transfer_Datetime').head(5)
+        upcoming = df[df['Transfer_Date'] >= date.today()].head(5)  # df zaten tarihe göre sıralı
 
         if not upcoming.empty:
             for _, event in upcoming.iterrows():
-                event_time = pd.to_datetime(event['Transfer_Datetime']).strftime("%H:%M")
-                with st.expander(f"{event_time} - {event.get('Title', '')}"):
+                with st.expander(f"{event['Event_Time']} - {event.get('Title', '')}"):
                     st.write(f"**From:** {event.get('Pickup', '')}")
                     st.write(f"**To:** {event.get('Dropoff', '')}")
                     if event.get('Notes'):
@@ -339,13 +342,13 @@ def render_calendar_page(start_dt, end_dt):
 # 📂 Data Loading
 # ----------------------------
 def load_calendar_data(start_dt, end_dt):
-    collection = get_mongo_collection("calendar_tasks")
-    data = list(collection.find({
-        "Status": "ACTIVE",
-        "Transfer_Datetime": {"$gte": start_dt, "$lte": end_dt}
-    }))
-    df = pd.DataFrame(data)
-
-    if not df.empty:
-        df["Transfer_Date"] = pd.to_datetime(df["Transfer_Datetime"]).dt.date
+    df = load_calendar_tasks(start_dt, end_dt)
+    if df.empty:
+        return pd.DataFrame(columns=["Task_ID", "Title", "Transfer_Datetime", "Transfer_Date", "Event_Time"])
+
+    # Tarih/saat bir kez parse edilir; hafta görünümü ve yaklaşan etkinlikler bunu kullanır
+    df["Transfer_Datetime"] = pd.to_datetime(df["Transfer_Datetime"], errors="coerce")
+    df = df.dropna(subset=["Transfer_Datetime"]).sort_values("Transfer_Datetime").reset_index(drop=True)
+    df["Transfer_Date"] = df["Transfer_Datetime"].dt.date
+    df["Event_Time"] = df["Transfer_Datetime"].dt.strftime("%H:%M")
     return df
\ No newline at end of file
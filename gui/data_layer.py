@@ -0,0 +1,127 @@
+# 📦 data_layer.py — dashboard için önbellekli Mongo okumaları
+import os
+import sys
+import pandas as pd
+import streamlit as st
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.mongodb_utils import get_mongo_client
+from utils.mongo_stats import document_count, last_update, SYSTEM_COLLECTIONS
+from utils.dashboard_stats import load_stats
+from utils.plan_snapshots import load_latest, CHAINS_COLLECTION, PLANS_COLLECTION
+
+DATA_TTL_SEC = int(os.getenv("DASHBOARD_DATA_TTL_SEC", "300"))
+VERSION_TTL_SEC = int(os.getenv("DASHBOARD_VERSION_TTL_SEC", "10"))
+
+# Koleksiyonun değiştiğini anlamak için bakılan zaman alanı
+VERSION_FIELDS = dict(SYSTEM_COLLECTIONS)
+
+# Her sekmenin gerçekten gösterdiği kolonlar
+MATCH_COLUMNS = [
+    "Ride_ID", "Pickup", "Dropoff", "Ride_Time", "Ride_Arrival", "Price", "DoubleUtilized",
+    "Matched_Pickup", "Matched_Dropoff", "Match_Time", "Match_Arrival", "Matched_Price",
+    "Match_Direction", "CalendarMatchPair", "Match_Source",
+    "Time_Difference_min", "Real_Distance_km", "Real_Duration_min", "Distance_Source",
+]
+CALENDAR_COLUMNS = ["Task_ID", "Title", "Transfer_Datetime", "Pickup", "Dropoff", "Notes"]
+RIDES_COLUMNS = [
+    "ID", "Source", "Vehicle", "ride_datetime", "Pickup", "Dropoff", "Price",
+    "Distance", "Duration", "GeoStatus", "DistanceStatus", "Status", "FirstSeen", "LastSeen",
+]
+AI_COLUMNS = [
+    "Pickup", "Dropoff", "Ride_Time", "Match_Time", "Time_Difference_min", "Real_Distance_km",
+    "Match_Direction", "Transfer_Datetime", "ride_datetime", "Distance", "Duration", "Notes", "Price",
+]
+
+
+@st.cache_resource
+def get_db():
+    """Tüm oturumlar (dispatcher'lar) aynı MongoClient'ı paylaşır."""
+    return get_mongo_client()[os.getenv("MONGODB_DB_NAME")]
+
+
+@st.cache_data(ttl=VERSION_TTL_SEC, show_spinner=False)
+def collection_version(collection_name):
+    """Doküman sayısı + son güncelleme zamanı; değişince sorgu cache'i geçersiz olur."""
+    field = VERSION_FIELDS.get(collection_name)
+    latest = last_update(collection_name, field, ttl=0) if field else None
+    return document_count(collection_name, ttl=0), str(latest)
+
+
+def invalidate():
+    """UI'dan yazım yapıldıktan sonra versiyonu hemen yeniden okut."""
+    collection_version.clear()
+
+
+@st.cache_data(ttl=DATA_TTL_SEC, show_spinner=False, max_entries=64)
+def _find(collection_name, query, columns, version):
+    projection = {"_id": 0, **{c: 1 for c in columns}}
+    return list(get_db()[collection_name].find(query, projection))
+
+
+def find_records(collection_name, query, columns):
+    return _find(collection_name, query, tuple(columns), collection_version(collection_name))
+
+
+def find_df(collection_name, query, columns):
+    return pd.DataFrame(find_records(collection_name, query, columns))
+
+
+# ----------------------------
+# Sekme sorguları
+# ----------------------------
+def load_match_data(start_dt, end_dt):
+    return find_df("match_data", {
+        "MatchStatus": "Active",
+        "Ride_Time": {"$gte": start_dt, "$lte": end_dt}
+    }, MATCH_COLUMNS)
+
+
+def load_calendar_tasks(start_dt, end_dt):
+    return find_df("calendar_tasks", {
+        "Status": "ACTIVE",
+        "Transfer_Datetime": {"$gte": start_dt, "$lte": end_dt}
+    }, CALENDAR_COLUMNS)
+
+
+def load_rides_data(start_dt, end_dt):
+    return find_df("enriched_rides", {
+        "Status": "ACTIVE",
+        "ride_datetime": {"$gte": start_dt, "$lte": end_dt}
+    }, RIDES_COLUMNS)
+
+
+@st.cache_data(ttl=VERSION_TTL_SEC * 3, show_spinner=False)
+def load_dashboard_stats(start_dt, end_dt):
+    """dashboard_stats günlük dokümanları, düz kolonlu DataFrame olarak (örn. 'rides.elife')."""
+    docs = load_stats(start_dt, end_dt)
+    if not docs:
+        return pd.DataFrame()
+    df = pd.json_normalize(docs).rename(columns={"_id": "Day"}).drop(columns=["updated_at"], errors="ignore")
+    return df.set_index("Day").fillna(0)
+
+
+@st.cache_data(ttl=VERSION_TTL_SEC * 3, show_spinner=False)
+def load_fleet_plans(start_dt, end_dt):
+    """fleet_plans (son cycle): gün başına araç sayısı/boş km ve araç güzergahları."""
+    return load_latest(PLANS_COLLECTION, start_dt.strftime("%Y-%m-%d"), end_dt.strftime("%Y-%m-%d"))
+
+
+@st.cache_data(ttl=VERSION_TTL_SEC * 3, show_spinner=False)
+def load_vehicle_chains(start_dt, end_dt):
+    """vehicle_chains (son cycle): gün başına en iyi iş zincirleri."""
+    return load_latest(CHAINS_COLLECTION, start_dt.strftime("%Y-%m-%d"), end_dt.strftime("%Y-%m-%d"))
+
+
+def ai_query(collection_name, start_dt, end_dt):
+    if collection_name == "match_data":
+        return {"MatchStatus": "Active", "Ride_Time": {"$gte": start_dt, "$lte": end_dt}}
+    if collection_name == "calendar_tasks":
+        return {"Status": "ACTIVE", "Transfer_Datetime": {"$gte": start_dt, "$lte": end_dt}}
+    if collection_name in ["wt_rides", "elife_rides", "enriched_rides"]:
+        return {"Status": "ACTIVE", "ride_datetime": {"$gte": start_dt, "$lte": end_dt}}
+    return {"Status": "ACTIVE"}
+
+
+def load_ai_records(collection_name, start_dt, end_dt):
+    return find_records(collection_name, ai_query(collection_name, start_dt, end_dt), AI_COLUMNS)
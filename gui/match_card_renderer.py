@@ -1,168 +1,199 @@
 # 📦 match_card_renderer.py
+import os
+import numpy as np
 import streamlit as st
 import pandas as pd
 
+PAGE_SIZE_OPTIONS = [10, 25, 50]
+DEFAULT_PAGE_SIZE = int(os.getenv("DASHBOARD_MATCH_PAGE_SIZE", "25"))
+
+MATCH_CARD_CSS = """
+<style>
+.ride-group {
+    display: flex;
+    flex-direction: column;
+    gap: 40px;
+    margin-bottom: 60px;
+    overflow-x: auto;
+    width: 100%;
+    padding-top: 10px;
+    padding-left: 12px;
+}
+.ride-row {
+    display: inline-flex;
+    flex-direction: row;
+    align-items: stretch;
+    gap: 16px;
+    padding-bottom: 12px;
+    min-width: max-content;
+}
+.ride-box, .match-box {
+    background-color: #111522;
+    border-radius: 15px;
+    padding: 24px 16px 20px;
+    color: white;
+    font-family: monospace;
+    box-shadow: 0 0 14px #00ccff;
+    width: 280px;
+    position: relative;
+    min-height: 190px;
+    flex-shrink: 0;
+    display: flex;
+    flex-direction: column;
+    justify-content: space-between;
+}
+.calendar-badge {
+    position: absolute;
+    top: -12px;
+    right: -12px;
+    background-color: #ffaa00;
+    padding: 4px 10px;
+    border-radius: 12px 0 12px 0;
+    font-size: 11px;
+    font-weight: bold;
+    box-shadow: 0 0 5px rgba(0,0,0,0.4);
+    z-index: 10;
+}
+.match-info {
+    font-size: 13px;
+    background-color: #222;
+    padding: 8px;
+    margin-top: 6px;
+    border-left: 3px solid #00ccff;
+    border-radius: 8px;
+}
+.direction-label {
+    margin-top: 5px;
+    font-weight: bold;
+    color: #ddd;
+}
+.direction-label.bright {
+    color: #ffcc00;
+}
+.source-icon {
+    position: absolute;
+    top: -12px;
+    left: -12px;
+    background-color: #0077cc;
+    padding: 4px 10px;
+    border-radius: 0 12px 0 12px;
+    font-size: 11px;
+    font-weight: bold;
+    box-shadow: 0 0 5px rgba(0,0,0,0.4);
+    z-index: 10;
+}
+.ride-title {
+    color: #00ccff;
+    font-weight: bold;
+    font-size: 15px;
+    margin-bottom: 4px;
+    word-wrap: break-word;
+}
+.sub {
+    font-size: 13px;
+    margin-top: 2px;
+}
+.arrow-connector {
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    width: 30px;
+    font-size: 20px;
+    color: #00ccff;
+}
+</style>
+"""
+
+
+def _col(df, name, default=""):
+    """Kolon yoksa ya da boşsa default ile doldurulmuş string Series döndürür."""
+    if name not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[name].where(df[name].notna(), default).astype(str)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_page_html(page_df: pd.DataFrame) -> str:
+    """Bir sayfadaki tüm ride grupları için HTML (satır döngüsü yok, Series işlemleri)."""
+    direction = _col(page_df, "Match_Direction")
+    idx = page_df.index
+    direction_class = pd.Series(np.where(direction.str.strip().str.lower() == "home return", "bright", ""), index=idx)
+
+    calendar_pair = _col(page_df, "CalendarMatchPair")
+    has_pair = (calendar_pair != "") & (calendar_pair.str.lower() != "nan")
+    calendar_badge = pd.Series(np.where(has_pair, "<div class='calendar-badge'>📅 " + calendar_pair + "</div>", ""), index=idx)
+
+    # Rota yerine tahmin/kuş uçuşu kullanılan mesafeler '≈' ile işaretlenir
+    estimated = _col(page_df, "Distance_Source").isin(["estimate", "geodesic"])
+    approx = pd.Series(np.where(estimated, "≈", ""), index=idx)
+
+    source = _col(page_df, "Match_Source").str.lower()
+    source_icon = pd.Series(np.select(
+        [source == "calendar", source == "rides"],
+        ["<div class='source-icon'>📅</div>", "<div class='source-icon'>🚗</div>"],
+        default=""
+    ), index=idx)
+
+    match_html = (
+        "<div class='arrow-connector'>➝</div>"
+        "<div class='match-box'>"
+        "<div class='ride-title'>⇣ Match ➔ " + _col(page_df, "Matched_Pickup") + " ➜ " + _col(page_df, "Matched_Dropoff") + "</div>"
+        "<div class='match-info'>"
+        "🕒 " + _col(page_df, "Match_Time") + " ➔ " + _col(page_df, "Match_Arrival") + "<br>"
+        "💰 " + _col(page_df, "Matched_Price", "₺N/A") + " | ⏱️ " + _col(page_df, "Time_Difference_min")
+        + " min | 📍 " + approx + _col(page_df, "Real_Distance_km") + " km | 🚘 " + approx + _col(page_df, "Real_Duration_min") + " min"
+        "</div>"
+        "<div class='direction-label " + direction_class + "'>[" + direction + "]</div>"
+        + calendar_badge + source_icon +
+        "</div>"
+    )
+    matches_by_ride = match_html.groupby(page_df["Ride_ID"], sort=False).agg("".join)
+
+    base = page_df.drop_duplicates("Ride_ID").set_index("Ride_ID")
+    double_used = base["DoubleUtilized"].fillna(False).astype(bool) if "DoubleUtilized" in base.columns \
+        else pd.Series(False, index=base.index)
+    double_str = pd.Series(np.where(double_used, "✅ Double Used", "❌ Single Use"), index=base.index)
+
+    ride_html = (
+        "<div class='ride-group'><div class='ride-row'>"
+        "<div class='ride-box'>"
+        "<div class='ride-title'>🚗 " + _col(base, "Pickup", "?") + " ➜ " + _col(base, "Dropoff", "?") + "</div>"
+        "<div class='sub'>🕒 " + _col(base, "Ride_Time") + " ➔ " + _col(base, "Ride_Arrival") + "</div>"
+        "<div class='sub'>💰 " + _col(base, "Price", "₺N/A") + " | " + double_str + "</div>"
+        "</div>"
+        + matches_by_ride.reindex(base.index, fill_value="") +
+        "</div></div>"
+    )
+    return "".join(ride_html)
+
+
+def _page_controls(total_rides: int):
+    col1, col2, col3 = st.columns([1, 1, 3])
+    with col1:
+        default_idx = PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE) if DEFAULT_PAGE_SIZE in PAGE_SIZE_OPTIONS else 1
+        page_size = st.selectbox("Rides per page", PAGE_SIZE_OPTIONS, index=default_idx, key="match_page_size")
+    page_count = max(1, -(-total_rides // page_size))
+    with col2:
+        # Filtre değişip sayfa sayısı azaldıysa son sayfaya çek
+        st.session_state.setdefault("match_page", 1)
+        st.session_state.match_page = min(st.session_state.match_page, page_count)
+        page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="match_page")
+    with col3:
+        st.caption(f"{total_rides} rides • page {page}/{page_count}")
+    return int(page), page_size
+
+
 def render_match_cards(df: pd.DataFrame, as_cards: bool = True):
     if not as_cards:
         st.dataframe(df, use_container_width=True, height=600)
         return
 
-    grouped = df.groupby("Ride_ID")
-
-    st.markdown("""
-    <style>
-    .ride-group {
-        display: flex;
-        flex-direction: column;
-        gap: 40px;
-        margin-bottom: 60px;
-        overflow-x: auto;
-        width: 100%;
-        padding-top: 10px;
-        padding-left: 12px;
-    }
-    .ride-row {
-        display: inline-flex;
-        flex-direction: row;
-        align-items: stretch;
-        gap: 16px;
-        padding-bottom: 12px;
-        min-width: max-content;
-    }
-    .ride-box, .match-box {
-        background-color: #111522;
-        border-radius: 15px;
-        padding: 24px 16px 20px;
-        color: white;
-        font-family: monospace;
-        box-shadow: 0 0 14px #00ccff;
-        width: 280px;
-        position: relative;
-        min-height: 190px;
-        flex-shrink: 0;
-        display: flex;
-        flex-direction: column;
-        justify-content: space-between;
-    }
-    .calendar-badge {
-        position: absolute;
-        top: -12px;
-        right: -12px;
-        background-color: #ffaa00;
-        padding: 4px 10px;
-        border-radius: 12px 0 12px 0;
-        font-size: 11px;
-        font-weight: bold;
-        box-shadow: 0 0 5px rgba(0,0,0,0.4);
-        z-index: 10;
-    }
-    .match-info {
-        font-size: 13px;
-        background-color: #222;
-        padding: 8px;
-        margin-top: 6px;
-        border-left: 3px solid #00ccff;
-        border-radius: 8px;
-    }
-    .direction-label {
-        margin-top: 5px;
-        font-weight: bold;
-        color: #ddd;
-    }
-    .direction-label.bright {
-        color: #ffcc00;
-    }
-    .source-icon {
-        position: absolute;
-        top: -12px;
-        left: -12px;
-        background-color: #0077cc;
-        padding: 4px 10px;
-        border-radius: 0 12px 0 12px;
-        font-size: 11px;
-        font-weight: bold;
-        box-shadow: 0 0 5px rgba(0,0,0,0.4);
-        z-index: 10;
-    }
-    .ride-title {
-        color: #00ccff;
-        font-weight: bold;
-        font-size: 15px;
-        margin-bottom: 4px;
-        word-wrap: break-word;
-    }
-    .sub {
-        font-size: 13px;
-        margin-top: 2px;
-    }
-    .arrow-connector {
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        width: 30px;
-        font-size: 20px;
-        color: #00ccff;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-    for ride_id, group in grouped:
-        base = group.iloc[0]
-        pickup = base.get("Pickup", "?")
-        dropoff = base.get("Dropoff", "?")
-        ride_time = base.get("Ride_Time", "")
-        ride_arrival = base.get("Ride_Arrival", "")
-        price = base.get("Price", "₺N/A")
-        double_str = "✅ Double Used" if base.get("DoubleUtilized") else "❌ Single Use"
-
-        row_html = "<div class='ride-group'><div class='ride-row'>"
-
-        row_html += f"""
-        <div class='ride-box'>
-            <div class='ride-title'>🚗 {pickup} ➜ {dropoff}</div>
-            <div class='sub'>🕒 {ride_time} ➔ {ride_arrival}</div>
-            <div class='sub'>💰 {price} | {double_str}</div>
-        </div>
-        """
-
-        for _, row in group.iterrows():
-            matched_pickup = row.get("Matched_Pickup", "")
-            matched_dropoff = row.get("Matched_Dropoff", "")
-            match_time = row.get("Match_Time", "")
-            match_arrival = row.get("Match_Arrival", "")
-            matched_price = row.get("Matched_Price", "₺N/A")
-            direction = row.get("Match_Direction", "")
-            calendar_pair = row.get("CalendarMatchPair", "")
-            match_source = row.get("Match_Source", "")
-
-            diff = row.get("Time_Difference_min", "")
-            real_distance = row.get("Real_Distance_km", "")
-            real_duration = row.get("Real_Duration_min", "")
-
-            row_html += "<div class='arrow-connector'>➝</div>"
-
-            direction_class = "bright" if direction.strip().lower() == "home return" else ""
-
-            match_box = f"""
-            <div class='match-box'>
-                <div class='ride-title'>⇣ Match ➔ {matched_pickup} ➜ {matched_dropoff}</div>
-                <div class='match-info'>
-                    🕒 {match_time} ➔ {match_arrival}<br>
-                    💰 {matched_price} | ⏱️ {diff} min | 📍 {real_distance} km | 🚘 {real_duration} min
-                </div>
-                <div class='direction-label {direction_class}'>[{direction}]</div>
-            """
-
-            if calendar_pair and str(calendar_pair).lower() != "nan":
-                match_box += f"<div class='calendar-badge'>📅 {calendar_pair}</div>"
-
-            if match_source.lower() == "calendar":
-                match_box += "<div class='source-icon'>📅</div>"
-            elif match_source.lower() == "rides":
-                match_box += "<div class='source-icon'>🚗</div>"
-
-            match_box += "</div>"
-            row_html += match_box
-
-        row_html += "</div></div>"
-        st.markdown(row_html, unsafe_allow_html=True)
+    # Sadece görünen sayfadaki ride grupları HTML'e çevrilip tarayıcıya gönderilir
+    ride_ids = np.sort(df["Ride_ID"].dropna().unique())
+    page, page_size = _page_controls(len(ride_ids))
+    page_ids = ride_ids[(page - 1) * page_size: page * page_size]
+
+    page_df = df[df["Ride_ID"].isin(page_ids)].sort_values("Ride_ID", kind="stable")
+
+    st.markdown(MATCH_CARD_CSS, unsafe_allow_html=True)
+    st.markdown(_build_page_html(page_df), unsafe_allow_html=True)
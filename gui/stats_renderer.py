@@ -0,0 +1,84 @@
+# 📦 stats_renderer.py — dashboard_stats koleksiyonundan özet görünüm
+import streamlit as st
+import pandas as pd
+from data_layer import load_dashboard_stats, load_fleet_plans, load_vehicle_chains
+
+
+def _group(df: pd.DataFrame, prefix: str) -> pd.DataFrame:
+    cols = [c for c in df.columns if c.startswith(prefix)]
+    return df[cols].rename(columns=lambda c: c[len(prefix):])
+
+
+def _total(df: pd.DataFrame, col: str) -> float:
+    return float(df[col].sum()) if col in df.columns else 0.0
+
+
+def render_overview(start_dt, end_dt):
+    df = load_dashboard_stats(start_dt, end_dt)
+    if df.empty:
+        st.warning("No aggregated stats for this date range yet.")
+        return
+
+    rides_by_source = _group(df, "rides.")
+    directions = _group(df, "matches.direction.")
+
+    total_matches = _total(df, "matches.total")
+    double_rate = _total(df, "matches.double_utilized") / total_matches * 100 if total_matches else 0
+    km_count = _total(df, "matches.empty_km_count")
+    avg_empty_km = _total(df, "matches.empty_km_sum") / km_count if km_count else 0
+    analysis_seconds = _total(df, "analysis.seconds")
+    analyzed = _total(df, "analysis.rides") + _total(df, "analysis.calendar")
+
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("🚗 Rides", int(rides_by_source.values.sum()))
+    c2.metric("🔗 Active Matches", int(total_matches))
+    c3.metric("♻️ Double Utilization", f"{double_rate:.1f}%")
+    c4.metric("📍 Avg Empty Return", f"{avg_empty_km:.1f} km")
+    c5.metric("🧠 Analyzed / min", f"{analyzed / (analysis_seconds / 60):.1f}" if analysis_seconds else "—")
+
+    if not rides_by_source.empty:
+        st.markdown("#### 🚗 Rides per day by source")
+        st.bar_chart(rides_by_source)
+
+    if not directions.empty:
+        st.markdown("#### 🧭 Match direction breakdown")
+        st.bar_chart(directions)
+
+    with st.expander("Daily table"):
+        st.dataframe(df, use_container_width=True)
+
+    render_fleet_plans(start_dt, end_dt)
+
+
+def _jobs_label(jobs):
+    return " → ".join(f"{j['Start']:%H:%M} {j.get('Pickup') or ''}".strip() for j in jobs)
+
+
+def render_fleet_plans(start_dt, end_dt):
+    """Match servisinin son cycle'da hesapladığı filo planı ve en iyi araç zincirleri."""
+    plans = load_fleet_plans(start_dt, end_dt)
+    chains = load_vehicle_chains(start_dt, end_dt)
+    if not plans and not chains:
+        return
+
+    if plans:
+        st.markdown("#### 🚐 Fleet plan (confirmed tasks + linked rides)")
+        summary = pd.DataFrame(plans).set_index("Day")[["Vehicles", "Job_count", "Empty_km", "Empty_min"]]
+        st.bar_chart(summary[["Vehicles"]])
+        st.dataframe(summary, use_container_width=True)
+        with st.expander("Vehicle itineraries"):
+            rows = [
+                {"Day": p["Day"], "Vehicle": v["Vehicle"], "Jobs": len(v["Jobs"]),
+                 "Empty_km": v["Empty_km"], "Wait_min": v["Wait_min"], "Route": _jobs_label(v["Jobs"])}
+                for p in plans for v in p["Itineraries"]
+            ]
+            st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+    if chains:
+        with st.expander("🔗 Best vehicle chains per day"):
+            rows = [
+                {"Day": c["Day"], "Rank": c["Rank"], "Score": c["Score"], "Revenue": c["Revenue"],
+                 "Empty_km": c["Empty_km"], "Jobs": len(c["Jobs"]), "Route": _jobs_label(c["Jobs"])}
+                for c in chains
+            ]
+            st.dataframe(pd.DataFrame(rows), use_container_width=True)
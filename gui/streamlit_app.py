@@ -8,6 +8,7 @@ from PIL import Image
 from datetime import datetime, timedelta
 from match_card_renderer import render_match_cards
 from calendar_view_renderer import  render_calendar_page
+from stats_renderer import render_overview
 
 
 
@@ -22,7 +23,8 @@ def image_to_base64(img):
 
 # 📍 PATH Settings
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.mongodb_utils import get_mongo_collection
+from utils.mongo_stats import system_status
+import data_layer
 from ai_chat_helper import build_ask_ai_tab  # 🚀 Importing new AI module
 
 # 📸 LOGO Settings
@@ -78,54 +80,26 @@ if start_date > end_date:
 start_dt = datetime.combine(start_date, datetime.min.time())
 end_dt = datetime.combine(end_date, datetime.max.time())
 
-# 📦 MongoDB Data Loaders (With Filter)
+# 📦 MongoDB Data Loaders (With Filter) — data_layer üzerinden önbellekli
 def load_match_data():
-    collection = get_mongo_collection("match_data")
-    data = list(collection.find({
-        "MatchStatus": "Active",
-        "Ride_Time": {"$gte": start_dt, "$lte": end_dt}
-    }))
-    return pd.DataFrame(data)
+    return data_layer.load_match_data(start_dt, end_dt)
 
 def load_calendar_tasks():
-    collection = get_mongo_collection("calendar_tasks")
-    data = list(collection.find({
-        "Status": "ACTIVE",
-        "Transfer_Datetime": {"$gte": start_dt, "$lte": end_dt}
-    }))
-    return pd.DataFrame(data)
+    return data_layer.load_calendar_tasks(start_dt, end_dt)
 
 def load_rides_data():
-    collection = get_mongo_collection("enriched_rides")
-    data = list(collection.find({
-        "Status": "ACTIVE",
-        "ride_datetime": {"$gte": start_dt, "$lte": end_dt}
-    }))
-    return pd.DataFrame(data)
+    return data_layer.load_rides_data(start_dt, end_dt)
 
 def load_system_status():
-    collections = {
-        "calendar_tasks": ("LastSeen", "calendar_tasks"),
-        "distance_cache": ("LastUpdated", "distance_cache"),
-        "elife_rides": ("LastSeen", "elife_rides"),
-        "enriched_rides": ("LastSeen", "enriched_rides"),
-        "geo_addresses": ("LastUpdated", "geo_addresses"),
-        "match_data": ("last_updated", "match_data"),
-        "wt_rides": ("LastSeen", "wt_rides"),
-    }
-
     status_data = []
     now = datetime.utcnow()
 
-    for name, (date_field, db_collection) in collections.items():
-        collection = get_mongo_collection(db_collection)
-        docs = list(collection.find({}, {date_field: 1}))
-        last_update = None
-        if docs:
-            dates = [doc.get(date_field) for doc in docs if doc.get(date_field)]
-            if dates:
-                last_update = max(pd.to_datetime(dates))
-        count = len(docs)
+    for row in system_status():
+        name = row["collection"]
+        count = row["count"]
+        last_update = pd.to_datetime(row["last_update"], errors="coerce") if row["last_update"] else None
+        if last_update is not None and pd.isna(last_update):
+            last_update = None
 
         if last_update:
             delta = now - last_update
@@ -144,7 +118,8 @@ def load_system_status():
     return pd.DataFrame(status_data)
 
 # 🗂️ Tabs Structure
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
+tab0, tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    "📊 Overview",
     "🚗 Match Data",
     "🗓️ Calendar Tasks",
     "🚛 Rides Data",
@@ -152,6 +127,11 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "🤖 Ask AI"
 ])
 
+# 📊 Overview Tab (dashboard_stats — önceden hesaplanmış günlük özet)
+with tab0:
+    st.subheader("📊 Overview")
+    render_overview(start_dt, end_dt)
+
 # 🚗 Match Data Tab
 with tab1:
     st.subheader("🚗 Match Data Overview")
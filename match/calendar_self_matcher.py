@@ -1,36 +1,69 @@
-from utils.mongodb_utils import get_mongo_collection
-from datetime import datetime
-from geopy.distance import geodesic
+from bisect import bisect_left, bisect_right
 from datetime import timedelta
+import numpy as np
+from utils.mongodb_utils import get_mongo_collection
+from utils import match_rules
+
 
+MAX_DISTANCE_KM = match_rules.MAX_DISTANCE_KM
+MAX_TIME_DIFF_MIN = match_rules.MAX_TIME_DIFF_MIN
 
-MAX_DISTANCE_KM = 20
-MAX_TIME_DIFF_MIN = 240
 
-def fetch_calendar_pairs():
+def load_active_calendar_tasks():
     col = get_mongo_collection("calendar_tasks")
-    tasks = list(col.find({
+    return list(col.find({
         "API_Status": "needsAction",
         "Status": {"$ne": "REMOVED"},
         "GeoStatus": {"$ne": None},
         "DistanceStatus": {"$ne": None}
     }))
 
+
+def _haversine_km(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 6371.0 * 2 * np.arcsin(np.sqrt(a))
+
+
+def fetch_calendar_pairs(tasks=None):
+    """
+    Calendar task'larının kendi aralarındaki ardışık çiftleri: {task_id: sonraki_task_title}.
+
+    Task'lar kalkış saatine göre sıralanır; her task için sadece varışından sonraki
+    MAX_TIME_DIFF_MIN penceresindeki task'lara bakılır (bisect) ve mesafe kontrolü pencere için
+    tek numpy çağrısıyla yapılır. Pencerede uygun olan en erken kalkışlı task (eşitlikte ID) seçilir.
+    tasks verilmezse aktif task'lar Mongo'dan okunur.
+    """
+    if tasks is None:
+        tasks = load_active_calendar_tasks()
+
+    valid = [
+        t for t in tasks
+        if t.get("Transfer_Datetime")
+        and match_rules.is_valid_coords(t.get("Pickup_lat"), t.get("Pickup_lon"))
+        and match_rules.is_valid_coords(t.get("Dropoff_lat"), t.get("Dropoff_lon"))
+    ]
+    valid.sort(key=lambda t: (t["Transfer_Datetime"], str(t["ID"])))
+    if not valid:
+        return {}
+
+    departures = [t["Transfer_Datetime"] for t in valid]
+    pickup_lats = np.array([t["Pickup_lat"] for t in valid], dtype=float)
+    pickup_lons = np.array([t["Pickup_lon"] for t in valid], dtype=float)
+
     pairs = {}
-    for i, t1 in enumerate(tasks):
-        for t2 in tasks[i + 1:]:
-            if t1["ID"] == t2["ID"]:
-                continue
-
-            dist = geodesic((t1["Dropoff_lat"], t1["Dropoff_lon"]),
-                            (t2["Pickup_lat"], t2["Pickup_lon"])).km
-            if dist > MAX_DISTANCE_KM:
-                continue
-
-            t1_arrival = t1["Transfer_Datetime"] + timedelta(seconds=t1.get("Duration_seconds", 0))
-            wait = (t2["Transfer_Datetime"] - t1_arrival).total_seconds() / 60
-            if 0 <= wait <= MAX_TIME_DIFF_MIN:
-                pairs[t1["ID"]] = t2["Title"]
+    for t1 in valid:
+        arrival = match_rules.calculate_arrival(t1["Transfer_Datetime"], t1.get("Duration_seconds", 0))
+        lo = bisect_left(departures, arrival)
+        hi = bisect_right(departures, arrival + timedelta(minutes=MAX_TIME_DIFF_MIN))
+        if lo >= hi:
+            continue
+
+        dist = _haversine_km(t1["Dropoff_lat"], t1["Dropoff_lon"], pickup_lats[lo:hi], pickup_lons[lo:hi])
+        for offset in np.flatnonzero(dist <= MAX_DISTANCE_KM):
+            t2 = valid[lo + offset]
+            if t2["ID"] != t1["ID"]:
+                pairs[t1["ID"]] = t2.get("Title")
                 break
 
     return pairs
@@ -0,0 +1,104 @@
+import heapq
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from utils.plan_snapshots import replace_snapshot, CHAINS_COLLECTION
+from job_graph import build_jobs, build_edges
+
+# Bir aracın art arda yapabileceği iş zincirleri (ride/task DAG'ı üzerinde dinamik programlama).
+# Skor = gelir - boş km * EMPTY_KM_COST. Her düğüm kendinde biten en iyi K zinciri tutar (k-best DP).
+TOP_K = int(os.getenv("CHAIN_TOP_K", "5"))
+EMPTY_KM_COST = float(os.getenv("CHAIN_EMPTY_KM_COST", "10"))
+CALENDAR_JOB_VALUE = float(os.getenv("CHAIN_CALENDAR_VALUE", "0"))
+DAY_START_HOUR = int(os.getenv("CHAIN_DAY_START_HOUR", "4"))  # gece geç biten işler önceki güne sayılır
+MIN_CHAIN_LENGTH = 2
+
+
+def service_day(job):
+    return (job["Start"] - timedelta(hours=DAY_START_HOUR)).date()
+
+
+def k_best_chains(jobs, edges, k=TOP_K, empty_km_cost=EMPTY_KM_COST):
+    """
+    best[j] = [(skor, ilk_iş, önceki_düğüm, önceki_sıra)] en iyi k zincir (skora göre azalan).
+    Düğümler zaman sırasında olduğundan (kenarlar hep ileri) tek geçiş yeterli: O((V + E) * k log k).
+    Zincirler tek bir servis gününün içinde kalır.
+    """
+    days = [service_day(job) for job in jobs]
+    incoming = defaultdict(list)   # j -> [(i, boş_km)]
+    for i, out in enumerate(edges):
+        for j, km, _, _ in out:
+            if days[i] == days[j]:
+                incoming[j].append((i, km))
+
+    best = []
+    for j, job in enumerate(jobs):
+        candidates = [(job["Revenue"], j, None, None)]  # zincir j ile başlar
+        for i, km in incoming[j]:
+            gain = job["Revenue"] - km * empty_km_cost
+            for rank, (score, first, _, _) in enumerate(best[i]):
+                candidates.append((score + gain, first, i, rank))
+        best.append(heapq.nlargest(k, candidates, key=lambda c: c[0]))
+    return best
+
+
+def _unwind(best, node, rank):
+    path = []
+    while node is not None:
+        path.append(node)
+        _, _, node, rank = best[node][rank]
+    return path[::-1]
+
+
+def top_chains_per_day(jobs, edges, best, k=TOP_K):
+    """Zincirin ilk işinin gününe göre en iyi k zincir; daha iyi bir zincirin alt kümesi olanlar atlanır."""
+    by_day = defaultdict(list)
+    for node, entries in enumerate(best):
+        for rank, (score, first, _, _) in enumerate(entries):
+            by_day[service_day(jobs[first])].append((score, node, rank))
+
+    leg_index = {(i, j): (km, minutes, wait) for i, out in enumerate(edges) for j, km, minutes, wait in out}
+    chains = []
+    for day, entries in sorted(by_day.items()):
+        entries.sort(key=lambda e: e[0], reverse=True)
+        picked = []
+        for score, node, rank in entries:
+            path = _unwind(best, node, rank)
+            if len(path) < MIN_CHAIN_LENGTH:
+                continue
+            nodes = set(path)
+            if any(nodes <= other for other in picked):
+                continue
+            picked.append(nodes)
+            legs = [leg_index[(a, b)] for a, b in zip(path, path[1:])]
+            chains.append({
+                "Day": day.isoformat(),
+                "Rank": len(picked),
+                "Score": round(score, 2),
+                "Revenue": round(sum(jobs[n]["Revenue"] for n in path), 2),
+                "Empty_km": round(sum(l[0] for l in legs), 2),
+                "Empty_min": round(sum(l[1] for l in legs)),
+                "Wait_min": round(sum(l[2] for l in legs)),
+                "Jobs": [
+                    {key: jobs[n][key] for key in ("ID", "Source", "Start", "End", "Pickup", "Dropoff", "Price")}
+                    for n in path
+                ],
+            })
+            if len(picked) >= k:
+                break
+    return chains
+
+
+def build_vehicle_chains(rides, calendar, route_lookup, k=TOP_K):
+    started = datetime.now()
+    jobs = build_jobs(rides, calendar, calendar_value=CALENDAR_JOB_VALUE)
+    edges = build_edges(jobs, route_lookup)
+    best = k_best_chains(jobs, edges, k=k)
+    chains = top_chains_per_day(jobs, edges, best, k=k)
+
+    replace_snapshot(CHAINS_COLLECTION, chains, started)
+
+    edge_count = sum(len(e) for e in edges)
+    seconds = (datetime.now() - started).total_seconds()
+    print(f"🔗 Vehicle chains: {len(chains)} chains from {len(jobs)} jobs / {edge_count} edges in {seconds:.1f}s")
+    return chains
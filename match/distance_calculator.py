@@ -1,10 +1,23 @@
+import time
 from datetime import datetime
 from tomtom_testv2 import calculate_route, format_duration, format_distance
 from utils.mongodb_utils import get_mongo_collection
+from utils.negative_cache import negative_fields, due_query, ensure_retry_index
+from utils.hotspot_matrix import HotspotMatrix
 
 class MongoDistanceCalculator:
     def __init__(self):
         self.collection = get_mongo_collection("distance_cache")
+        ensure_retry_index(self.collection, "Distance_meters")
+        # Merkezler arası (havalimanı, Fethiye, Ölüdeniz...) çiftler önceden hesaplanmış matristen gelir
+        self.hotspots = HotspotMatrix()
+
+    def lookup_hotspot(self, start_lat, start_lon, end_lat, end_lon):
+        hit = self.hotspots.lookup(start_lat, start_lon, end_lat, end_lon)
+        if not hit:
+            return None
+        distance, duration = round(hit[0]), round(hit[1])
+        return distance, duration, format_distance(distance), format_duration(duration)
 
     def is_cached_or_failed(self, start_lat, start_lon, end_lat, end_lon, source):
         key = {
@@ -17,7 +30,7 @@ class MongoDistanceCalculator:
         cached = self.collection.find_one(key)
         if cached:
             if cached.get("Distance_meters") is None:
-                return True, None  # failed entry, skip retry
+                return True, None  # failed entry; RetryAt gelince retry worker tekrar dener
             return True, cached
         return False, None
 
@@ -25,6 +38,10 @@ class MongoDistanceCalculator:
         if any(x is None for x in [start_lat, start_lon, end_lat, end_lon]):
             return None, None, None, None
 
+        hotspot = self.lookup_hotspot(start_lat, start_lon, end_lat, end_lon)
+        if hotspot:
+            return hotspot
+
         exists, cached_data = self.is_cached_or_failed(start_lat, start_lon, end_lat, end_lon, source)
         if exists:
             if cached_data:
@@ -61,7 +78,8 @@ class MongoDistanceCalculator:
                 'Distance_meters': None,
                 'Duration_seconds': None,
                 'Distance_display': None,
-                'Duration_display': None
+                'Duration_display': None,
+                **negative_fields()
             })
 
         self.collection.insert_one(new_entry)
@@ -72,6 +90,38 @@ class MongoDistanceCalculator:
             new_entry['Duration_display']
         )
 
+    def retry_failed(self, limit=20, pause=0.5):
+        """Süresi dolan başarısız rotaları tekrar hesaplar; düzelen (StartLat, StartLon, EndLat, EndLon) listesini döner."""
+        due = self.collection.find(
+            due_query({"Distance_meters": None}),
+            {"StartLat": 1, "StartLon": 1, "EndLat": 1, "EndLon": 1, "Attempts": 1}
+        ).sort("RetryAt", 1).limit(limit)
+
+        recovered = []
+        for entry in list(due):
+            result = calculate_route(
+                f"{entry['StartLat']},{entry['StartLon']}", f"{entry['EndLat']},{entry['EndLon']}"
+            )
+            if result:
+                distance, duration = result
+                self.collection.update_one({"_id": entry["_id"]}, {
+                    "$set": {
+                        'Distance_meters': distance,
+                        'Duration_seconds': duration,
+                        'Distance_display': format_distance(distance),
+                        'Duration_display': format_duration(duration),
+                        'LastUpdated': datetime.now()
+                    },
+                    "$unset": {"RetryAt": "", "Attempts": ""}
+                })
+                recovered.append((entry['StartLat'], entry['StartLon'], entry['EndLat'], entry['EndLon']))
+            else:
+                self.collection.update_one({"_id": entry["_id"]}, {
+                    "$set": {**negative_fields(entry.get("Attempts", 0)), 'LastUpdated': datetime.now()}
+                })
+            time.sleep(pause)
+        return recovered
+
     def enrich_record(self, record, source):
         if not all(k in record for k in ['Pickup_lat', 'Pickup_lon', 'Dropoff_lat', 'Dropoff_lon']):
             return record
@@ -0,0 +1,98 @@
+import os
+from collections import defaultdict
+from datetime import datetime
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from utils.plan_snapshots import replace_snapshot, PLANS_COLLECTION
+from utils import match_rules
+from job_graph import build_jobs, build_edges
+from chain_engine import service_day
+
+# Günlük iş kümesini (onaylı calendar task'ları + seçilen ride'lar) en az araçla, en az boş km ile kapatma.
+# Minimum path cover: her iş en fazla bir sonraki işe bağlanır (iki taraflı atama). Kurulan her bağlantı
+# bir aracı azaltır, bu yüzden önce bağlantı sayısı maksimize edilir, eşitlikte boş km minimize edilir.
+MAX_WAIT_MIN = int(os.getenv("FLEET_MAX_WAIT_MIN", str(match_rules.MAX_TIME_DIFF_MIN)))
+LINK_BONUS = 1_000_000  # tek bağlantı, toplam boş km'den her zaman daha değerli
+
+
+def assign_day(jobs, edges):
+    """
+    jobs/edges tek günün alt grafiği. Dönen değer: araç başına iş indeksleri listesi (zaman sırasında).
+    Maliyet matrisi n x n: kenar varsa boş_km - LINK_BONUS, yoksa 0 (bağlantı kurulmaz).
+    """
+    n = len(jobs)
+    if n == 0:
+        return []
+    cost = np.zeros((n, n))
+    for i, out in enumerate(edges):
+        for j, km, _, _ in out:
+            cost[i, j] = km - LINK_BONUS
+    rows, cols = linear_sum_assignment(cost)
+
+    successor = {}
+    for i, j in zip(rows, cols):
+        if cost[i, j] < 0:
+            successor[int(i)] = int(j)
+    has_predecessor = set(successor.values())
+
+    vehicles = []
+    for start in range(n):
+        if start in has_predecessor:
+            continue
+        path = [start]
+        while path[-1] in successor:
+            path.append(successor[path[-1]])
+        vehicles.append(path)
+    return vehicles
+
+
+def plan_fleet(jobs, route_lookup, max_wait_min=MAX_WAIT_MIN):
+    """Servis günü başına filo planı: araç sayısı, toplam boş km/dk ve araç güzergahları."""
+    by_day = defaultdict(list)
+    for job in jobs:
+        by_day[service_day(job)].append(job)
+
+    plans = []
+    for day, day_jobs in sorted(by_day.items()):
+        edges = build_edges(day_jobs, route_lookup, max_wait_min=max_wait_min)
+        legs = {(i, j): (km, minutes, wait) for i, out in enumerate(edges) for j, km, minutes, wait in out}
+
+        itineraries = []
+        for number, path in enumerate(assign_day(day_jobs, edges), start=1):
+            path_legs = [legs[(a, b)] for a, b in zip(path, path[1:])]
+            itineraries.append({
+                "Vehicle": number,
+                "Empty_km": round(sum(l[0] for l in path_legs), 2),
+                "Empty_min": round(sum(l[1] for l in path_legs)),
+                "Wait_min": round(sum(l[2] for l in path_legs)),
+                "Jobs": [
+                    {key: day_jobs[n][key] for key in ("ID", "Source", "Start", "End", "Pickup", "Dropoff", "Price")}
+                    for n in path
+                ],
+            })
+        plans.append({
+            "Day": day.isoformat(),
+            "Vehicles": len(itineraries),
+            "Job_count": len(day_jobs),
+            "Empty_km": round(sum(v["Empty_km"] for v in itineraries), 2),
+            "Empty_min": sum(v["Empty_min"] for v in itineraries),
+            "Itineraries": itineraries,
+        })
+    return plans
+
+
+def build_fleet_plans(rides, calendar, route_lookup):
+    """
+    calendar: onaylı task'lar (hepsi kapatılır). rides: plana alınacak ride'lar
+    (match_main'de bir calendar task'a bağlanan ride'lar).
+    """
+    started = datetime.now()
+    jobs = build_jobs(rides, calendar)
+    plans = plan_fleet(jobs, route_lookup)
+
+    replace_snapshot(PLANS_COLLECTION, plans, started)
+
+    vehicles = sum(p["Vehicles"] for p in plans)
+    seconds = (datetime.now() - started).total_seconds()
+    print(f"🚐 Fleet plan: {len(jobs)} jobs / {len(plans)} days -> {vehicles} vehicle-days in {seconds:.1f}s")
+    return plans
@@ -0,0 +1,149 @@
+import re
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+import numpy as np
+from utils.mongodb_utils import get_mongo_collection
+from utils.mongo_stats import ensure_index_once
+from utils.hotspot_matrix import HotspotMatrix, ROAD_FACTOR
+from utils.road_estimator import RoadEstimator
+from utils import match_rules
+
+# Ride/task'ların zamana göre sıralı iş grafiği (DAG). Kenar = bir aracın i işinden sonra
+# j işine yetişebilmesi (MatchFinder kuralları: bekleme penceresi, kuş uçuşu eşiği, boş gidiş süresi).
+# Zincirleme (chain_engine) ve filo ataması (fleet_assignment) bu grafiği kullanır.
+FALLBACK_SPEED_KMH = 50
+_NUMBER_RE = re.compile(r"\d[\d.,]*")
+
+
+def parse_price(value):
+    """'₺1.250,00', '1,250.00 TL', '950' -> float; okunamazsa 0."""
+    if isinstance(value, (int, float)):
+        return float(value) if value == value else 0.0
+    match = _NUMBER_RE.search(str(value or ""))
+    if not match:
+        return 0.0
+    number = match.group(0).rstrip(".,")
+    if "," in number and "." in number:
+        decimal = "," if number.rfind(",") > number.rfind(".") else "."
+        number = number.replace("." if decimal == "," else ",", "").replace(decimal, ".")
+    elif "," in number or "." in number:
+        sep = "," if "," in number else "."
+        head, _, tail = number.rpartition(sep)
+        # Tek ayırıcı + 3 hane (ve tekrar) binlik ayırıcıdır
+        number = number.replace(sep, "") if len(tail) == 3 else head.replace(sep, "") + "." + tail
+    try:
+        return float(number)
+    except ValueError:
+        return 0.0
+
+
+def build_jobs(rides, calendar, calendar_value=0.0):
+    """
+    Ride ve task'ları ortak iş kaydına çevirir, (kalkış, ID) sırasıyla döner.
+    Koordinatı eksik kayıtlar atlanır. Task'ların fiyatı olmadığından değeri calendar_value'dur.
+    """
+    jobs = []
+    for source, records, time_field in [("Rides", rides, "ride_datetime"), ("Calendar", calendar, "Transfer_Datetime")]:
+        for rec in records:
+            pickup = (rec.get("Pickup_lat"), rec.get("Pickup_lon"))
+            dropoff = (rec.get("Dropoff_lat"), rec.get("Dropoff_lon"))
+            start = rec.get(time_field)
+            if not start or not match_rules.is_valid_coords(*pickup) or not match_rules.is_valid_coords(*dropoff):
+                continue
+            jobs.append({
+                "ID": rec["ID"],
+                "Source": source,
+                "Start": start,
+                "End": match_rules.calculate_arrival(start, rec.get("Duration_seconds", 0)),
+                "Pickup": rec.get("Pickup"),
+                "Dropoff": rec.get("Dropoff"),
+                "pickup": pickup,
+                "dropoff": dropoff,
+                "Revenue": parse_price(rec.get("Price")) if source == "Rides" else calendar_value,
+                "Price": rec.get("Price"),
+            })
+    jobs.sort(key=lambda j: (j["Start"], j["End"], j["Source"], str(j["ID"])))
+    return jobs
+
+
+class RouteLookup:
+    """
+    Boş gidiş km/dk'sı, ağa çıkmadan: distance_cache (belleğe alınır) -> hotspot matrisi ->
+    öğrenilmiş tahmin -> kuş uçuşu. Grafik kurulurken kenar başına Mongo'ya gidilmez.
+    Runner'da tek örnek yaşar: ilk refresh() cache'i bir kez yükler, sonrakiler sadece
+    LastUpdated'ı son yüklemeden yeni kayıtları çeker. Hotspot/tahmin modelleri kendi
+    reload aralıklarıyla yenilenir.
+    """
+
+    def __init__(self, source="match_finder"):
+        self.source = source
+        self.cache = {}
+        self.loaded_until = None
+        self.hotspots = HotspotMatrix()
+        self.estimator = RoadEstimator()
+        ensure_index_once("distance_cache", [("Source", 1), ("LastUpdated", 1)])
+
+    def refresh(self):
+        query = {"Source": self.source, "Distance_meters": {"$ne": None}}
+        if self.loaded_until is not None:
+            query["LastUpdated"] = {"$gte": self.loaded_until}  # aynı anda yazılanlar kaçmasın
+        docs = get_mongo_collection("distance_cache").find(
+            query,
+            {"_id": 0, "StartLat": 1, "StartLon": 1, "EndLat": 1, "EndLon": 1,
+             "Distance_meters": 1, "Duration_seconds": 1, "LastUpdated": 1}
+        )
+        added = 0
+        for d in docs:
+            key = (d["StartLat"], d["StartLon"], d["EndLat"], d["EndLon"])
+            self.cache[key] = (d["Distance_meters"] / 1000, (d.get("Duration_seconds") or 0) / 60)
+            if d.get("LastUpdated") and (self.loaded_until is None or d["LastUpdated"] > self.loaded_until):
+                self.loaded_until = d["LastUpdated"]
+            added += 1
+        return added
+
+    def leg(self, start, end, geo_km):
+        hit = self.cache.get((*start, *end))
+        if hit:
+            return hit
+        hotspot = self.hotspots.lookup(*start, *end)
+        if hotspot:
+            return hotspot[0] / 1000, hotspot[1] / 60
+        estimate = self.estimator.estimate(start, end)
+        if estimate:
+            return estimate["km"], estimate["min"]
+        km = geo_km * ROAD_FACTOR
+        return km, km / FALLBACK_SPEED_KMH * 60
+
+
+def _haversine_km(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 6371.0 * 2 * np.arcsin(np.sqrt(a))
+
+
+def build_edges(jobs, route_lookup, max_wait_min=match_rules.MAX_TIME_DIFF_MIN,
+                max_geo_km=match_rules.MAX_DISTANCE_KM, max_road_km=match_rules.MAX_ROAD_KM):
+    """
+    edges[i] = [(j, boş_km, boş_dk, bekleme_dk)], sadece j > i (DAG).
+    Aday j'ler zaman penceresinden bisect ile, mesafe eşiği pencere için tek numpy çağrısıyla süzülür.
+    """
+    starts = [j["Start"] for j in jobs]
+    pickup_lats = np.array([j["pickup"][0] for j in jobs], dtype=float)
+    pickup_lons = np.array([j["pickup"][1] for j in jobs], dtype=float)
+
+    edges = [[] for _ in jobs]
+    for i, job in enumerate(jobs):
+        lo = max(i + 1, bisect_left(starts, job["End"]))
+        hi = bisect_right(starts, job["End"] + timedelta(minutes=max_wait_min))
+        if lo >= hi:
+            continue
+        geo = _haversine_km(job["dropoff"][0], job["dropoff"][1], pickup_lats[lo:hi], pickup_lons[lo:hi])
+        for offset in np.flatnonzero(geo <= max_geo_km):
+            j = lo + int(offset)
+            nxt = jobs[j]
+            wait = (nxt["Start"] - job["End"]).total_seconds() / 60
+            km, minutes = route_lookup.leg(job["dropoff"], nxt["pickup"], float(geo[offset]))
+            if km > max_road_km or minutes > wait:
+                continue
+            edges[i].append((j, km, minutes, wait))
+    return edges
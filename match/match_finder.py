@@ -1,46 +1,98 @@
-from datetime import datetime, timedelta
+import os
+import time
+from datetime import datetime
 from geopy.distance import geodesic
 import logging
 from utils.mongodb_utils import get_mongo_collection
+from utils.road_estimator import RoadEstimator
+from utils import match_rules
+from utils.depots import DepotIndex
+
+DEPOT_RELOAD_SEC = int(os.getenv("DEPOT_RELOAD_SEC", "600"))
+ROUTE_FAILED = ("failed",)  # distance_cache'te başarısız rota (negatif cache)
+_NOT_LOOKED_UP = object()
 
 class MatchFinder:
     def __init__(self, distance_service):
         self.distance_service = distance_service
         self.match_col = get_mongo_collection("match_data")
-        self.HOME_BASE_COORDS = (36.7659, 28.8028)  # Dalaman
-        self.MAX_DISTANCE_KM = 20
-        self.MAX_TIME_DIFF_MIN = 240
-        self.HOME_RADIUS_KM = 10
+        self.MAX_DISTANCE_KM = match_rules.MAX_DISTANCE_KM
+        self.MAX_TIME_DIFF_MIN = match_rules.MAX_TIME_DIFF_MIN
+        self.FALLBACK_SPEED_KMH = 50
+        self.MAX_ROAD_KM = match_rules.MAX_ROAD_KM
+        self.estimator = RoadEstimator()
+        self.depots = DepotIndex()  # müşterinin depoları (clients.depots), varsayılan Dalaman
+        self.depots_loaded_at = time.time()
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         self.logged_invalid_rides = set()
         self.logged_invalid_candidates = set()
 
-    def is_near_home(self, coords):
-        return geodesic(self.HOME_BASE_COORDS, coords).km <= self.HOME_RADIUS_KM
+    def refresh_depots(self):
+        if time.time() - self.depots_loaded_at >= DEPOT_RELOAD_SEC:
+            self.depots = DepotIndex()
+            self.depots_loaded_at = time.time()
 
     def calculate_arrival(self, start_time, duration_seconds):
-        if not duration_seconds:
-            return start_time
+        return match_rules.calculate_arrival(start_time, duration_seconds)
+
+    def get_known_distance(self, start_coords, end_coords):
+        """
+        Ağa çıkmadan bilinen rota: (km, dk, kaynak) -> kaynak 'hotspot' veya 'route' (distance_cache).
+        Rota cache'te başarısız olarak işaretliyse ROUTE_FAILED, hiç yoksa None.
+        Mongo hatası da ROUTE_FAILED sayılır (bu cycle'da API'ye de gidilmez, tahmin kullanılır).
+        """
         try:
-            return start_time + timedelta(seconds=float(duration_seconds))
-        except (TypeError, ValueError):
-            return start_time
+            hotspot = self.distance_service.lookup_hotspot(*start_coords, *end_coords)
+            if hotspot:
+                return hotspot[0] / 1000, hotspot[1] / 60, "hotspot"
 
-    def get_real_distance(self, start_coords, end_coords):
-        try:
-            cached = self.distance_service.is_cached_or_failed(*start_coords, *end_coords, source="match_finder")
-            if cached[0]:
-                data = cached[1]
+            exists, data = self.distance_service.is_cached_or_failed(*start_coords, *end_coords, source="match_finder")
+            if exists:
                 if data:
-                    return data['Distance_meters'] / 1000, data['Duration_seconds'] / 60
-
+                    return data['Distance_meters'] / 1000, data['Duration_seconds'] / 60, "route"
+                return ROUTE_FAILED  # geo retry worker tekrar deneyecek
+            return None
+        except Exception as e:
+            self.logger.warning(f"Known route lookup failed: {e}")
+            return ROUTE_FAILED
+
+    def get_real_distance(self, start_coords, end_coords, known=_NOT_LOOKED_UP):
+        """
+        (km, dk, kaynak). known: get_known_distance sonucu (verilirse cache tekrar sorgulanmaz).
+        Rota alınamazsa önce öğrenilmiş tahmin ('estimate'), o da yoksa kuş uçuşu + ortalama hız ('geodesic').
+        """
+        if known is _NOT_LOOKED_UP:
+            known = self.get_known_distance(start_coords, end_coords)
+        if known is not None and known is not ROUTE_FAILED:
+            return known
+        try:
+            if known is ROUTE_FAILED:
+                raise ValueError("Route cached as failed")
             result = self.distance_service.calculate_and_cache(*start_coords, *end_coords, source="match_finder")
             if result[0] is None:
                 raise ValueError("Distance calculation failed")
-            return result[0] / 1000, result[1] / 60
+            return result[0] / 1000, result[1] / 60, "route"
         except Exception:
-            return geodesic(start_coords, end_coords).km, 0
+            estimate = self.estimator.estimate(start_coords, end_coords)
+            if estimate:
+                return estimate["km"], estimate["min"], "estimate"
+            km = geodesic(start_coords, end_coords).km
+            return km, km / self.FALLBACK_SPEED_KMH * 60, "geodesic"
+
+    def get_pair_distance(self, start_coords, end_coords, time_budget_min):
+        """
+        Boş gidiş için (km, dk, kaynak). Tahmin eşleşmeye karar vermez, sadece API çağrısını atlatır:
+        rota bilinmiyorsa ve tahmin bandı net sonuç veriyorsa (açıkça uygun ya da açıkça uygunsuz)
+        değerler tahminden doldurulur ('estimate'); API sadece sınırdaki çiftler için çağrılır.
+        Eşleşme kümesi rotanın cache'te olup olmamasına bağlı değildir.
+        """
+        known = self.get_known_distance(start_coords, end_coords)
+        if known is None:
+            estimate = self.estimator.estimate(start_coords, end_coords)
+            if match_rules.route_decision(estimate, time_budget_min, self.MAX_ROAD_KM) != "route":
+                return estimate["km"], estimate["min"], "estimate"
+        return self.get_real_distance(start_coords, end_coords, known=known)
 
     def is_double_utilized(self, arrival_time, next_departure_time, dropoff_coords, next_pickup_coords):
         wait_time = (next_departure_time - arrival_time).total_seconds() / 60
@@ -48,25 +100,31 @@ class MatchFinder:
         return 0 <= wait_time <= 90 and distance_km <= self.MAX_DISTANCE_KM
 
     def determine_direction(self, ride, match, match_source):
+        """
+        (yön, depo). En yakın depo bilgisi kayıtlara find_matches başında bir kez yazılır (Pickup_Depot/Dropoff_Depot).
+        Home Return: eşleşen iş D deposunun yarıçapında biter ve ride pickup'ı D'ye MAX_DISTANCE_KM yakınlıkta
+        (pickup'a en yakın depo başka olsa bile). Pickup -> D mesafesi ride kaydında depo başına bir kez hesaplanır;
+        depo sayısı arttıkça çift başına iş artmaz.
+        Away Return: ne ride pickup'ı ne de eşleşen işin dropoff'u bir depo yarıçapında.
+        """
         try:
             match_time = match['ride_datetime'] if match_source == 'Rides' else match['Transfer_Datetime']
-            match_dropoff = (match['Dropoff_lat'], match['Dropoff_lon'])
-
-            ride_time = ride['ride_datetime']
-            ride_pickup = (ride['Pickup_lat'], ride['Pickup_lon'])
-            ride_dropoff = (ride['Dropoff_lat'], ride['Dropoff_lon'])
-
-            if not self.is_valid_coords(*ride_pickup) or not self.is_valid_coords(*match_dropoff):
-                return "Unknown"
-
-            if self.is_near_home(match_dropoff):
-                if geodesic(ride_pickup, match_dropoff).km <= self.MAX_DISTANCE_KM and match_time > ride_time:
-                    return "Home Return"
-            if not self.is_near_home(ride_pickup) and not self.is_near_home(match_dropoff):
-                return "Away Return"
-            return "Unknown"
+            ride_pickup_depot = ride.get('Pickup_Depot')
+            match_dropoff_depot = match.get('Dropoff_Depot')
+
+            if not ride_pickup_depot or not match_dropoff_depot:
+                return "Unknown", None
+
+            depot, _, match_near = match_dropoff_depot
+            pickup_near = ride_pickup_depot[2]
+            if match_near and match_time > ride['ride_datetime']:
+                if self.depots.pickup_km_to(ride, depot) <= self.MAX_DISTANCE_KM:
+                    return "Home Return", depot
+            if not pickup_near and not match_near:
+                return "Away Return", None
+            return "Unknown", None
         except Exception:
-            return "Unknown"
+            return "Unknown", None
 
     def mark_old_matches_outdated(self, ride_ids):
         result = self.match_col.update_many(
@@ -77,6 +135,9 @@ class MatchFinder:
 
     def find_matches(self, rides, calendar):
         results = []
+        self.refresh_depots()
+        self.depots.annotate(rides)
+        self.depots.annotate(calendar, fields=(("Dropoff", "Dropoff_lat", "Dropoff_lon"),))
 
         for ride in rides:
             ride_arrival = self.calculate_arrival(ride['ride_datetime'], ride.get("Duration_seconds", 0))
@@ -114,7 +175,10 @@ class MatchFinder:
                 if time_diff > self.MAX_TIME_DIFF_MIN:
                     continue
 
-                real_dist_km, real_dur_min = self.get_real_distance(ride_dropoff_coords, candidate_pickup)
+                real_dist_km, real_dur_min, distance_source = self.get_pair_distance(
+                    ride_dropoff_coords, candidate_pickup, time_diff
+                )
+                direction, home_depot = self.determine_direction(ride, candidate, "Rides")
 
                 matches.append({
                     "Match Source": "Rides",
@@ -122,11 +186,13 @@ class MatchFinder:
                     "Match Time": candidate_departure,
                     "Match Arrival": candidate_arrival,
                     "Ride Arrival": ride_arrival,
-                    "Match Direction": self.determine_direction(ride, candidate, "Rides"),
+                    "Match Direction": direction,
+                    "Home Depot": home_depot,
                     "Time Difference (min)": round(time_diff),
                     "Geo Distance (km)": round(dist_km, 2),
                     "Real Distance (km)": round(real_dist_km, 2),
                     "Real Duration (min)": round(real_dur_min),
+                    "Distance Source": distance_source,
                     "Matched Pickup": candidate["Pickup"],
                     "Matched Dropoff": candidate["Dropoff"],
                     "Matched_Price": candidate.get("Price", "₺N/A"),
@@ -157,7 +223,10 @@ class MatchFinder:
                 if time_diff > self.MAX_TIME_DIFF_MIN:
                     continue
 
-                real_dist_km, real_dur_min = self.get_real_distance(ride_dropoff_coords, task_pickup)
+                real_dist_km, real_dur_min, distance_source = self.get_pair_distance(
+                    ride_dropoff_coords, task_pickup, time_diff
+                )
+                direction, home_depot = self.determine_direction(ride, task, "Calendar")
 
                 matches.append({
                     "Match Source": "Calendar",
@@ -165,11 +234,13 @@ class MatchFinder:
                     "Match Time": task_departure,
                     "Match Arrival": task_arrival,
                     "Ride Arrival": ride_arrival,
-                    "Match Direction": self.determine_direction(ride, task, "Calendar"),
+                    "Match Direction": direction,
+                    "Home Depot": home_depot,
                     "Time Difference (min)": round(time_diff),
                     "Geo Distance (km)": round(dist_km, 2),
                     "Real Distance (km)": round(real_dist_km, 2),
                     "Real Duration (min)": round(real_dur_min),
+                    "Distance Source": distance_source,
                     "Matched Pickup": task["Pickup"],
                     "Matched Dropoff": task["Dropoff"],
                     "Matched_Price": "₺N/A",
@@ -193,14 +264,7 @@ class MatchFinder:
 
     @staticmethod
     def is_valid_coords(lat, lon):
-        try:
-            return (
-                lat is not None and lon is not None and
-                isinstance(lat, (int, float)) and isinstance(lon, (int, float)) and
-                not (lat != lat or lon != lon)
-            )
-        except Exception:
-            return False
+        return match_rules.is_valid_coords(lat, lon)
 
     def flatten_results(self, results):
         output = []
@@ -220,10 +284,12 @@ class MatchFinder:
                     "Match_Arrival": match["Match Arrival"],
                     "Matched_Price": match.get("Matched_Price", "₺N/A"),
                     "Match_Direction": match["Match Direction"],
+                    "Home_Depot": match.get("Home Depot"),
                     "Time_Difference_min": match["Time Difference (min)"],
                     "Geo_Distance_km": match["Geo Distance (km)"],
                     "Real_Distance_km": match["Real Distance (km)"],
                     "Real_Duration_min": match["Real Duration (min)"],
+                    "Distance_Source": match.get("Distance Source"),
                     "Matched_Pickup": match["Matched Pickup"],
                     "Matched_Dropoff": match["Matched Dropoff"],
                     "DoubleUtilized": match["DoubleUtilized"],
@@ -2,9 +2,13 @@ import time
 from datetime import datetime
 from pymongo import UpdateOne, InsertOne
 from utils.mongodb_utils import get_mongo_collection
+from utils.dashboard_stats import record_matches, record_rides
 from distance_calculator import MongoDistanceCalculator
 from match_finder import MatchFinder
 from calendar_self_matcher import fetch_calendar_pairs
+from chain_engine import build_vehicle_chains
+from fleet_assignment import build_fleet_plans
+from job_graph import RouteLookup
 
 
 def fetch_unmatched_records():
@@ -64,6 +68,7 @@ def incremental_save_match_data(new_matches):
     existing_index = {(m["Ride_ID"], m["Matched_ID"], m["Match_Source"]): m for m in existing_matches}
 
     operations = []
+    inserted = []
     existing_matched_keys = set(existing_index.keys())
     new_matched_keys = set()
 
@@ -77,7 +82,9 @@ def incremental_save_match_data(new_matches):
                 {"$set": {"last_updated": now}}
             ))
         else:
+            match["StatsCounted"] = True  # dashboard_stats'a eklendi; Outdated olunca düşülecek
             operations.append(InsertOne(match))
+            inserted.append(match)
 
     to_outdate = existing_matched_keys - new_matched_keys
     if to_outdate:
@@ -96,6 +103,9 @@ def incremental_save_match_data(new_matches):
     if operations:
         result = match_col.bulk_write(operations)
         print(f"✅ Incremental match update complete: {result.bulk_api_result}")
+        # Dashboard aggregate'leri: yeni aktifler eklenir, Outdated olanlar düşülür
+        record_matches(inserted, sign=1)
+        record_matches([existing_index[k] for k in to_outdate], sign=-1)
     else:
         print("ℹ️ No match changes detected.")
 
@@ -113,6 +123,7 @@ def update_processed_flags(ride_ids, task_ids):
 def build_match_runner():
     distance_calc = MongoDistanceCalculator()
     matcher = MatchFinder(distance_service=distance_calc)
+    route_lookup = RouteLookup()  # zincir/filo grafiği için; her cycle'da sadece yeni rotalar çekilir
 
     while True:
         print(f"\n⏱️ Match cycle started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -125,7 +136,7 @@ def build_match_runner():
             continue
 
         active_rides, active_calendar = fetch_active_records()
-        calendar_pairs = fetch_calendar_pairs()
+        calendar_pairs = fetch_calendar_pairs(active_calendar)
 
         # Ana eşleşme burada: aktif rides ve aktif calendar arasında
         match_results = matcher.find_matches(active_rides, active_calendar)
@@ -138,9 +149,21 @@ def build_match_runner():
 
         incremental_save_match_data(flat_results)
 
+        # Tek adımlı eşleşmelerin ötesinde: araç başına en iyi iş zincirleri (vehicle_chains)
+        # ve onaylı task'lar + onlara bağlanan ride'lar için filo planı (fleet_plans)
+        try:
+            route_lookup.refresh()
+            build_vehicle_chains(active_rides, active_calendar, route_lookup)
+            chosen_ids = {m["Ride_ID"] for m in flat_results if m["Match_Source"] == "Calendar"}
+            chosen_rides = [r for r in active_rides if r["ID"] in chosen_ids]
+            build_fleet_plans(chosen_rides, active_calendar, route_lookup)
+        except Exception as e:
+            print(f"⚠️ Vehicle chain / fleet plan build failed: {e}")
+
         ride_ids = [r['ID'] for r in new_rides]
         task_ids = [c['ID'] for c in new_calendar]
         update_processed_flags(ride_ids, task_ids)
+        record_rides(new_rides, new_calendar)
 
         print("🔁 Match cycle complete. Sleeping 30s...\n")
         time.sleep(10)
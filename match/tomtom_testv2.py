@@ -2,10 +2,14 @@ import requests
 import urllib.parse
 import re
 from math import radians, sin, cos, sqrt, atan2
-from fuzzywuzzy import fuzz
 from utils.mongodb_utils import get_mongo_collection
+from utils.gazetteer import Gazetteer
+from utils.address_scoring import select_best, select_best_batch
+from utils.path_helper import get_data_path
 from dotenv import load_dotenv
 import os
+import threading
+import time
 load_dotenv()
 
 API_KEY = os.getenv("TOMTOM_API_KEY")
@@ -13,22 +17,52 @@ BASE_URL = 'https://api.tomtom.com'
 SEARCH_API_VERSION = '2'
 ROUTING_API_VERSION = '1'
 
-# MongoDB'den Turkey location verisini al
-locations_collection = get_mongo_collection("turkey_locations")
-locations_cursor = locations_collection.find()
-locations_data = list(locations_cursor)
+# Gazetteer ilk kullanımda yüklenir (import sırasında Mongo'ya gidilmez).
+# Disk snapshot'ı turkey_locations versiyonu (doküman sayısı + son _id) değişene kadar kullanılır.
+GAZETTEER_SNAPSHOT = get_data_path("gazetteer/turkey_locations.pkl")
+GAZETTEER_RETRY_SEC = 300
+_gazetteer = None
+_gazetteer_retry_at = None  # Mongo'ya erişilemediyse yedekle çalışılır, bu zamandan sonra tekrar denenir
+_gazetteer_lock = threading.Lock()
 
-# Preprocess lookup
-all_place_names = set()
-location_index = []
 
-for loc in locations_data:
-    for key in ['name', 'ascii_name', 'original_city_search']:
-        val = loc.get(key)
-        if val:
-            lowered = val.lower()
-            all_place_names.add(lowered)
-            location_index.append((lowered, loc))
+def _locations_version(collection):
+    last = next(iter(collection.find({}, {"_id": 1}).sort("_id", -1).limit(1)), None)
+    return f"{collection.estimated_document_count()}:{last['_id'] if last else ''}"
+
+
+def _load_gazetteer():
+    """(gazetteer, güncel_mi) döndürür."""
+    try:
+        collection = get_mongo_collection("turkey_locations")
+        version = _locations_version(collection)
+    except Exception as e:
+        print(f"⚠️ turkey_locations okunamadı ({e}); disk snapshot'ı kullanılıyor.")
+        return Gazetteer.load(GAZETTEER_SNAPSHOT) or Gazetteer.from_records([]), False
+
+    gaz = Gazetteer.load(GAZETTEER_SNAPSHOT, version=version)
+    if gaz is not None:
+        print(f"📦 Gazetteer snapshot yüklendi ({len(gaz)} isim).")
+        return gaz, True
+
+    projection = {"_id": 0, "name": 1, "ascii_name": 1, "original_city_search": 1}
+    gaz = Gazetteer.from_records(collection.find({}, projection).sort("_id", 1))
+    print(f"🗺️ Gazetteer turkey_locations'tan derlendi ({len(gaz)} isim).")
+    try:
+        gaz.save(GAZETTEER_SNAPSHOT, version=version)
+    except Exception as e:
+        print(f"⚠️ Gazetteer snapshot yazılamadı: {e}")
+    return gaz, True
+
+
+def get_gazetteer():
+    global _gazetteer, _gazetteer_retry_at
+    if _gazetteer is None or (_gazetteer_retry_at and time.monotonic() > _gazetteer_retry_at):
+        with _gazetteer_lock:
+            if _gazetteer is None or (_gazetteer_retry_at and time.monotonic() > _gazetteer_retry_at):
+                _gazetteer, fresh = _load_gazetteer()
+                _gazetteer_retry_at = None if fresh else time.monotonic() + GAZETTEER_RETRY_SEC
+    return _gazetteer
 
 COUNTRY_VARIANTS = ['turkey', 'türkiye', 'turkiye', 'turecko', 'turkei', 'turquie', 'turchia', 'tr', 'турция']
 
@@ -54,23 +88,13 @@ def extract_address_context(address):
 
     town, city = None, None
     for text in parts[::-1]:
-        text_lower = text.lower()
-        match = next((row for row in all_place_names if row in text_lower), None)
+        match = get_gazetteer().find(text)
         if match:
-            matching = [entry for entry in location_index if entry[0] == match]
-            if matching:
-                match_row = matching[0][1]
-                town = match_row.get('ascii_name')
-                city = match_row.get('original_city_search')
-                break
+            _, (town, city) = match
+            break
 
     return {'poi': poi, 'country': country, 'city': city, 'town': town}
 
-def extract_location_context(address):
-    parts = [p.strip() for p in address.split(',') if p.strip()]
-    location_parts = parts[-2:] if len(parts) >= 2 else parts
-    return [''.join(c for c in part.lower() if c.isalnum() or c.isspace()) for part in location_parts]
-
 def search_address(address, country_set=None):
     print(f"\n🔎 Original address: {address}")
     cleaned_address = re.sub(r'/', ' ', address)
@@ -108,49 +132,32 @@ def search_address(address, country_set=None):
         print(f"⚠️ API Error: {e}")
         return []
 
-def calculate_location_match(input_terms, result_address, result_municipality):
-    test_strings = [result_address.lower(), result_municipality.lower()]
-    best_score = 0
-    for term in input_terms:
-        for target in test_strings:
-            score = fuzz.token_set_ratio(term, target)
-            best_score = max(best_score, score)
-    return best_score
-
 def select_best_match(results, original_address):
-    if not results:
-        return None
-    location_terms = extract_location_context(original_address)
-    print(f"\n🔍 Found {len(results)} matches for: '{original_address}'")
-    print(f"📍 Location context: {', '.join(location_terms)}")
-
-    scored = []
-    for i, result in enumerate(results, 1):
-        api_score = float(result.get('score', 0))
-        result_address = result['address'].get('freeformAddress', '')
-        result_municipality = result['address'].get('municipality', '')
-        context_score = calculate_location_match(location_terms, result_address, result_municipality)
-        total_score = api_score * 0.6 + context_score * 0.4
-        scored.append((total_score, i - 1, result))
-
-        print(f"\nOption {i}: \n 📍 {result_address}\n 🏙️ {result_municipality}\n 🔢 API Score: {api_score:.1f}\n 🎯 Context: {context_score:.1f}\n 💯 Total: {total_score:.1f}")
-
-    scored.sort(reverse=True)
-    _, _, best = scored[0]
-    print(f"\n✅ Best: {best['address'].get('freeformAddress')} → {best['address'].get('municipality', 'N/A')}")
-    return best
+    return select_best(results, original_address)
 
 def get_coordinates(address, country_set=None):
-    results = search_address(address, country_set)
-    if not results:
-        print(f"❌ No results found for: {address}")
-        return None
-    best = select_best_match(results, address)
-    if not best:
-        return None
-    pos = best['position']
-    print(f"🌐 Coordinates: {pos['lat']}, {pos['lon']}")
-    return pos['lat'], pos['lon']
+    return get_coordinates_batch([address], country_set)[0]
+
+def get_coordinates_batch(addresses, country_set=None, pause=0):
+    """Her adres için (lat, lon) veya None; tüm sonuç kümeleri tek seferde puanlanır.
+    pause: rate limit için aramalar arası bekleme (sn)."""
+    result_sets = []
+    for i, address in enumerate(addresses):
+        if i and pause:
+            time.sleep(pause)
+        result_sets.append(search_address(address, country_set))
+    for address, results in zip(addresses, result_sets):
+        if not results:
+            print(f"❌ No results found for: {address}")
+    coords = []
+    for best in select_best_batch(list(zip(addresses, result_sets))):
+        if not best:
+            coords.append(None)
+            continue
+        pos = best['position']
+        print(f"🌐 Coordinates: {pos['lat']}, {pos['lon']}")
+        coords.append((pos['lat'], pos['lon']))
+    return coords
 
 def calculate_route(start_coords, end_coords):
     endpoint = f"{BASE_URL}/routing/{ROUTING_API_VERSION}/calculateRoute/{start_coords}:{end_coords}/json"
@@ -0,0 +1,84 @@
+# utils/address_scoring.py
+import os
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+# TomTom arama sonuçlarının adres bağlamına göre puanlanması.
+# Metinler bir kez normalize edilir, terim × aday skor matrisi tek cdist çağrısıyla hesaplanır.
+DEBUG = os.getenv("GEOCODE_DEBUG", "0") == "1"
+API_WEIGHT = 0.6
+CONTEXT_WEIGHT = 0.4
+
+
+def location_terms(address):
+    """Adresin son iki parçası (ilçe/il bağlamı), normalize edilmiş."""
+    parts = [p.strip() for p in str(address).split(',') if p.strip()]
+    return [default_process(p) for p in (parts[-2:] if len(parts) >= 2 else parts)]
+
+
+def _targets(result):
+    addr = result.get('address', {})
+    return [default_process(addr.get('freeformAddress', '')), default_process(addr.get('municipality', ''))]
+
+
+def score_matrix(terms, targets, scorer=fuzz.token_set_ratio):
+    """len(terms) × len(targets) skor matrisi (0-100). Girdiler normalize edilmiş olmalı."""
+    if not terms or not targets:
+        return np.zeros((len(terms), len(targets)), dtype=np.float32)
+    return process.cdist(terms, targets, scorer=scorer, processor=None, workers=-1)
+
+
+def _total_scores(context, results):
+    api = np.array([float(r.get('score', 0)) for r in results], dtype=np.float32)
+    return api * API_WEIGHT + context * CONTEXT_WEIGHT, api
+
+
+def _log_options(original_address, terms, results, context, api, totals):
+    print(f"\n🔍 Found {len(results)} matches for: '{original_address}'")
+    print(f"📍 Location context: {', '.join(terms)}")
+    for i, result in enumerate(results):
+        addr = result.get('address', {})
+        print(f"\nOption {i + 1}: \n 📍 {addr.get('freeformAddress', '')}\n 🏙️ {addr.get('municipality', '')}"
+              f"\n 🔢 API Score: {api[i]:.1f}\n 🎯 Context: {context[i]:.1f}\n 💯 Total: {totals[i]:.1f}")
+
+
+def select_best(results, original_address):
+    """Tek sonuç kümesi için en iyi TomTom sonucu (yoksa None)."""
+    return select_best_batch([(original_address, results)])[0]
+
+
+def select_best_batch(items):
+    """
+    [(adres, sonuçlar)] -> [en iyi sonuç veya None].
+    Tüm kümelerin tekil terim ve hedefleri tek matriste puanlanır (toplu geocoding için).
+    """
+    term_lists = [location_terms(address) for address, _ in items]
+    target_lists = [[t for r in (results or []) for t in _targets(r)] for _, results in items]
+
+    term_index = {t: i for i, t in enumerate(dict.fromkeys(t for terms in term_lists for t in terms))}
+    target_index = {t: i for i, t in enumerate(dict.fromkeys(t for targets in target_lists for t in targets))}
+    matrix = score_matrix(list(term_index), list(target_index))
+
+    best = []
+    for (address, results), terms, targets in zip(items, term_lists, target_lists):
+        if not results:
+            best.append(None)
+            continue
+        rows = [term_index[t] for t in terms]
+        cols = [target_index[t] for t in targets]
+        if rows:
+            # Her sonuç için iki hedef (adres, belediye) üzerinden en yüksek terim skoru
+            context = matrix[np.ix_(rows, cols)].max(axis=0).reshape(len(results), 2).max(axis=1)
+        else:
+            context = np.zeros(len(results), dtype=np.float32)
+        totals, api = _total_scores(context, results)
+        # Eşitlikte ilk sonuç (TomTom sıralaması) kazanır
+        winner = int(np.argmax(totals))
+        if DEBUG:
+            _log_options(address, terms, results, context, api, totals)
+        chosen = results[winner]
+        print(f"✅ Best ({totals[winner]:.1f}): {chosen['address'].get('freeformAddress')} → "
+              f"{chosen['address'].get('municipality', 'N/A')}")
+        best.append(chosen)
+    return best
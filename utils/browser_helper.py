@@ -1,6 +1,30 @@
+import os
 import shutil
 import platform
 
+# Düşük kaynak modu (varsayılan açık): görsel/medya/tracker engelle, gereksiz Chrome özelliklerini kapat
+LOW_FOOTPRINT = os.getenv("BROWSER_LOW_FOOTPRINT", "1") == "1"
+JS_HEAP_MB = int(os.getenv("BROWSER_JS_HEAP_MB", "256"))
+
+# *.svg engellenmez: WT (Ionic) ion-icon SVG'lerini fetch ile çeker, scraper'lar bu ikonlara tıklıyor
+BLOCKED_URL_PATTERNS = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico", "*.bmp", "*.avif"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav", "*.m4a"],
+    "trackers": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*facebook.net*", "*connect.facebook.*", "*hotjar.com*", "*clarity.ms*",
+        "*segment.io*", "*mixpanel.com*", "*intercom.io*", "*sentry.io*",
+    ],
+}
+
+DISABLED_CHROME_FEATURES = [
+    "Translate", "OptimizationHints", "MediaRouter", "DialMediaRouteProvider",
+    "AutofillServerCommunication", "InterestFeedContentSuggestions",
+    "CalculateNativeWinOcclusion", "BackForwardCache", "HeavyAdIntervention",
+]
+
+
 def get_chrome_binary_path():
     system = platform.system()
     if system == "Linux":
@@ -13,3 +37,46 @@ def get_chrome_binary_path():
 
 def get_chromedriver_path():
     return shutil.which("chromedriver")
+
+
+def apply_low_footprint_options(options, js_heap_mb=JS_HEAP_MB):
+    """ChromeOptions'a hafif profil ayarlarını ekler (selenium ve undetected_chromedriver ile uyumlu).
+    Fontlar burada değil, enable_resource_blocking() ile CDP üzerinden engellenir."""
+    for arg in [
+        "--blink-settings=imagesEnabled=false",
+        f"--js-flags=--max-old-space-size={js_heap_mb}",
+        f"--disable-features={','.join(DISABLED_CHROME_FEATURES)}",
+        "--disable-background-networking",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-notifications",
+        "--metrics-recording-only",
+        "--no-first-run",
+        "--mute-audio",
+        "--renderer-process-limit=2",
+        "--disk-cache-size=1",
+        "--media-cache-size=1",
+    ]:
+        options.add_argument(arg)
+
+    content_settings = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+        "profile.managed_default_content_settings.notifications": 2,
+        "profile.managed_default_content_settings.geolocation": 2,
+    }
+    options.add_experimental_option("prefs", content_settings)
+    return options
+
+
+def enable_resource_blocking(driver, block_fonts=True):
+    """CDP ile görsel, font, medya ve tracker isteklerini ağ seviyesinde engeller."""
+    categories = ["images", "media", "trackers"] + (["fonts"] if block_fonts else [])
+    patterns = [p for c in categories for p in BLOCKED_URL_PATTERNS[c]]
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        print(f"🪶 Resource blocking active: {', '.join(categories)} ({len(patterns)} patterns)")
+    except Exception as e:
+        print(f"⚠️ Resource blocking could not be enabled: {e}")
@@ -0,0 +1,133 @@
+# utils/browser_pool.py
+import atexit
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from utils.session_manager import BrowserSession
+
+POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+POOL_MAX_AGE_MIN = int(os.getenv("BROWSER_POOL_MAX_AGE_MIN", "240"))
+POOL_MAX_RSS_MB = int(os.getenv("BROWSER_POOL_MAX_RSS_MB", "900"))
+
+
+class PooledBrowser:
+    def __init__(self, slot, session):
+        self.slot = slot
+        self.session = session
+        self.started_at = None
+        self.leases = 0
+
+
+class BrowserPool:
+    """
+    Login olmuş, sıcak tarayıcı oturumlarını yönetir ve scraping işlerine kiralar.
+
+    Her slot kendi BrowserSession'ına sahiptir (ayrı cookie deposu), böylece
+    farklı hesaplar/kaynaklar aynı süreçte paralel taranabilir. Kiralama bitince
+    slotun yaşı ve RSS'i kontrol edilir; eşik aşılırsa sadece o slot yenilenir.
+    """
+
+    def __init__(self, name, login_factories, size=POOL_SIZE,
+                 max_age_min=POOL_MAX_AGE_MIN, max_rss_mb=POOL_MAX_RSS_MB):
+        if callable(login_factories):
+            login_factories = [login_factories] * size
+
+        self.name = name
+        self.max_age = timedelta(minutes=max_age_min)
+        self.max_rss_mb = max_rss_mb
+        self._idle = queue.Queue()
+        self._slots = []
+        self._lock = threading.Lock()
+
+        for i, factory in enumerate(login_factories):
+            slot_name = name if len(login_factories) == 1 else f"{name}_{i}"
+            slot = PooledBrowser(i, BrowserSession(slot_name, factory))
+            self._slots.append(slot)
+            self._idle.put(slot)
+
+        atexit.register(self.close_all)
+
+    def warm_up(self):
+        """Tüm slotları önceden başlatıp login olur."""
+        for slot in self._slots:
+            try:
+                self._ensure(slot)
+            except Exception as e:
+                print(f"⚠️ [{self.name}] Slot {slot.slot} ısıtılamadı: {e}")
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """with pool.lease() as driver: ... — iş bitince slot havuza geri döner."""
+        slot = self._idle.get(timeout=timeout)
+        try:
+            driver = self._ensure(slot)
+            slot.leases += 1
+            yield driver
+        except Exception:
+            slot.session.handle_error()
+            raise
+        finally:
+            self._maybe_recycle(slot)
+            self._idle.put(slot)
+
+    def stats(self):
+        rows = []
+        for slot in self._slots:
+            driver = slot.session.driver
+            tracker = slot.session.tracker
+            m = tracker.metrics() if driver and tracker else {"rss_mb": 0, "processes": 0, "cpu_percent": None}
+            rows.append({
+                "slot": slot.slot,
+                "alive": driver is not None,
+                "leases": slot.leases,
+                "age_min": round((datetime.now() - slot.started_at).total_seconds() / 60, 1) if slot.started_at else None,
+                "rss_mb": round(m["rss_mb"], 1),
+                "cpu_percent": round(m["cpu_percent"], 1) if m["cpu_percent"] is not None else None,
+                "processes": m["processes"],
+            })
+        return rows
+
+    def close_all(self):
+        with self._lock:
+            for slot in self._slots:
+                slot.session.close()
+                slot.started_at = None
+
+    # --- Internals ---
+
+    def _ensure(self, slot):
+        was_down = slot.session.driver is None
+        driver = slot.session.ensure()
+        if was_down or slot.started_at is None:
+            slot.started_at = datetime.now()
+        return driver
+
+    def _maybe_recycle(self, slot):
+        driver = slot.session.driver
+        if driver is None:
+            slot.started_at = None
+            return
+
+        try:
+            m = slot.session.tracker.metrics()
+            rss_mb, procs, cpu = m["rss_mb"], m["processes"], m["cpu_percent"]
+        except Exception:
+            rss_mb, procs, cpu = 0, 0, None
+        age = datetime.now() - slot.started_at if slot.started_at else timedelta(0)
+        cpu_txt = f", CPU {cpu:.0f}%" if cpu is not None else ""
+        print(f"📊 [{self.name}] slot {slot.slot}: {rss_mb:.1f} MB RSS, {procs} process{cpu_txt}, age {int(age.total_seconds() // 60)} min")
+
+        reason = None
+        if self.max_rss_mb and rss_mb > self.max_rss_mb:
+            reason = f"RSS {rss_mb:.0f} MB > {self.max_rss_mb} MB"
+        elif self.max_age and age > self.max_age:
+            reason = f"age {int(age.total_seconds() // 60)} min"
+
+        if reason:
+            # Oturum diske yazıldığı için yeni tarayıcı login formunu atlayabilir
+            print(f"♻️ [{self.name}] Slot {slot.slot} geri dönüştürülüyor ({reason})")
+            slot.session.persist()
+            slot.session.close()
+            slot.started_at = None
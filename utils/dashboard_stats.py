@@ -0,0 +1,105 @@
+# utils/dashboard_stats.py
+from collections import defaultdict
+from datetime import date, datetime
+from pymongo import UpdateOne
+from utils.mongodb_utils import get_mongo_collection
+
+# Gün başına tek doküman (_id = "YYYY-MM-DD"). Servisler yazdıkça $inc ile güncellenir,
+# dashboard sadece tarih aralığındaki birkaç küçük dokümanı okur.
+STATS_COLLECTION = "dashboard_stats"
+
+
+def _day(value):
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str) and len(value) >= 10:
+        try:
+            return datetime.fromisoformat(value[:10]).strftime("%Y-%m-%d")
+        except ValueError:
+            return None
+    return None
+
+
+def _key(value):
+    """Mongo alan adı için güvenli anahtar ('.' ve '$' kullanılamaz)."""
+    return str(value or "Unknown").replace(".", "_").replace("$", "_")
+
+
+def _flush(increments):
+    if not increments:
+        return
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"_id": day},
+            {"$inc": dict(inc), "$set": {"updated_at": now}},
+            upsert=True
+        )
+        for day, inc in increments.items() if inc
+    ]
+    try:
+        get_mongo_collection(STATS_COLLECTION).bulk_write(ops, ordered=False)
+    except Exception as e:
+        print(f"⚠️ dashboard_stats güncellenemedi: {e}")
+
+
+def record_rides(rides, calendar_tasks=()):
+    """Match servisine ilk kez giren ride/task'ları yolculuk gününe ve kaynağa göre sayar."""
+    increments = defaultdict(lambda: defaultdict(int))
+    for doc in rides:
+        day = _day(doc.get("ride_datetime"))
+        if day:
+            increments[day][f"rides.{_key(doc.get('Source'))}"] += 1
+    for doc in calendar_tasks:
+        day = _day(doc.get("Transfer_Datetime"))
+        if day:
+            increments[day][f"rides.{_key(doc.get('Source') or 'calendar')}"] += 1
+    _flush(increments)
+
+
+def record_matches(matches, sign=1):
+    """
+    Eklenen (sign=1) veya Outdated olan (sign=-1) aktif eşleşmelerin katkısı.
+    Sayılan eşleşmeler StatsCounted=True ile kaydedilir; düşerken sadece onlar düşülür
+    (bu sayaçlardan önce oluşmuş eşleşmeler hiç sayılmadığı için negatife inmesin).
+    """
+    increments = defaultdict(lambda: defaultdict(float))
+    for m in matches:
+        if sign < 0 and not m.get("StatsCounted"):
+            continue
+        day = _day(m.get("Ride_Time"))
+        if not day:
+            continue
+        inc = increments[day]
+        inc["matches.total"] += sign
+        inc[f"matches.direction.{_key(m.get('Match_Direction'))}"] += sign
+        if m.get("DoubleUtilized"):
+            inc["matches.double_utilized"] += sign
+        try:
+            km = float(m.get("Real_Distance_km"))
+        except (TypeError, ValueError):
+            km = None
+        if km is not None and km == km:
+            inc["matches.empty_km_sum"] += sign * km
+            inc["matches.empty_km_count"] += sign
+    _flush(increments)
+
+
+def record_analysis(ride_count, calendar_count, seconds):
+    """Analyzer throughput: işlem gününe göre."""
+    day = datetime.now().strftime("%Y-%m-%d")
+    _flush({day: {
+        "analysis.rides": ride_count,
+        "analysis.calendar": calendar_count,
+        "analysis.cycles": 1,
+        "analysis.seconds": round(seconds, 2),
+    }})
+
+
+def load_stats(start_date, end_date):
+    """[start_date, end_date] aralığındaki günlük dokümanlar (tarih sıralı)."""
+    return list(
+        get_mongo_collection(STATS_COLLECTION)
+        .find({"_id": {"$gte": _day(start_date), "$lte": _day(end_date)}})
+        .sort("_id", 1)
+    )
@@ -0,0 +1,88 @@
+# utils/depots.py
+import math
+import os
+import numpy as np
+from scipy.spatial import cKDTree
+from utils.mongodb_utils import get_mongo_collection
+
+# Müşteri başına depo (home base) kümesi ve en yakın depo araması.
+# Depolar clients koleksiyonundaki "depots" alanından okunur:
+#   {"client_name": ..., "depots": [{"name": "Dalaman", "lat": 36.7659, "lon": 28.8028, "radius_km": 10}, ...]}
+# Alan yoksa eski tek depo (Dalaman) kullanılır.
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_RADIUS_KM = float(os.getenv("DEPOT_RADIUS_KM", "10"))
+DEFAULT_DEPOTS = [{"name": "Dalaman", "lat": 36.7659, "lon": 28.8028}]
+
+
+def load_client_depots(client_name=None):
+    client_name = client_name or os.getenv("CLIENT_ID")
+    config = get_mongo_collection("clients").find_one({"client_name": client_name}, {"depots": 1}) if client_name else None
+    depots = [
+        d for d in ((config or {}).get("depots") or [])
+        if isinstance(d.get("lat"), (int, float)) and isinstance(d.get("lon"), (int, float))
+    ]
+    return depots or DEFAULT_DEPOTS
+
+
+def _unit_vectors(lats, lons):
+    lats, lons = np.radians(lats), np.radians(lons)
+    return np.column_stack((np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)))
+
+
+class DepotIndex:
+    """
+    Depoların birim küre üzerindeki koordinatlarından KD-tree. Kiriş uzunluğu büyük daire mesafesiyle
+    monoton olduğu için en yakın komşu doğrudan bulunur; sorgu maliyeti depo sayısıyla büyümez.
+    """
+
+    def __init__(self, depots=None):
+        self.depots = depots if depots is not None else load_client_depots()
+        self.names = [d.get("name") or f"Depot {i + 1}" for i, d in enumerate(self.depots)]
+        self.positions = {name: (d["lat"], d["lon"]) for name, d in zip(self.names, self.depots)}
+        self.radius_km = np.array([float(d.get("radius_km") or DEFAULT_RADIUS_KM) for d in self.depots])
+        self.tree = cKDTree(_unit_vectors([d["lat"] for d in self.depots], [d["lon"] for d in self.depots]))
+
+    def nearest(self, lats, lons):
+        """[(depo_adı, km, yarıçap_içinde_mi)] — koordinat dizileri için tek sorgu."""
+        chord, idx = self.tree.query(_unit_vectors(lats, lons))
+        km = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.atleast_1d(chord) / 2, 0, 1))
+        idx = np.atleast_1d(idx)
+        return [
+            (self.names[i], round(float(k), 3), bool(k <= self.radius_km[i]))
+            for i, k in zip(idx, km)
+        ]
+
+    def distance_km(self, depot_name, lat, lon):
+        """Tek bir depoya büyük daire mesafesi (km)."""
+        d_lat, d_lon = map(math.radians, self.positions[depot_name])
+        lat, lon = math.radians(lat), math.radians(lon)
+        a = math.sin((lat - d_lat) / 2) ** 2 + math.cos(d_lat) * math.cos(lat) * math.sin((lon - d_lon) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+    def pickup_km_to(self, record, depot_name):
+        """Kaydın pickup'ının verilen depoya mesafesi; depo başına bir kez hesaplanıp kayıtta tutulur."""
+        cache = record.setdefault("Pickup_Depot_km", {})
+        if depot_name not in cache:
+            cache[depot_name] = round(self.distance_km(depot_name, record["Pickup_lat"], record["Pickup_lon"]), 3)
+        return cache[depot_name]
+
+    def annotate(self, records, fields=(("Pickup", "Pickup_lat", "Pickup_lon"), ("Dropoff", "Dropoff_lat", "Dropoff_lon"))):
+        """
+        Her kayda <Alan>_Depot = (depo_adı, km, yarıçap_içinde_mi) yazar; koordinat başına bir kez hesaplanır.
+        Koordinatı geçersiz olanlara None yazılır. Zaten işaretli kayıtlar atlanır.
+        """
+        for label, lat_field, lon_field in fields:
+            key = f"{label}_Depot"
+            pending = [r for r in records if key not in r]
+            valid = [r for r in pending if _is_coord(r.get(lat_field)) and _is_coord(r.get(lon_field))]
+            for r in pending:
+                r[key] = None
+            if valid:
+                hits = self.nearest([r[lat_field] for r in valid], [r[lon_field] for r in valid])
+                for r, hit in zip(valid, hits):
+                    r[key] = hit
+        return records
+
+
+def _is_coord(value):
+    return isinstance(value, (int, float)) and value == value
@@ -0,0 +1,118 @@
+# utils/gazetteer.py
+import os
+import pickle
+from collections import deque
+
+# turkey_locations'ta aranan isim alanları (sıra önemli: ilk görülen kayıt kazanır)
+NAME_FIELDS = ('name', 'ascii_name', 'original_city_search')
+
+
+class Gazetteer:
+    """
+    Yer isimleri için Aho-Corasick otomatı.
+
+    Bir metindeki tüm isim geçişlerini tek geçişte bulur (O(len(text))).
+    Eşleşme kuralı deterministiktir: en uzun isim kazanır, eşitlikte en soldaki.
+    Aynı isme sahip birden fazla kayıt varsa yükleme sırasındaki ilk kayıt kullanılır.
+    """
+
+    def __init__(self):
+        self.goto = [{}]        # node -> {char: node}
+        self.fail = [0]
+        self.out = [-1]         # node'da biten en uzun ismin id'si (fail zinciri dahil)
+        self.names = []         # id -> isim
+        self.records = []       # id -> (town, city)
+
+    @staticmethod
+    def normalize(text):
+        return str(text).lower()
+
+    @classmethod
+    def from_records(cls, records):
+        gaz = cls()
+        seen = {}
+        for loc in records:
+            for key in NAME_FIELDS:
+                val = loc.get(key)
+                if not val:
+                    continue
+                name = cls.normalize(val)
+                if name in seen:
+                    continue
+                seen[name] = len(gaz.names)
+                gaz.names.append(name)
+                gaz.records.append((loc.get('ascii_name'), loc.get('original_city_search')))
+                gaz._insert(name, seen[name])
+        gaz._build_links()
+        return gaz
+
+    def _insert(self, name, pid):
+        node = 0
+        for ch in name:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(-1)
+            node = nxt
+        self.out[node] = pid
+
+    def _build_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0)
+                # Kendi ismi yoksa fail zincirindeki en uzun isim bu node'da da biter
+                if self.out[child] < 0:
+                    self.out[child] = self.out[self.fail[child]]
+                queue.append(child)
+
+    def find(self, text):
+        """Metindeki en uzun (eşitse en soldaki) isim: (name, (town, city)) veya None."""
+        text = self.normalize(text)
+        node = 0
+        best_pid, best_len, best_start = -1, 0, 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            pid = self.out[node]
+            if pid >= 0:
+                length = len(self.names[pid])
+                start = i - length + 1
+                if length > best_len or (length == best_len and start < best_start):
+                    best_pid, best_len, best_start = pid, length, start
+        if best_pid < 0:
+            return None
+        return self.names[best_pid], self.records[best_pid]
+
+    def __len__(self):
+        return len(self.names)
+
+    # --- Persist ---
+
+    def save(self, path, version=None):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": version, "state": self.__dict__}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, version=None):
+        """Snapshot'ı yükler; versiyon uyuşmazsa ya da dosya bozuksa None döner."""
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            return None
+        if version is not None and data.get("version") != version:
+            return None
+        gaz = cls()
+        gaz.__dict__.update(data["state"])
+        return gaz
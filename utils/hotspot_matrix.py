@@ -0,0 +1,184 @@
+# utils/hotspot_matrix.py
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from utils.mongodb_utils import get_mongo_collection
+
+# Transferler birkaç merkezde toplanır (Dalaman havalimanı, Fethiye, Ölüdeniz, Göcek, Marmaris...).
+# geo_addresses koordinatları kümelenir, küme merkezleri arasındaki yol mesafesi/süresi gece önceden
+# hesaplanır; iki ucu da bir merkeze "snap" olan çiftler TomTom'a gitmeden bellekten cevaplanır.
+HOTSPOT_COLLECTION = "hotspot_matrix"
+HOTSPOT_DOC_ID = "current"
+CLUSTER_RADIUS_KM = float(os.getenv("HOTSPOT_CLUSTER_KM", "1.5"))
+SNAP_KM = float(os.getenv("HOTSPOT_SNAP_KM", "1.0"))
+MAX_HOTSPOTS = int(os.getenv("HOTSPOT_MAX", "40"))
+MIN_POINTS = int(os.getenv("HOTSPOT_MIN_POINTS", "5"))
+RELOAD_SEC = int(os.getenv("HOTSPOT_RELOAD_SEC", "600"))
+SNAP_SPEED_KMH = 30  # merkeze olan ek mesafe için şehir içi ortalama hız
+ROAD_FACTOR = 1.3    # kuş uçuşu -> yol mesafesi kaba katsayısı (snap ofsetleri için)
+
+KM_PER_DEG_LAT = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def _cell(lat, lon, size_km):
+    return (int(math.floor(lat * KM_PER_DEG_LAT / size_km)),
+            int(math.floor(lon * KM_PER_DEG_LAT * math.cos(math.radians(lat)) / size_km)))
+
+
+def _neighbors(cell):
+    i, j = cell
+    return [(i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)]
+
+
+def cluster_points(points, radius_km=CLUSTER_RADIUS_KM, min_points=MIN_POINTS, max_clusters=MAX_HOTSPOTS):
+    """
+    Grid tabanlı açgözlü kümeleme: en yoğun hücreden başlayarak yarıçap içindeki
+    (henüz atanmamış) noktaları toplar. [{'lat', 'lon', 'count'}] yoğunluk sırasıyla döner.
+    """
+    cells = defaultdict(list)
+    for lat, lon in points:
+        cells[_cell(lat, lon, radius_km)].append((lat, lon))
+
+    assigned = set()
+    clusters = []
+    for seed in sorted(cells, key=lambda c: len(cells[c]), reverse=True):
+        if len(clusters) >= max_clusters:
+            break
+        if seed in assigned:
+            continue
+        seed_lat = sum(p[0] for p in cells[seed]) / len(cells[seed])
+        seed_lon = sum(p[1] for p in cells[seed]) / len(cells[seed])
+        members, used = [], []
+        for cell in _neighbors(seed):
+            if cell in assigned or cell not in cells:
+                continue
+            near = [p for p in cells[cell] if haversine_km(seed_lat, seed_lon, *p) <= radius_km]
+            if near:
+                members.extend(near)
+                used.append(cell)
+        if len(members) < min_points:
+            continue
+        assigned.update(used)
+        clusters.append({
+            "lat": sum(p[0] for p in members) / len(members),
+            "lon": sum(p[1] for p in members) / len(members),
+            "count": len(members),
+        })
+    return sorted(clusters, key=lambda c: c["count"], reverse=True)
+
+
+def load_geocoded_points():
+    docs = get_mongo_collection("geo_addresses").find(
+        {"Latitude": {"$ne": None}, "Longitude": {"$ne": None}},
+        {"_id": 0, "Latitude": 1, "Longitude": 1}
+    )
+    return [(d["Latitude"], d["Longitude"]) for d in docs]
+
+
+def build_matrix(hotspots, route_fn, pause=0.0):
+    """Tüm merkez çiftleri için route_fn("lat,lon", "lat,lon") -> (metre, saniye) veya None."""
+    n = len(hotspots)
+    distance = [[0 if i == j else None for j in range(n)] for i in range(n)]
+    duration = [[0 if i == j else None for j in range(n)] for i in range(n)]
+    for i, a in enumerate(hotspots):
+        for j, b in enumerate(hotspots):
+            if i == j:
+                continue
+            try:
+                result = route_fn(f"{a['lat']},{a['lon']}", f"{b['lat']},{b['lon']}")
+            except Exception as e:
+                print(f"⚠️ Hotspot route {i}->{j} failed: {e}")
+                result = None
+            if result:
+                distance[i][j], duration[i][j] = result
+            if pause:
+                time.sleep(pause)
+    return distance, duration
+
+
+def save_matrix(hotspots, distance, duration):
+    get_mongo_collection(HOTSPOT_COLLECTION).replace_one({"_id": HOTSPOT_DOC_ID}, {
+        "_id": HOTSPOT_DOC_ID,
+        "hotspots": hotspots,
+        "distance_m": distance,
+        "duration_s": duration,
+        "built_at": datetime.now(),
+    }, upsert=True)
+
+
+def matrix_built_at():
+    doc = get_mongo_collection(HOTSPOT_COLLECTION).find_one({"_id": HOTSPOT_DOC_ID}, {"built_at": 1})
+    return doc.get("built_at") if doc else None
+
+
+class HotspotMatrix:
+    """Önceden hesaplanmış merkezler arası matrisi bellekte tutar; lookup grid hücresiyle O(1)."""
+
+    def __init__(self, snap_km=SNAP_KM, reload_sec=RELOAD_SEC):
+        self.snap_km = snap_km
+        self.reload_sec = reload_sec
+        self.hotspots = []
+        self.distance = []
+        self.duration = []
+        self.grid = defaultdict(list)   # hücre -> [hotspot index]
+        self.built_at = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        doc = get_mongo_collection(HOTSPOT_COLLECTION).find_one({"_id": HOTSPOT_DOC_ID})
+        if not doc or doc.get("built_at") == self.built_at:
+            return
+        grid = defaultdict(list)
+        for idx, h in enumerate(doc["hotspots"]):
+            grid[_cell(h["lat"], h["lon"], self.snap_km)].append(idx)
+        self.hotspots, self.distance, self.duration = doc["hotspots"], doc["distance_m"], doc["duration_s"]
+        self.grid, self.built_at = grid, doc.get("built_at")
+        print(f"🗺️ Hotspot matrix loaded: {len(self.hotspots)} hotspots (built {self.built_at})")
+
+    def ensure_loaded(self):
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.reload_sec:
+            return
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.reload_sec:
+                try:
+                    self._load()
+                except Exception as e:
+                    print(f"⚠️ Hotspot matrix could not be loaded: {e}")
+                self._checked_at = time.monotonic()
+
+    def snap(self, lat, lon):
+        """(hotspot index, km) veya None."""
+        best = None
+        for cell in _neighbors(_cell(lat, lon, self.snap_km)):
+            for idx in self.grid.get(cell, ()):
+                h = self.hotspots[idx]
+                km = haversine_km(lat, lon, h["lat"], h["lon"])
+                if km <= self.snap_km and (best is None or km < best[1]):
+                    best = (idx, km)
+        return best
+
+    def lookup(self, start_lat, start_lon, end_lat, end_lon):
+        """İki uç farklı merkezlere snap oluyorsa (metre, saniye), değilse None."""
+        self.ensure_loaded()
+        if not self.hotspots:
+            return None
+        start, end = self.snap(start_lat, start_lon), self.snap(end_lat, end_lon)
+        if not start or not end or start[0] == end[0]:
+            return None
+        distance = self.distance[start[0]][end[0]]
+        duration = self.duration[start[0]][end[0]]
+        if distance is None or duration is None:
+            return None
+        # Uçların merkeze olan uzaklığı kaba yol payı olarak eklenir
+        offset_km = (start[1] + end[1]) * ROAD_FACTOR
+        return distance + offset_km * 1000, duration + offset_km / SNAP_SPEED_KMH * 3600
@@ -0,0 +1,83 @@
+# utils/match_rules.py
+import os
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from geopy.distance import geodesic
+
+# MatchFinder'ın aday kuralları. Geo servisi de aynı kurallarla matcher'ın soracağı
+# rotaları önceden tahmin edip distance_cache'i ısıtır (bkz. geo/route_prefetch.py).
+MAX_DISTANCE_KM = 20
+MAX_TIME_DIFF_MIN = 240
+# MatchFinder'da eşleşmeyi elemez: rota bilinmiyorken tahmin bandı bu limitin net altında/üstündeyse
+# routing API'ye gidilmez, değerler tahminden doldurulur. Zincir/filo grafiğinde (job_graph) ise
+# tüm boş gidişler için üst sınırdır.
+MAX_ROAD_KM = float(os.getenv("MATCH_MAX_ROAD_KM", "35"))
+
+
+def calculate_arrival(start_time, duration_seconds):
+    if not duration_seconds:
+        return start_time
+    try:
+        return start_time + timedelta(seconds=float(duration_seconds))
+    except (TypeError, ValueError):
+        return start_time
+
+
+def is_valid_coords(lat, lon):
+    try:
+        return (
+            lat is not None and lon is not None and
+            isinstance(lat, (int, float)) and isinstance(lon, (int, float)) and
+            not (lat != lat or lon != lon)
+        )
+    except Exception:
+        return False
+
+
+def route_decision(estimate, time_budget_min, max_road_km=MAX_ROAD_KM):
+    """
+    Rota bilinmiyorken tahmine göre karar:
+    'prune' (en iyimser tahmin bile limit dışı), 'estimate' (en kötü tahmin bile uygun), 'route' (sınırda, API gerekli).
+    MatchFinder ve route prefetch 'prune'/'estimate' için API'ye gitmez; eşleşmeyi elemek çağıranın işidir.
+    """
+    if not estimate:
+        return "route"
+    if estimate["km_low"] > max_road_km or estimate["min_low"] > time_budget_min:
+        return "prune"
+    if estimate["km_high"] <= max_road_km and estimate["min_high"] <= time_budget_min:
+        return "estimate"
+    return "route"
+
+
+def _sorted_by_departure(records, time_field):
+    valid = [r for r in records if r.get(time_field) and is_valid_coords(r.get('Pickup_lat'), r.get('Pickup_lon'))]
+    valid.sort(key=lambda r: r[time_field])
+    return valid, [r[time_field] for r in valid]
+
+
+def candidate_pairs(rides, calendar):
+    """
+    Matcher'ın rota soracağı (ride, aday, kaynak, bekleme_dk, kuş_uçuşu_km) çiftleri.
+    Adaylar kalkışa göre sıralanır; her ride için sadece [varış, varış + MAX_TIME_DIFF_MIN] penceresine bakılır.
+    """
+    sources = [
+        ("Rides", *_sorted_by_departure(rides, 'ride_datetime'), 'ride_datetime'),
+        ("Calendar", *_sorted_by_departure(calendar, 'Transfer_Datetime'), 'Transfer_Datetime'),
+    ]
+    for ride in rides:
+        dropoff = (ride.get('Dropoff_lat'), ride.get('Dropoff_lon'))
+        if not ride.get('ride_datetime') or not is_valid_coords(*dropoff):
+            continue
+        arrival = calculate_arrival(ride['ride_datetime'], ride.get("Duration_seconds", 0))
+        window_end = arrival + timedelta(minutes=MAX_TIME_DIFF_MIN)
+        for source, candidates, departures, time_field in sources:
+            lo, hi = bisect_left(departures, arrival), bisect_right(departures, window_end)
+            for candidate in candidates[lo:hi]:
+                if source == "Rides" and candidate['ID'] == ride['ID']:
+                    continue
+                pickup = (candidate['Pickup_lat'], candidate['Pickup_lon'])
+                dist_km = geodesic(dropoff, pickup).km
+                if dist_km > MAX_DISTANCE_KM:
+                    continue
+                wait_min = (candidate[time_field] - arrival).total_seconds() / 60
+                yield ride, candidate, source, wait_min, dist_km
@@ -0,0 +1,94 @@
+# utils/mongo_stats.py
+import os
+import time
+from collections import Counter
+from utils.mongodb_utils import get_mongo_collection
+
+# GUI gibi sık okuyan yerler için kısa süreli cache (saniye). Loglar taze değer ister: ttl=0.
+STATS_TTL_SEC = int(os.getenv("MONGO_STATS_TTL_SEC", "15"))
+
+# System Status sekmesindeki koleksiyonlar: (koleksiyon, son güncelleme alanı)
+SYSTEM_COLLECTIONS = [
+    ("calendar_tasks", "LastSeen"),
+    ("distance_cache", "LastUpdated"),
+    ("elife_rides", "LastSeen"),
+    ("enriched_rides", "LastSeen"),
+    ("geo_addresses", "LastUpdated"),
+    ("match_data", "last_updated"),
+    ("wt_rides", "LastSeen"),
+]
+
+_cache = {}
+_ensured_indexes = set()
+
+
+def _cached(key, ttl, fn):
+    if ttl:
+        hit = _cache.get(key)
+        if hit and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+    value = fn()
+    _cache[key] = (time.monotonic(), value)
+    return value
+
+
+def ensure_index_once(collection_name, keys):
+    """Aynı süreçte index'i bir kez oluşturur (create_index idempotent ama her seferinde round-trip)."""
+    memo_key = (collection_name, tuple(keys))
+    if memo_key in _ensured_indexes:
+        return
+    try:
+        get_mongo_collection(collection_name).create_index(keys)
+    except Exception as e:
+        print(f"⚠️ {collection_name} index oluşturulamadı ({keys}): {e}")
+    _ensured_indexes.add(memo_key)
+
+
+def status_counts(collection_name, source=None, ttl=0):
+    """Status dağılımı ($group ile sunucu tarafında sayılır)."""
+    def run():
+        ensure_index_once(collection_name, [("Source", 1), ("Status", 1)])
+        pipeline = []
+        if source:
+            pipeline.append({"$match": {"Source": source}})
+        pipeline.append({"$group": {"_id": "$Status", "count": {"$sum": 1}}})
+        counts = Counter()
+        for row in get_mongo_collection(collection_name).aggregate(pipeline):
+            counts[row["_id"] or "UNKNOWN"] += row["count"]
+        return counts
+    return _cached(("status", collection_name, source), ttl, run)
+
+
+def document_count(collection_name, ttl=STATS_TTL_SEC):
+    """Metadata'dan yaklaşık doküman sayısı (tarama yok)."""
+    return _cached(
+        ("count", collection_name), ttl,
+        lambda: get_mongo_collection(collection_name).estimated_document_count()
+    )
+
+
+def last_update(collection_name, field, ttl=STATS_TTL_SEC):
+    """En büyük tarih alanı: index üzerinden sort(-1).limit(1)."""
+    def run():
+        ensure_index_once(collection_name, [(field, 1)])
+        cursor = (
+            get_mongo_collection(collection_name)
+            .find({field: {"$ne": None}}, {"_id": 0, field: 1})
+            .sort(field, -1)
+            .limit(1)
+        )
+        doc = next(iter(cursor), None)
+        return doc.get(field) if doc else None
+    return _cached(("last", collection_name, field), ttl, run)
+
+
+def system_status(collections=SYSTEM_COLLECTIONS, ttl=STATS_TTL_SEC):
+    """Her koleksiyon için {collection, count, last_update}."""
+    return [
+        {
+            "collection": name,
+            "count": document_count(name, ttl=ttl),
+            "last_update": last_update(name, field, ttl=ttl),
+        }
+        for name, field in collections
+    ]
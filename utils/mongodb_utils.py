@@ -4,8 +4,58 @@ from dotenv import load_dotenv
 
 load_dotenv()  # .env.client_usetravel.client_city dosyasını yükle
 
+# MongoClient kendi connection pool'unu tutar; her çağrıda yenisini açmak yerine URI başına tek client
+_CLIENTS = {}
+
+
+def get_mongo_client(uri=None):
+    uri = uri or os.getenv("MONGO_URI")
+    client = _CLIENTS.get(uri)
+    if client is None:
+        client = _CLIENTS[uri] = MongoClient(uri)
+    return client
+
+
 def get_mongo_collection(collection_name):
-    uri = os.getenv("MONGO_URI")
     db_name = os.getenv("MONGODB_DB_NAME")
-    client = MongoClient(uri)
-    return client[db_name][collection_name]
+    return get_mongo_client()[db_name][collection_name]
+
+
+# --- Generation sweep (REMOVED işaretleme) ---
+# Her cycle yeni bir SyncGeneration üretir ve gördüğü satırlara yazar; cycle sonunda
+# bu generation'ı taşımayan satırlar REMOVED olur. Komut boyutu ID sayısından bağımsızdır.
+
+def new_sync_generation():
+    from bson import ObjectId
+    return ObjectId()
+
+
+_SYNC_INDEXED = set()
+
+
+def ensure_sync_generation_index(collection):
+    """Süreç başına koleksiyon için bir kez (scraper her cycle/instance'ta çağırabilir)."""
+    if collection.full_name in _SYNC_INDEXED:
+        return
+    try:
+        collection.create_index([("Source", 1), ("SyncGeneration", 1)], name="idx_source_syncgen")
+    except Exception as e:
+        print(f"⚠️ idx_source_syncgen oluşturulamadı: {e}")
+    _SYNC_INDEXED.add(collection.full_name)
+
+
+def sweep_removed(collection, source, generation, removed_at=None):
+    """Bu generation'da görülmeyen (Source'a ait) kayıtları REMOVED yapar."""
+    update = {"$set": {"Status": "REMOVED"}}
+    if removed_at is None:
+        update["$currentDate"] = {"LastSeen": True}
+    else:
+        update["$set"]["LastSeen"] = removed_at
+    return collection.update_many(
+        {
+            "Source": source,
+            "SyncGeneration": {"$ne": generation},
+            "Status": {"$ne": "REMOVED"}
+        },
+        update
+    )
@@ -0,0 +1,40 @@
+# utils/negative_cache.py
+import os
+import random
+from datetime import datetime, timedelta
+
+# Başarısız geocode/route kayıtları kalıcı değil: RetryAt'e kadar "başarısız" sayılır,
+# sonra arka plandaki retry worker tarafından tekrar denenir. Bekleme her denemede ikiye katlanır.
+BASE_SEC = int(os.getenv("NEGATIVE_CACHE_BASE_SEC", "900"))
+MAX_SEC = int(os.getenv("NEGATIVE_CACHE_MAX_SEC", "86400"))
+MAX_ATTEMPTS = int(os.getenv("NEGATIVE_CACHE_MAX_ATTEMPTS", "10"))
+
+
+def negative_fields(previous_attempts=0, now=None):
+    """
+    Başarısız bir deneme sonrası yazılacak alanlar: Attempts ve RetryAt.
+    MAX_ATTEMPTS'e ulaşınca RetryAt None olur (kalıcı başarısız, tekrar denenmez).
+    """
+    now = now or datetime.now()
+    attempts = previous_attempts + 1
+    if attempts >= MAX_ATTEMPTS:
+        return {"Attempts": attempts, "RetryAt": None}
+    delay = min(BASE_SEC * 2 ** (attempts - 1), MAX_SEC)
+    delay *= random.uniform(0.9, 1.1)  # aynı anda düşen kayıtlar aynı anda tekrar denenmesin
+    return {"Attempts": attempts, "RetryAt": now + timedelta(seconds=delay)}
+
+
+def due_query(failed_query, now=None):
+    """RetryAt'i geçmiş negatif kayıtlar (RetryAt alanı olmayan eski kayıtlar dahil)."""
+    now = now or datetime.now()
+    return {
+        **failed_query,
+        "$or": [{"RetryAt": {"$lte": now}}, {"RetryAt": {"$exists": False}}]
+    }
+
+
+def ensure_retry_index(collection, status_field):
+    try:
+        collection.create_index([(status_field, 1), ("RetryAt", 1)], name="idx_negative_retry")
+    except Exception as e:
+        print(f"⚠️ idx_negative_retry oluşturulamadı: {e}")
@@ -0,0 +1,30 @@
+# utils/plan_snapshots.py
+from pymongo import InsertOne, DeleteMany
+from utils.mongodb_utils import get_mongo_collection
+from utils.mongo_stats import ensure_index_once
+
+# Match servisinin her cycle'da yeniden hesapladığı planlar (vehicle_chains, fleet_plans).
+# Yeni set önce yazılır, eskisi sonra silinir; okuyucular sadece en son computed_at setini görür,
+# böylece cycle ortasında boş koleksiyon okunmaz.
+CHAINS_COLLECTION = "vehicle_chains"
+PLANS_COLLECTION = "fleet_plans"
+
+
+def replace_snapshot(collection_name, docs, computed_at):
+    for doc in docs:
+        doc["computed_at"] = computed_at
+    ops = [InsertOne(d) for d in docs] + [DeleteMany({"computed_at": {"$ne": computed_at}})]
+    ensure_index_once(collection_name, [("computed_at", 1), ("Day", 1)])
+    get_mongo_collection(collection_name).bulk_write(ops, ordered=True)
+
+
+def load_latest(collection_name, start_day, end_day):
+    """Son hesaplanan setten [start_day, end_day] günleri ('YYYY-MM-DD')."""
+    collection = get_mongo_collection(collection_name)
+    latest = collection.find_one({}, {"computed_at": 1}, sort=[("computed_at", -1)])
+    if not latest:
+        return []
+    return list(collection.find(
+        {"computed_at": latest["computed_at"], "Day": {"$gte": start_day, "$lte": end_day}},
+        {"_id": 0}
+    ).sort([("Day", 1)]))
@@ -1,107 +1,203 @@
 # utils/process_helper.py
 
 import psutil
-import platform
 import os
-from typing import Set, List
+import signal
+import time
+from typing import Dict, List, Set
 
+# Açık tracker'lar (kök PID'ler -> tracker). Temizlik sadece bunların ağaçlarında yapılır.
+_TRACKERS: Dict[tuple, "DriverProcessTracker"] = {}
 
-def get_all_children_pids(pid: int) -> Set[int]:
-    """Find all children recursively for a given parent PID (cross-platform)."""
-    try:
-        parent = psutil.Process(pid)
-        children = parent.children(recursive=True)
-        return {child.pid for child in children}
-    except Exception as e:
-        print(f"⚠️ Failed to get child processes for PID {pid}: {e}")
-        return set()
 
+def tracked_service_kwargs() -> dict:
+    """selenium Service(...) için: chromedriver'ı ayrı bir process group'ta başlat (POSIX)."""
+    if os.name == "posix":
+        return {"popen_kw": {"start_new_session": True}}
+    return {}
 
-def is_safe_to_kill(proc: psutil.Process, protected_pids: Set[int], active_cmdlines: List[List[str]]) -> bool:
-    """Determine if a process is safe to kill based on various criteria."""
-    try:
-        # Skip protected PIDs
-        if proc.pid in protected_pids:
-            return False
 
-        # Skip processes with remote debugging port (likely active sessions)
-        cmdline = proc.cmdline()
-        if any('--remote-debugging-port' in arg for arg in cmdline):
-            return False
-
-        # Skip processes matching active command lines
-        for active_cmd in active_cmdlines:
-            if cmdline == active_cmd:
-                return False
-
-        return True
+def get_browser_root_pids(driver) -> List[int]:
+    """Driver'ın başlattığı chromedriver ve (uc ise) chrome ana PID'leri."""
+    pids = []
+    try:
+        pids.append(driver.service.process.pid)
+    except Exception:
+        pass
+    browser_pid = getattr(driver, "browser_pid", None)
+    if browser_pid and browser_pid not in pids:
+        pids.append(browser_pid)
+    return pids
+
+
+def _direct_children(pid: int) -> Set[int]:
+    """/proc/<pid>/task/*/children üzerinden doğrudan çocuklar (tüm tabloyu taramadan)."""
+    children = set()
+    task_dir = f"/proc/{pid}/task"
+    if os.path.isdir("/proc"):
+        try:
+            for tid in os.listdir(task_dir):
+                with open(f"{task_dir}/{tid}/children") as f:
+                    children.update(int(c) for c in f.read().split())
+            return children
+        except FileNotFoundError:
+            if not os.path.exists(task_dir):
+                return children  # süreç bitmiş
+        except OSError:
+            pass
+
+    # /proc/.../children yoksa (macOS/Windows, eski kernel) psutil'e düş
+    try:
+        return {c.pid for c in psutil.Process(pid).children()}
     except (psutil.NoSuchProcess, psutil.AccessDenied):
-        return False
-
+        return children
 
-def kill_zombie_chrome_processes(active_driver=None):
-    """🚑 Hybrid method to kill Chrome zombies without affecting real user Chrome (cross-platform)."""
-    try:
-        active_pids = set()
-        active_cmdlines = []
 
-        if active_driver:
+def get_all_children_pids(pid: int) -> Set[int]:
+    """Find all children recursively for a given parent PID (sadece kendi alt ağacını gezer)."""
+    found = set()
+    stack = [pid]
+    while stack:
+        for child in _direct_children(stack.pop()):
+            if child not in found:
+                found.add(child)
+                stack.append(child)
+    return found
+
+
+class DriverProcessTracker:
+    """
+    Bir driver'ın başlattığı süreç ağacını kaydeder.
+
+    Keşif sadece kök PID'lerden aşağı doğru yapılır (O(kendi süreçlerimiz)).
+    Görülen her süreç psutil.Process olarak saklanır; is_running() create_time
+    kontrolü yaptığı için PID tekrar kullanılsa bile yanlış süreç öldürülmez.
+    Kök ayrı bir process group'taysa kapanışta tüm grup tek sinyalle temizlenir.
+    """
+
+    def __init__(self, driver=None, register=True):
+        self.register = register
+        self.root_pids: List[int] = []
+        self.pgids: Set[int] = set()
+        self.known: Dict[int, psutil.Process] = {}
+        self._last_cpu = None
+        if driver is not None:
+            self.attach(driver)
+
+    def attach(self, driver):
+        self.root_pids = get_browser_root_pids(driver)
+        own_pgid = os.getpgrp() if hasattr(os, "getpgrp") else None
+        for pid in self.root_pids:
             try:
-                # Get driver PID and all its children
-                driver_pid = active_driver.service.process.pid
-                active_pids.add(driver_pid)
-                child_pids = get_all_children_pids(driver_pid)
-                active_pids.update(child_pids)
-                print(f"🛡️ Active PIDs: {list(active_pids)} (Main + Children)")
-
-                # Store command lines of active processes for additional protection
-                try:
-                    driver_process = psutil.Process(driver_pid)
-                    active_cmdlines.append(driver_process.cmdline())
-                    for child in driver_process.children(recursive=True):
-                        active_cmdlines.append(child.cmdline())
-                except Exception as e:
-                    print(f"⚠️ Cannot fetch active driver command lines: {e}")
-
-            except Exception as e:
-                print(f"⚠️ Couldn't get active driver PID: {e}")
-
-        # Find all Chrome and ChromeDriver processes
-        chrome_procs = []
-        driver_procs = []
-
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+                pgid = os.getpgid(pid)
+                if pgid != own_pgid:
+                    self.pgids.add(pgid)
+            except (AttributeError, OSError):
+                continue
+        self.refresh()
+        if self.register:
+            _TRACKERS[tuple(self.root_pids)] = self
+        return self
+
+    def refresh(self) -> List[psutil.Process]:
+        """Yeni doğan çocukları ekle, ölenleri düş."""
+        for root in self.root_pids:
+            for pid in [root] + list(get_all_children_pids(root)):
+                if pid not in self.known:
+                    try:
+                        self.known[pid] = psutil.Process(pid)
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+        alive = {}
+        for pid, proc in self.known.items():
             try:
-                if not proc.info['name']:
-                    continue
-
-                pname = proc.info['name'].lower()
-                if 'chrome' in pname and 'chromedriver' not in pname:
-                    chrome_procs.append(proc)
-                elif 'chromedriver' in pname:
-                    driver_procs.append(proc)
+                if proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE:
+                    alive[pid] = proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self.known = alive
+        return list(alive.values())
+
+    def metrics(self) -> dict:
+        """Ağacın RSS ve CPU kullanımı (son çağrıdan bu yana CPU yüzdesi dahil)."""
+        procs = self.refresh()
+        rss = 0
+        cpu_seconds = 0.0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    times = proc.cpu_times()
+                    cpu_seconds += times.user + times.system
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
 
-        print(f"🔍 Found {len(chrome_procs)} Chrome processes, {len(driver_procs)} ChromeDriver processes.")
-
-        killed = 0
-        for proc in chrome_procs + driver_procs:
-            if is_safe_to_kill(proc, active_pids, active_cmdlines):
-                try:
-                    print(f"💀 Killing zombie PID {proc.pid} ({proc.info['name']})")
-                    proc.kill()
-                    killed += 1
-                except Exception as e:
-                    print(f"⚠️ Failed to kill PID {proc.pid}: {e}")
+        now = time.monotonic()
+        cpu_percent = None
+        if self._last_cpu:
+            prev_time, prev_cpu = self._last_cpu
+            if now > prev_time:
+                cpu_percent = max(0.0, (cpu_seconds - prev_cpu) / (now - prev_time) * 100)
+        self._last_cpu = (now, cpu_seconds)
+
+        return {
+            "processes": len(procs),
+            "rss_mb": rss / 1024 / 1024,
+            "cpu_seconds": cpu_seconds,
+            "cpu_percent": cpu_percent,
+        }
+
+    def reap(self, timeout=3) -> int:
+        """Sadece bu ağacı kapat: önce terminate, sonra kill, en son process group."""
+        procs = self.refresh()
+        for proc in procs:
+            try:
+                proc.terminate()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        _, alive = psutil.wait_procs(procs, timeout=timeout)
+        for proc in alive:
+            try:
+                proc.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
 
-        if killed > 0:
-            print(f"✅ Killed {killed} zombie Chrome/ChromeDriver processes.")
-        else:
-            print(f"🛡️ No zombie processes found. Only active session and user sessions kept.")
+        for pgid in self.pgids:
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                continue
 
-    except Exception as e:
-        print(f"⚠️ Zombie killer error: {e}")
+        reap_zombie_children()
+        _TRACKERS.pop(tuple(self.root_pids), None)
+        self.known = {}
+        return len(procs)
+
+
+def get_tracker(driver) -> DriverProcessTracker:
+    """Kayıtlı tracker'ı döndür; yoksa kayıt dışı geçici bir tracker oluştur."""
+    return _TRACKERS.get(tuple(get_browser_root_pids(driver))) or DriverProcessTracker(driver, register=False)
+
+
+def reap_zombie_children() -> int:
+    """
+    Bu sürecin çocuğu olan zombileri toplar (os.waitpid, tablo taraması yok).
+    Docker'da python PID 1 olduğunda öksüz kalan chrome süreçleri bize devredilir.
+    """
+    if os.name != "posix":
+        return 0
+    reaped = 0
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            break
+        reaped += 1
+    if reaped:
+        print(f"🧹 Reaped {reaped} zombie child process(es).")
+    return reaped
 
 
 def log_memory_usage(context=""):
@@ -112,4 +208,4 @@ def log_memory_usage(context=""):
         memory_usage_mb = mem_info.rss / 1024 / 1024
         print(f"📊 Memory usage {context}: {memory_usage_mb:.2f} MB")
     except Exception as e:
-        print(f"⚠️ Memory log error: {e}")
\ No newline at end of file
+        print(f"⚠️ Memory log error: {e}")
@@ -0,0 +1,146 @@
+# utils/road_estimator.py
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from utils.mongodb_utils import get_mongo_collection
+from utils.hotspot_matrix import haversine_km
+
+# distance_cache'te biriken gerçek rotalardan öğrenilen yol mesafesi/süresi tahmini.
+# Model: (bölge hücresi, yön, mesafe bandı) gruplarında yol/kuş uçuşu oranı ve dk/km
+# dağılımının yüzdelikleri. Az örnekli gruplar daha genel gruba düşer.
+ESTIMATOR_COLLECTION = "road_estimator"
+ESTIMATOR_DOC_ID = "current"
+CELL_DEG = float(os.getenv("ROAD_ESTIMATOR_CELL_DEG", "0.2"))
+MIN_SAMPLES = int(os.getenv("ROAD_ESTIMATOR_MIN_SAMPLES", "20"))
+RELOAD_SEC = int(os.getenv("ROAD_ESTIMATOR_RELOAD_SEC", "600"))
+DISTANCE_BANDS_KM = (3, 10, 30)
+SECTORS = 8
+MIN_HAVERSINE_KM = 0.3   # çok kısa çiftlerde oran anlamsız
+
+
+def bearing_sector(lat1, lon1, lat2, lon2):
+    lat1, lat2 = math.radians(lat1), math.radians(lat2)
+    dlon = math.radians(lon2 - lon1)
+    x = math.sin(dlon) * math.cos(lat2)
+    y = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(dlon)
+    bearing = (math.degrees(math.atan2(x, y)) + 360) % 360
+    return int((bearing + 180 / SECTORS) // (360 / SECTORS)) % SECTORS
+
+
+def distance_band(km):
+    return sum(km > b for b in DISTANCE_BANDS_KM)
+
+
+def group_keys(lat1, lon1, lat2, lon2, km):
+    """En özelden en genele grup anahtarları."""
+    cell = f"{math.floor((lat1 + lat2) / 2 / CELL_DEG)}:{math.floor((lon1 + lon2) / 2 / CELL_DEG)}"
+    sector, band = bearing_sector(lat1, lon1, lat2, lon2), distance_band(km)
+    return [f"c{cell}|s{sector}|b{band}", f"c{cell}|b{band}", f"b{band}", "all"]
+
+
+def _quantiles(values, qs=(0.1, 0.5, 0.9)):
+    values = sorted(values)
+    n = len(values)
+    return [values[min(n - 1, int(q * n))] for q in qs]
+
+
+def train(samples):
+    """samples: [(lat1, lon1, lat2, lon2, road_m, seconds)] -> {grup: [r10, r50, r90, p10, p50, p90, n]}"""
+    ratios, paces = defaultdict(list), defaultdict(list)
+    for lat1, lon1, lat2, lon2, road_m, seconds in samples:
+        km = haversine_km(lat1, lon1, lat2, lon2)
+        road_km = road_m / 1000
+        if km < MIN_HAVERSINE_KM or road_km <= 0 or seconds is None:
+            continue
+        ratio, pace = road_km / km, (seconds / 60) / road_km
+        if not (1.0 <= ratio <= 5.0):   # bozuk geocode / feribot vb. uç değerler
+            continue
+        for key in group_keys(lat1, lon1, lat2, lon2, km):
+            ratios[key].append(ratio)
+            paces[key].append(pace)
+    return {
+        key: _quantiles(ratios[key]) + _quantiles(paces[key]) + [len(ratios[key])]
+        for key in ratios
+    }
+
+
+def load_training_samples():
+    docs = get_mongo_collection("distance_cache").find(
+        {"Distance_meters": {"$ne": None}},
+        {"_id": 0, "StartLat": 1, "StartLon": 1, "EndLat": 1, "EndLon": 1,
+         "Distance_meters": 1, "Duration_seconds": 1}
+    )
+    return [
+        (d["StartLat"], d["StartLon"], d["EndLat"], d["EndLon"], d["Distance_meters"], d.get("Duration_seconds"))
+        for d in docs
+        if None not in (d.get("StartLat"), d.get("StartLon"), d.get("EndLat"), d.get("EndLon"))
+    ]
+
+
+def train_and_save():
+    samples = load_training_samples()
+    groups = train(samples)
+    get_mongo_collection(ESTIMATOR_COLLECTION).replace_one({"_id": ESTIMATOR_DOC_ID}, {
+        "_id": ESTIMATOR_DOC_ID,
+        "groups": groups,
+        "samples": len(samples),
+        "trained_at": datetime.now(),
+    }, upsert=True)
+    print(f"✅ Road estimator trained: {len(samples)} routes, {len(groups)} groups")
+
+
+def estimator_trained_at():
+    doc = get_mongo_collection(ESTIMATOR_COLLECTION).find_one({"_id": ESTIMATOR_DOC_ID}, {"trained_at": 1})
+    return doc.get("trained_at") if doc else None
+
+
+class RoadEstimator:
+    def __init__(self, min_samples=MIN_SAMPLES, reload_sec=RELOAD_SEC):
+        self.min_samples = min_samples
+        self.reload_sec = reload_sec
+        self.groups = {}
+        self.trained_at = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        doc = get_mongo_collection(ESTIMATOR_COLLECTION).find_one({"_id": ESTIMATOR_DOC_ID})
+        if doc and doc.get("trained_at") != self.trained_at:
+            self.groups, self.trained_at = doc.get("groups", {}), doc.get("trained_at")
+            print(f"📐 Road estimator loaded: {len(self.groups)} groups (trained {self.trained_at})")
+
+    def ensure_loaded(self):
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.reload_sec:
+            return
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.reload_sec:
+                try:
+                    self._load()
+                except Exception as e:
+                    print(f"⚠️ Road estimator could not be loaded: {e}")
+                self._checked_at = time.monotonic()
+
+    def estimate(self, start_coords, end_coords):
+        """
+        {'km', 'min', 'km_low', 'km_high', 'min_low', 'min_high', 'group', 'n'} veya None.
+        low/high: grubun %10-%90 bandı.
+        """
+        self.ensure_loaded()
+        (lat1, lon1), (lat2, lon2) = start_coords, end_coords
+        km = haversine_km(lat1, lon1, lat2, lon2)
+        if km < MIN_HAVERSINE_KM:
+            return None
+        for key in group_keys(lat1, lon1, lat2, lon2, km):
+            stats = self.groups.get(key)
+            if stats and stats[6] >= self.min_samples:
+                r10, r50, r90, p10, p50, p90, n = stats
+                return {
+                    "km": km * r50, "min": km * r50 * p50,
+                    "km_low": km * r10, "km_high": km * r90,
+                    "min_low": km * r10 * p10, "min_high": km * r90 * p90,
+                    "group": key, "n": n,
+                }
+        return None
@@ -0,0 +1,246 @@
+# utils/session_manager.py
+import json
+import os
+from datetime import datetime, timedelta
+from utils.path_helper import get_data_path
+from utils.process_helper import DriverProcessTracker
+
+# Sayfadaki fetch/XHR cevaplarını izler; 401 gelirse oturum düşmüş demektir.
+AUTH_WATCH_SCRIPT = """
+(function () {
+    if (window.__authWatchInstalled) { return; }
+    window.__authWatchInstalled = true;
+    window.__authFailures = 0;
+    var note = function (status) { if (status === 401) { window.__authFailures += 1; } };
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function () {
+            return origFetch.apply(this, arguments).then(function (resp) {
+                note(resp.status);
+                return resp;
+            });
+        };
+    }
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        this.addEventListener('loadend', function () { note(this.status); });
+        return origSend.apply(this, arguments);
+    };
+})();
+"""
+
+READ_LOCAL_STORAGE_SCRIPT = """
+var out = {};
+for (var i = 0; i < window.localStorage.length; i++) {
+    var k = window.localStorage.key(i);
+    out[k] = window.localStorage.getItem(k);
+}
+return out;
+"""
+
+
+class BrowserSession:
+    """
+    Tek bir tarayıcıyı canlı tutan oturum yöneticisi.
+
+    Login nesnesi (ElifeAutoLoginFast, WTAutoLoginFast ...) şu arayüzü sağlar:
+      - login(), get_driver(), close()
+      - BASE_URL: cookie'lerin yükleneceği domain adresi
+      - LOGIN_URL_MARKERS: login sayfasına yönlenildiğini gösteren URL parçaları
+      - is_logged_in(): sayfa durumuna göre oturum kontrolü
+      - open_workspace(): oturum açıkken çalışma sayfasına (ride listesi) geç
+
+    Oturum süre dolunca değil, sayfa düşmüş görünce (login redirect, 401) yenilenir.
+    Cookie + localStorage diske yazılır; yeniden başlatmada login formu atlanabilir.
+    """
+
+    def __init__(self, name, login_factory, store_path=None, persist_interval_min=5):
+        self.name = name
+        self.login_factory = login_factory
+        self.store_path = store_path or get_data_path(f"sessions/{name}_session.json")
+        self.persist_interval = timedelta(minutes=persist_interval_min)
+        self.session = None
+        self.driver = None
+        self.tracker = None
+        self.last_login = None
+        self.last_persist = None
+        self._needs_check = False
+
+    # --- Public API ---
+
+    def ensure(self):
+        """Çalışır durumda, oturumu açık bir driver döndürür."""
+        if self.driver is None:
+            self._start()
+            return self.driver
+
+        if not self.is_alive():
+            print(f"💀 [{self.name}] Tarayıcı yanıt vermiyor, yeniden başlatılıyor...")
+            self.close()
+            self._start()
+            return self.driver
+
+        if self._needs_check or self.is_expired():
+            self.refresh()
+
+        if self.last_persist is None or datetime.now() - self.last_persist > self.persist_interval:
+            self.persist()
+
+        return self.driver
+
+    def mark_expired(self):
+        """Scraper oturumdan şüphelenirse bir sonraki ensure() kontrol eder."""
+        self._needs_check = True
+
+    def handle_error(self):
+        """Döngü hatasında tarayıcıyı kapatmak yerine sadece sağlık kontrolü planla."""
+        if self.driver is not None and not self.is_alive():
+            self.close()
+        else:
+            self.mark_expired()
+
+    def is_alive(self):
+        try:
+            _ = self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def is_expired(self):
+        try:
+            url = self.driver.current_url or ""
+            markers = getattr(self.session, "LOGIN_URL_MARKERS", ())
+            if any(m in url for m in markers):
+                print(f"🔐 [{self.name}] Login sayfasına yönlendirilmiş: {url}")
+                return True
+
+            failures = self.driver.execute_script("return window.__authFailures || 0;")
+            if failures:
+                print(f"🔐 [{self.name}] {failures} adet 401 cevabı görüldü.")
+                return True
+
+            checker = getattr(self.session, "is_logged_in", None)
+            if checker and not checker():
+                print(f"🔐 [{self.name}] Sayfa oturum kapalı görünüyor.")
+                return True
+            return False
+        except Exception as e:
+            print(f"⚠️ [{self.name}] Oturum kontrolü başarısız: {e}")
+            return True
+
+    def refresh(self):
+        """Önce sayfayı yenile (token/cookie tazelenir), olmazsa aynı tarayıcıda tekrar login ol."""
+        self._needs_check = False
+        self._install_auth_watch()
+
+        opener = getattr(self.session, "open_workspace", None)
+        if opener:
+            print(f"🔄 [{self.name}] Oturum yerinde yenileniyor...")
+            if opener() and not self.is_expired():
+                self.persist()
+                return self.driver
+
+        print(f"🔑 [{self.name}] Yeniden kimlik doğrulama (tarayıcı kapatılmadan)...")
+        self._login()
+        return self.driver
+
+    def persist(self):
+        try:
+            state = {
+                "saved_at": datetime.now().isoformat(),
+                "url": self.driver.current_url,
+                "cookies": self.driver.get_cookies(),
+                "local_storage": self.driver.execute_script(READ_LOCAL_STORAGE_SCRIPT) or {},
+            }
+            tmp_path = f"{self.store_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.store_path)
+            self.last_persist = datetime.now()
+        except Exception as e:
+            print(f"⚠️ [{self.name}] Oturum diske yazılamadı: {e}")
+
+    def close(self):
+        try:
+            if self.session:
+                self.session.close()
+            elif self.driver:
+                self.driver.quit()
+        except Exception:
+            pass
+        # quit() sonrası geride kalan chrome/chromedriver süreçlerini sadece bu ağaçta topla
+        if self.tracker:
+            self.tracker.reap()
+        self.driver = None
+        self.session = None
+        self.tracker = None
+
+    # --- Internals ---
+
+    def _start(self):
+        self.session = self.login_factory()
+        self.driver = self.session.get_driver()
+        self.tracker = DriverProcessTracker(self.driver)
+        self._install_auth_watch()
+
+        if self._restore():
+            print(f"♻️ [{self.name}] Kayıtlı oturum geri yüklendi, login atlandı.")
+            self.last_login = datetime.now()
+            self.persist()
+            return
+
+        self._login()
+
+    def _login(self):
+        if not self.session.login():
+            raise Exception(f"❌ [{self.name}] Login failed")
+        self.last_login = datetime.now()
+        self._needs_check = False
+        self._install_auth_watch()
+        self.persist()
+        print(f"✅ [{self.name}] Login successful")
+
+    def _install_auth_watch(self):
+        try:
+            if not getattr(self.driver, "_auth_watch_registered", False):
+                self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": AUTH_WATCH_SCRIPT})
+                self.driver._auth_watch_registered = True
+            self.driver.execute_script(AUTH_WATCH_SCRIPT)
+            self.driver.execute_script("window.__authFailures = 0;")
+        except Exception as e:
+            print(f"ℹ️ [{self.name}] Auth watcher kurulamadı: {e}")
+
+    def _restore(self):
+        base_url = getattr(self.session, "BASE_URL", None)
+        opener = getattr(self.session, "open_workspace", None)
+        if not base_url or not opener or not os.path.exists(self.store_path):
+            return False
+
+        try:
+            with open(self.store_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"⚠️ [{self.name}] Kayıtlı oturum okunamadı: {e}")
+            return False
+
+        cookies = state.get("cookies") or []
+        if not cookies:
+            return False
+
+        try:
+            self.driver.get(base_url)
+            for cookie in cookies:
+                if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+                    cookie.pop("sameSite", None)
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception:
+                    continue
+
+            for key, value in (state.get("local_storage") or {}).items():
+                self.driver.execute_script("window.localStorage.setItem(arguments[0], arguments[1]);", key, value)
+
+            return bool(opener()) and not self.is_expired()
+        except Exception as e:
+            print(f"⚠️ [{self.name}] Oturum geri yüklenemedi: {e}")
+            return False
@@ -10,6 +10,8 @@ from utils.driver_utils import focus_driver
 from utils.browser_helper import get_chrome_binary_path, get_chromedriver_path
 
 class WTAutoLogin:
+    LOGIN_URL_MARKERS = ("/login",)
+
     def __init__(self, headless=False):
         load_dotenv()
 
@@ -5,10 +5,16 @@ import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from utils.browser_helper import get_chrome_binary_path, get_chromedriver_path
+from utils.browser_helper import (
+    get_chrome_binary_path, get_chromedriver_path,
+    LOW_FOOTPRINT, apply_low_footprint_options, enable_resource_blocking,
+)
 
 
 class WTAutoLoginFast:
+    BASE_URL = "https://wtdriver.world-transfer.com/"
+    LOGIN_URL_MARKERS = ("/login",)
+
     def __init__(self, headless=False):
         load_dotenv()
 
@@ -31,6 +37,8 @@ class WTAutoLoginFast:
         options.add_argument("--disable-blink-features=AutomationControlled")
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
+        if LOW_FOOTPRINT:
+            apply_low_footprint_options(options)
 
         chrome_path = get_chrome_binary_path()
         driver_path = get_chromedriver_path()
@@ -45,11 +53,35 @@ class WTAutoLoginFast:
         self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
             'source': """Object.defineProperty(navigator, 'webdriver', { get: () => undefined })"""
         })
+        if LOW_FOOTPRINT:
+            enable_resource_blocking(self.driver)
+
+    def is_logged_in(self):
+        """Login sayfasında değilsek ve menü yüklüyse oturum açık."""
+        try:
+            if "/login" in (self.driver.current_url or ""):
+                return False
+            return bool(self.driver.find_elements(By.CSS_SELECTOR, 'ion-menu'))
+        except Exception:
+            return False
+
+    def open_workspace(self, wait_timeout=15):
+        """Kayıtlı token/cookie ile doğrudan Bookings sayfasını aç."""
+        try:
+            self.driver.get(f"{self.BASE_URL}booking-master")
+            WebDriverWait(self.driver, wait_timeout).until(
+                lambda d: d.find_elements(By.CSS_SELECTOR, 'app-booking-master')
+                or "/login" in (d.current_url or "")
+            )
+            return bool(self.driver.find_elements(By.CSS_SELECTOR, 'app-booking-master'))
+        except Exception as e:
+            print(f"ℹ️ Bookings sayfası açılamadı: {e}")
+            return False
 
     def login(self):
         try:
             print("🌐 Opening login page...")
-            self.driver.get("https://wtdriver.world-transfer.com/login")
+            self.driver.get(f"{self.BASE_URL}login")
 
             # Wait for GTU input
             WebDriverWait(self.driver, 10).until(
@@ -2,72 +2,26 @@
 
 import time
 import traceback
-import psutil  # ✅ Eksik olan import tamamlandı
 from datetime import datetime, timedelta
-from collections import Counter
 from wt_login import WTAutoLogin
 from wt_scv2 import WTScraperZoomScroll
-from utils.mongodb_utils import get_mongo_collection
-from utils.process_helperv2 import ChromeCleaner  # ✅ Cleaner import
-import atexit
-
-class PersistentSession:
-    def __init__(self):
-        self.session = None
-        self.driver = None
-        self.cleaner = None
-        atexit.register(self.cleanup_on_exit)
-
-    def ensure_login(self):
-        if not self.session:
-            self.session = WTAutoLogin(headless=True)
-            if not self.session.login():
-                self.session = None
-                raise Exception("🔐 Giriş başarısız")
-            self.driver = self.session.get_driver()
-
-            if not self.cleaner:
-                self.cleaner = ChromeCleaner(active_driver=self.driver)
-            else:
-                self.cleaner.active_driver = self.driver
-
-        return self.driver
-
-    def reset_session(self):
-        if self.session:
-            try:
-                self.session.close()
-            except:
-                pass
-        self.session = None
-        self.driver = None
-
-    def cleanup_on_exit(self):
-        if self.session:
-            print("🛑 [EXIT] Browser kapatılıyor...")
-            try:
-                self.session.close()
-            except Exception as e:
-                print(f"⚠️ [EXIT] Driver kapatılırken hata oluştu: {e}")
-        else:
-            print("ℹ️ [EXIT] Oturum zaten kapalı.")
-
-persistent = PersistentSession()
-scraper_cycle_counter = 0  # ✅ Full clean kontrolü için sayaç
+from utils.mongo_stats import status_counts
+from utils.mongodb_utils import (
+    get_mongo_collection, new_sync_generation, ensure_sync_generation_index, sweep_removed,
+)
+from utils.browser_pool import BrowserPool
+
+pool = BrowserPool("wt_legacy", lambda: WTAutoLogin(headless=True))
 
 def get_mongo_status_summary():
-    collection = get_mongo_collection("wt_rides")
-    status_counts = Counter()
-    for doc in collection.find({"Source": "wt"}):
-        status = doc.get("Status", "UNKNOWN")
-        status_counts[status] += 1
-    return status_counts
+    return status_counts("wt_rides", source="wt")
 
 def save_to_mongodb(df):
     try:
         collection = get_mongo_collection("wt_rides")
         now = datetime.now()
-        all_ids = set(df["ID"])
+        generation = new_sync_generation()
+        ensure_sync_generation_index(collection)
 
         new_count = 0
         updated_count = 0
@@ -87,7 +41,8 @@ def save_to_mongodb(df):
                         "FirstSeen": first_seen,
                         "LastSeen": now,
                         "Status": "REACTIVATED",  # veya "ACTIVE" olarak
-                        "Source": "wt"
+                        "Source": "wt",
+                        "SyncGeneration": generation
                     })
                     collection.update_one({"ID": ride_id}, {"$set": row_dict})
                     reactivated_count += 1
@@ -102,7 +57,8 @@ def save_to_mongodb(df):
                     "ride_datetime": row_dict.get("ride_datetime"),
                     "Price": row_dict.get("Price"),
                     "IsNewBadge": row_dict.get("IsNewBadge"),
-                    "Source": "wt"
+                    "Source": "wt",
+                    "SyncGeneration": generation
                 }
                 first_seen = existing.get("FirstSeen")
                 if isinstance(first_seen, str):
@@ -113,15 +69,11 @@ def save_to_mongodb(df):
                 collection.update_one({"ID": ride_id}, {"$set": updates})
                 updated_count += 1
             else:
-                row_dict.update({"FirstSeen": now, "LastSeen": now, "Status": "NEW", "Source": "wt"})
+                row_dict.update({"FirstSeen": now, "LastSeen": now, "Status": "NEW", "Source": "wt", "SyncGeneration": generation})
                 collection.insert_one(row_dict)
                 new_count += 1
 
-        removed_count = 0
-        for doc in collection.find({"Source": "wt"}):
-            if doc["ID"] not in all_ids and doc["Status"] != "REMOVED":
-                collection.update_one({"ID": doc["ID"]}, {"$set": {"Status": "REMOVED", "LastSeen": now}})
-                removed_count += 1
+        removed_count = sweep_removed(collection, "wt", generation, removed_at=now).modified_count
 
         print(f"✅ MongoDB kayıtları: NEW {new_count}, REACTIVATED {reactivated_count}, UPDATED {updated_count}, REMOVED {removed_count}")
 
@@ -140,67 +92,42 @@ def remove_old_removed_entries():
         print(f"⚠️ REMOVED kayıt silme hatası: {e}")
 
 def show_active_chrome_processes(context=""):
+    """Sadece havuzdaki driver ağaçlarını raporlar (tüm süreç tablosunu taramaz)."""
     print(f"\n🛠️ Active Chrome Processes {context}:")
-    for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
-        try:
-            if proc.info['name'] and ('chrome' in proc.info['name'].lower() or 'chromedriver' in proc.info['name'].lower()):
-                mem_mb = (proc.info['memory_info'].rss / 1024 / 1024) if proc.info['memory_info'] else 0
-                print(f"  PID {proc.pid} - {proc.info['name']} - {mem_mb:.1f} MB")
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
+    for row in pool.stats():
+        cpu = f", CPU {row['cpu_percent']:.0f}%" if row["cpu_percent"] is not None else ""
+        print(f"  Slot {row['slot']} - {row['processes']} process - {row['rss_mb']:.1f} MB{cpu}")
 
 def run_scraper_loop(interval=60):
-    global scraper_cycle_counter
     login_attempts = 0
 
     while True:
         try:
             print(f"\n=== WT Scraper Başlatılıyor: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
 
-            driver = persistent.ensure_login()
+            with pool.lease() as driver:
+                show_active_chrome_processes("(before scraping)")
 
-            show_active_chrome_processes("(before scraping)")
-
-            scraper = WTScraperZoomScroll(driver=driver, csv_path=None)
-            df, raw_card_count, parsed_count = scraper.run_scraping_cycle()
-
-            if parsed_count == 0:
-                print("⚠️ No rides parsed. Trying again in 5 seconds...")
-                time.sleep(5)
+                scraper = WTScraperZoomScroll(driver=driver, csv_path=None)
                 df, raw_card_count, parsed_count = scraper.run_scraping_cycle()
 
+                if parsed_count == 0:
+                    print("⚠️ No rides parsed. Trying again in 5 seconds...")
+                    time.sleep(5)
+                    df, raw_card_count, parsed_count = scraper.run_scraping_cycle()
+
             if df is not None and not df.empty:
                 save_to_mongodb(df)
                 remove_old_removed_entries()
 
             show_active_chrome_processes("(after scraping)")
 
-            # ✅ Scraping ve DB kayıt işlemi bitince manuel temizleme
-            if persistent.cleaner:
-                persistent.cleaner.manual_clean(force_full_clean=False)
-
-            scraper_cycle_counter += 1
-            if scraper_cycle_counter >= 5:
-                print("\n💥 5 scraping sonrası FULL CLEAN yapılıyor...")
-
-                # ✅ Önce tüm Chrome PID'leri öldür
-                if persistent.cleaner:
-                    persistent.cleaner.manual_clean(force_full_clean=True)
-
-                # ✅ Sonra driverı resetle ve yeniden login yap
-                print("♻️ FULL CLEAN sonrası yeni oturum açılıyor...")
-                persistent.reset_session()
-                persistent.ensure_login()
-
-                scraper_cycle_counter = 0
-
             print(f"⏱️ {interval} saniye sonra tekrar çalışacak...")
             time.sleep(interval)
 
         except Exception as e:
             print(f"\n[ERROR] Scraper çalışırken hata oluştu: {e}")
             traceback.print_exc()
-            persistent.reset_session()
             login_attempts += 1
             if login_attempts >= 3:
                 print("❌ 3 kez üst üste hata. Döngü duruyor.")
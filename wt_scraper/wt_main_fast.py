@@ -1,41 +1,15 @@
 # wt_main_fast.py
 import time
 import traceback
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import Counter
 from wt_login_fast import WTAutoLoginFast
 from wt_scv2_fast import WTScraperZoomScrollFast
-from utils.mongodb_utils import get_mongo_collection
+from utils.mongodb_utils import (
+    get_mongo_collection, new_sync_generation, ensure_sync_generation_index, sweep_removed,
+)
 from send_TG_message import send_telegram_message_with_metadata
-
-
-class WTSession:
-    def __init__(self):
-        self.driver = None
-        self.session = None
-        self.last_login = None
-
-    def login(self):
-        self.close()  # clean before starting fresh
-        self.session = WTAutoLoginFast(headless=True)
-        if not self.session.login():
-            raise Exception("❌ WT Login failed")
-        self.driver = self.session.get_driver()
-        self.last_login = datetime.now()
-        print("✅ WT Login completed.")
-        return self.driver
-
-    def should_relogin(self):
-        return not self.last_login or (datetime.now() - self.last_login) > timedelta(minutes=15)
-
-    def close(self):
-        try:
-            if self.driver:
-                self.driver.quit()
-        except:
-            pass
-        self.driver = None
-        self.session = None
+from utils.browser_pool import BrowserPool
 
 
 def notify_ride(row):
@@ -59,16 +33,16 @@ def notify_ride(row):
 def save_to_mongodb(df):
     collection = get_mongo_collection("wt_rides")
     now = datetime.now()
+    generation = new_sync_generation()
+    ensure_sync_generation_index(collection)
 
     # Load all existing rides into memory
     existing_docs = {doc["ID"]: doc for doc in collection.find({"Source": "wt"})}
-    seen_ids = set()
 
     new_count = 0
 
     for _, row in df.iterrows():
         ride_id = row["ID"]
-        seen_ids.add(ride_id)
 
         doc = existing_docs.get(ride_id)
         row_dict = row.to_dict()
@@ -79,7 +53,8 @@ def save_to_mongodb(df):
                 "FirstSeen": now,
                 "LastSeen": now,
                 "Status": "NEW",
-                "Source": "wt"
+                "Source": "wt",
+                "SyncGeneration": generation
             })
             collection.insert_one(row_dict)
             notify_ride(row_dict)
@@ -100,7 +75,8 @@ def save_to_mongodb(df):
                 "ride_datetime": row_dict.get("ride_datetime"),
                 "Price": row_dict.get("Price"),
                 "IsNewBadge": row_dict.get("IsNewBadge"),
-                "Source": "wt"
+                "Source": "wt",
+                "SyncGeneration": generation
             }
 
             # Update status only if it qualifies
@@ -115,10 +91,9 @@ def save_to_mongodb(df):
             collection.update_one({"ID": ride_id}, {"$set": updates})
 
     # Mark old entries as REMOVED
-    for ride_id, doc in existing_docs.items():
-        if ride_id not in seen_ids and doc.get("Status") != "REMOVED":
-            collection.update_one({"ID": ride_id}, {"$set": {"Status": "REMOVED", "LastSeen": now}})
-            print(f"🗑️ Removed: {ride_id}")
+    removed = sweep_removed(collection, "wt", generation, removed_at=now).modified_count
+    if removed:
+        print(f"🗑️ Removed: {removed}")
 
     if new_count:
         print(f"✅ {new_count} yeni kayıt MongoDB'ye eklendi.")
@@ -127,19 +102,15 @@ def save_to_mongodb(df):
 
 
 def run_loop():
-    session = WTSession()
-    cycle_start = datetime.now()
+    pool = BrowserPool("wt", lambda: WTAutoLoginFast(headless=True))
+    pool.warm_up()
 
     while True:
         try:
-            # Restart browser every 15 minutes
-            if session.should_relogin():
-                print("♻️ 15 dakika doldu. Oturum yenileniyor...")
-                session.login()
-                cycle_start = datetime.now()
-
-            scraper = WTScraperZoomScrollFast(driver=session.driver)
-            df, _, parsed = scraper.run_scraping_cycle()
+            # Tarayıcı havuzda açık kalır; oturum sadece düştüğünde yenilenir
+            with pool.lease() as driver:
+                scraper = WTScraperZoomScrollFast(driver=driver)
+                df, _, parsed = scraper.run_scraping_cycle()
 
             if not df.empty:
                 save_to_mongodb(df)
@@ -149,7 +120,6 @@ def run_loop():
         except Exception as e:
             print(f"[ERROR] {e}")
             traceback.print_exc()
-            session.close()
             time.sleep(10)
 
 
@@ -1,31 +1,25 @@
 import psutil
 
-def find_active_chromedriver_pids():
-    active_pids = set()
-
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            name = proc.info['name'].lower() if proc.info['name'] else ''
-            cmdline = " ".join(proc.info['cmdline']).lower() if proc.info['cmdline'] else ''
-
-            if 'chromedriver' in name or 'chrome' in name:
-                active_pids.add(proc.pid)
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-
-    return active_pids
 
-def clean_zombie_parents(exclude_pids):
+def find_zombies():
+    """Tek geçişte zombileri ve aktif chrome/chromedriver PID'lerini toplar."""
     zombies = []
+    active_pids = set()
 
-    # Zombie'leri bul
     for proc in psutil.process_iter(['pid', 'ppid', 'name', 'status']):
         try:
+            name = proc.info['name'].lower() if proc.info['name'] else ''
             if proc.info['status'] == psutil.STATUS_ZOMBIE:
                 zombies.append((proc.info['pid'], proc.info['ppid'], proc.info['name']))
+            elif 'chromedriver' in name or 'chrome' in name:
+                active_pids.add(proc.info['pid'])
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             continue
 
+    return zombies, active_pids
+
+
+def clean_zombie_parents(zombies, exclude_pids):
     if not zombies:
         print("✅ No zombie processes found.")
         return
@@ -55,5 +49,6 @@ def clean_zombie_parents(exclude_pids):
                 print(f"❌ Force kill failed: {e}")
 
 if __name__ == "__main__":
-    active_pids = find_active_chromedriver_pids()
-    clean_zombie_parents(exclude_pids=active_pids)
+    # Harici (host) araç: konteynerler içinde process_helper.reap_zombie_children() kullanılır.
+    zombies, active_pids = find_zombies()
+    clean_zombie_parents(zombies, exclude_pids=active_pids)